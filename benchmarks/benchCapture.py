@@ -0,0 +1,55 @@
+"""
+Compare the number of frames per second of the capture backends.
+
+Run from the root of the repository with an X11 display, for instance under Xvfb:
+
+  xvfb-run -s '-screen 0 1920x1080x24' python -m benchmarks.benchCapture
+"""
+import argparse
+import time
+
+from guirecognizer import CaptureBackend, PilCaptureBackend, XShmCaptureBackend
+from guirecognizer.types import AreaCoord
+
+
+def measureFps(grab, coord: AreaCoord, duration: float) -> float:
+  """
+  :param grab: function grabbing an area
+  :param coord:
+  :param duration: duration of the measure in seconds
+  """
+  grab(coord)
+  nbFrames = 0
+  start = time.perf_counter()
+  end = start + duration
+  while time.perf_counter() < end:
+    grab(coord)
+    nbFrames += 1
+  return nbFrames / (time.perf_counter() - start)
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description='Compare the frames per second of the capture backends.')
+  parser.add_argument('--duration', type=float, default=2, help='duration of each measure in seconds')
+  parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 500, 1000],
+      help='widths and heights of the square areas to grab')
+  args = parser.parse_args()
+
+  backends: list[tuple[str, CaptureBackend]] = [('PIL ImageGrab', PilCaptureBackend())]
+  try:
+    xshmBackend = XShmCaptureBackend()
+    backends.append(('XShm', xshmBackend))
+  except OSError as e:
+    xshmBackend = None
+    print(f'XShm backend unavailable: {e}')
+
+  print(f'{"backend":<22}' + ''.join(f'{f"{size}x{size}":>12}' for size in args.sizes))
+  for name, backend in backends:
+    print(f'{name:<22}' + ''.join(f'{measureFps(backend.grabArea, (0, 0, size, size), args.duration):>12.1f}' for size in args.sizes))
+  if xshmBackend is not None:
+    print(f'{"XShm numpy (no copy)":<22}'
+        + ''.join(f'{measureFps(xshmBackend.grabAreaArray, (0, 0, size, size), args.duration):>12.1f}' for size in args.sizes))
+    xshmBackend.close()
+  print('Values are frames per second.')
+
+if __name__ == '__main__':
+  main()
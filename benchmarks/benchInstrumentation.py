@@ -0,0 +1,63 @@
+"""
+Measure the overhead of the instrumentation on cheap and expensive executions.
+
+The screen is a synthetic image so no display is needed. Run from the root of the repository:
+
+  python -m benchmarks.benchInstrumentation
+"""
+import argparse
+import time
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.benchParallel import HEIGHT, WIDTH, createRecognizer
+from guirecognizer import ActionType
+
+
+def measure(execute, nbIterations: int, nbRepeats: int) -> float:
+  """
+  Return the best mean duration of an execution in seconds.
+
+  :param execute:
+  :param nbIterations: number of executions of a measure
+  :param nbRepeats: number of measures
+  """
+  execute()
+  durations = []
+  for _ in range(nbRepeats):
+    start = time.perf_counter()
+    for _ in range(nbIterations):
+      execute()
+    durations.append((time.perf_counter() - start) / nbIterations)
+  return min(durations)
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description='Measure the overhead of the instrumentation.')
+  parser.add_argument('--iterations', type=int, default=2000, help='number of pixel color executions of a measure')
+  parser.add_argument('--repeats', type=int, default=5, help='number of measures, the best one is kept')
+  args = parser.parse_args()
+
+  rng = np.random.default_rng(0)
+  screenshot = Image.fromarray(rng.integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8))
+  recognizer = createRecognizer(screenshot, 1, (480, 360), 32)
+  workloads = {
+    'pixelColor': (lambda: recognizer.execute(ActionType.PIXEL_COLOR, coord=(10, 10), screenshot=screenshot), args.iterations),
+    'findImage': (lambda: recognizer.executeFindImage('find0', screenshot=screenshot), max(args.iterations // 100, 1))}
+  modes = {
+    'disabled': lambda recognizer: recognizer.disableInstrumentation(),
+    'enabled': lambda recognizer: recognizer.enableInstrumentation(),
+    'trace': lambda recognizer: recognizer.enableInstrumentation(trace=True)}
+
+  print(f'{"":<12}' + ''.join(f'{mode:>12}' for mode in modes))
+  for name, (execute, nbIterations) in workloads.items():
+    durations = []
+    for setMode in modes.values():
+      setMode(recognizer)
+      durations.append(measure(execute, nbIterations, args.repeats))
+    print(f'{name:<12}' + ''.join(f'{duration * 1e6:>9.1f} us' for duration in durations)
+        + f'   overhead {durations[1] / durations[0] - 1:+.1%}')
+  recognizer.disableInstrumentation()
+
+if __name__ == '__main__':
+  main()
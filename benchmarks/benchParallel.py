@@ -0,0 +1,94 @@
+"""
+Compare the duration of a batch of image searches executed one after another and on a thread pool.
+
+The screen is a synthetic image and the config has 8 findImage actions searching it, so no display is needed.
+Run from the root of the repository:
+
+  python -m benchmarks.benchParallel
+"""
+import argparse
+import base64
+import os
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer import Recognizer
+from guirecognizer.recognizer import RecognizerData
+
+WIDTH = 1920
+HEIGHT = 1080
+
+
+def createRecognizer(screenshot: Image.Image, nbActions: int, areaSize: tuple[int, int], imageToFindSize: int) -> Recognizer:
+  """
+  Return a recognizer with findImage actions searching images cropped from the screenshot, each one in its own area.
+
+  :param screenshot:
+  :param nbActions:
+  :param areaSize: width and height of the searched areas
+  :param imageToFindSize: width and height of the images to find
+  """
+  actions = []
+  for index in range(nbActions):
+    left = round(index * (WIDTH - areaSize[0]) / max(nbActions - 1, 1))
+    top = round(index * (HEIGHT - areaSize[1]) / max(nbActions - 1, 1))
+    imageLeft = left + (areaSize[0] - imageToFindSize) // 2
+    imageTop = top + (areaSize[1] - imageToFindSize) // 2
+    buffer = BytesIO()
+    screenshot.crop((imageLeft, imageTop, imageLeft + imageToFindSize, imageTop + imageToFindSize)).save(buffer, format='PNG')
+    actions.append({
+      'id': f'find{index}',
+      'type': 'findImage',
+      'ratios': [left / WIDTH, top / HEIGHT, (left + areaSize[0]) / WIDTH, (top + areaSize[1]) / HEIGHT],
+      'imageToFind': base64.b64encode(buffer.getvalue()).decode(),
+      'threshold': 5,
+      'maxResults': 1})
+  return Recognizer({'borders': (0, 0, WIDTH, HEIGHT), 'actions': actions}) # type: ignore
+
+def measure(execute, nbRepeats: int) -> float:
+  """
+  Return the best duration of the function in seconds.
+
+  :param execute:
+  :param nbRepeats:
+  """
+  execute()
+  durations = []
+  for _ in range(nbRepeats):
+    start = time.perf_counter()
+    execute()
+    durations.append(time.perf_counter() - start)
+  return min(durations)
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description='Compare sequential and parallel execution of 8 image searches.')
+  parser.add_argument('--actions', type=int, default=8, help='number of findImage actions')
+  parser.add_argument('--area', type=int, nargs=2, default=[960, 720], help='width and height of the searched areas')
+  parser.add_argument('--image', type=int, default=48, help='width and height of the images to find')
+  parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8], help='numbers of threads of the pool')
+  parser.add_argument('--repeats', type=int, default=5, help='number of measures, the best one is kept')
+  args = parser.parse_args()
+
+  rng = np.random.default_rng(0)
+  screenshot = Image.fromarray(rng.integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8))
+  recognizer = createRecognizer(screenshot, args.actions, tuple(args.area), args.image)
+  requests = list(recognizer.actionById)
+  expected = recognizer.executeMany(requests, screenshot=screenshot)
+  if any(len(coords) != 1 for coords in expected):
+    print('Warning: some images were not found.')
+
+  print(f'{os.cpu_count()} cores, {args.actions} findImage actions on {args.area[0]}x{args.area[1]} areas')
+  sequential = measure(lambda: recognizer.executeMany(requests, screenshot=screenshot), args.repeats)
+  print(f'{"sequential":<12}{sequential * 1000:>10.1f} ms')
+  for maxWorkers in args.workers:
+    recognizer.enableParallelExecution(maxWorkers)
+    assert recognizer.executeMany(requests, screenshot=screenshot) == expected
+    duration = measure(lambda: recognizer.executeMany(requests, screenshot=screenshot), args.repeats)
+    print(f'{f"{maxWorkers} threads":<12}{duration * 1000:>10.1f} ms{sequential / duration:>8.2f}x')
+  recognizer.disableParallelExecution()
+
+if __name__ == '__main__':
+  main()
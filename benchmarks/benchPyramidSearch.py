@@ -0,0 +1,102 @@
+"""
+Compare the exhaustive image search with the coarse-to-fine search at several levels: duration, speedup and recall.
+
+The screen is a synthetic image made of random noise upscaled with a bilinear filter, so its features span several
+pixels like the ones of a real interface, and copies of the image to find are pasted at random positions.
+Recall is the fraction of the pasted copies found. Run from the root of the repository:
+
+  python -m benchmarks.benchPyramidSearch
+"""
+import argparse
+import base64
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer import Recognizer
+
+WIDTH = 1920
+HEIGHT = 1080
+
+
+def createScreen(rng: np.random.Generator, smoothness: int) -> Image.Image:
+  """
+  :param rng:
+  :param smoothness: size in pixels of a random value of the noise before upscaling
+  """
+  noise = rng.integers(0, 256, (HEIGHT // smoothness + 1, WIDTH // smoothness + 1, 3), dtype=np.uint8)
+  return Image.fromarray(noise).resize((WIDTH, HEIGHT), Image.Resampling.BILINEAR)
+
+def pasteCopies(rng: np.random.Generator, screen: Image.Image, imageToFind: Image.Image, nbCopies: int) -> list[tuple[int, int]]:
+  """
+  Paste copies of the image to find without overlap and return their top left positions.
+
+  :param rng:
+  :param screen:
+  :param imageToFind:
+  :param nbCopies:
+  """
+  width, height = imageToFind.size
+  positions = []
+  while len(positions) < nbCopies:
+    x = int(rng.integers(0, WIDTH - width))
+    y = int(rng.integers(0, HEIGHT - height))
+    if all(abs(x - otherX) >= width or abs(y - otherY) >= height for otherX, otherY in positions):
+      screen.paste(imageToFind, (x, y))
+      positions.append((x, y))
+  return positions
+
+def measure(execute, nbRepeats: int) -> float:
+  """
+  Return the best duration of the function in seconds.
+
+  :param execute:
+  :param nbRepeats:
+  """
+  execute()
+  durations = []
+  for _ in range(nbRepeats):
+    start = time.perf_counter()
+    execute()
+    durations.append(time.perf_counter() - start)
+  return min(durations)
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description='Compare the exhaustive and coarse-to-fine image searches on a 1080p screen.')
+  parser.add_argument('--image', type=int, default=64, help='width and height of the image to find')
+  parser.add_argument('--copies', type=int, default=5, help='number of copies of the image to find on the screen')
+  parser.add_argument('--smoothness', type=int, default=8, help='size in pixels of the features of the screen')
+  parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 3], help='numbers of halvings of the coarse searches')
+  parser.add_argument('--margin', type=int, default=4, help='refine margin of the coarse searches')
+  parser.add_argument('--repeats', type=int, default=5, help='number of measures, the best one is kept')
+  args = parser.parse_args()
+
+  rng = np.random.default_rng(0)
+  screen = createScreen(rng, args.smoothness)
+  imageToFind = createScreen(rng, args.smoothness).crop((0, 0, args.image, args.image))
+  positions = pasteCopies(rng, screen, imageToFind, args.copies)
+  buffer = BytesIO()
+  imageToFind.save(buffer, format='PNG')
+  action = {'type': 'findImage', 'ratios': [0, 0, 1, 1], 'imageToFind': base64.b64encode(buffer.getvalue()).decode(),
+      'threshold': 5, 'maxResults': args.copies, 'refineMargin': args.margin}
+  actions = [{**action, 'id': 'exhaustive'}] + [{**action, 'id': f'levels{levels}', 'searchLevels': levels} for levels in args.levels]
+  recognizer = Recognizer({'borders': (0, 0, WIDTH, HEIGHT), 'actions': actions}) # type: ignore
+
+  print(f'{args.copies} copies of a {args.image}x{args.image} image on a {WIDTH}x{HEIGHT} screen, smoothness {args.smoothness}')
+  print(f'{"search":<12}{"duration":>12}{"speedup":>9}{"recall":>8}{"same":>6}')
+  exhaustiveDuration = None
+  exhaustiveCoords = None
+  for actionId in recognizer.actionById:
+    coords = recognizer.executeFindImage(actionId, screenshot=screen)
+    duration = measure(lambda: recognizer.executeFindImage(actionId, screenshot=screen), args.repeats)
+    if exhaustiveDuration is None:
+      exhaustiveDuration = duration
+      exhaustiveCoords = coords
+    recall = len(set(positions) & {coord[:2] for coord in coords}) / len(positions)
+    same = sorted(coords) == sorted(exhaustiveCoords) # type: ignore
+    print(f'{actionId:<12}{duration * 1000:>9.1f} ms{exhaustiveDuration / duration:>8.2f}x{recall:>8.0%}{"yes" if same else "no":>6}')
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,88 @@
+"""
+Compare an image search of the whole area with the search near the recent locations on a sequence of frames
+where the image to find moves a few pixels between frames and sometimes jumps to a random position.
+
+The screens are synthetic images, so no display is needed. Run from the root of the repository:
+
+  python -m benchmarks.benchRecentLocations
+"""
+import argparse
+import base64
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer import Recognizer
+
+WIDTH = 1920
+HEIGHT = 1080
+
+
+def createFrames(rng: np.random.Generator, imageToFind: Image.Image, nbFrames: int, step: int,
+    jumpProbability: float) -> tuple[list[Image.Image], list[tuple[int, int]]]:
+  """
+  Return the frames and the positions of the image to find in them.
+
+  :param rng:
+  :param imageToFind:
+  :param nbFrames:
+  :param step: largest move in pixels between two frames
+  :param jumpProbability: probability that the image jumps to a random position between two frames
+  """
+  background = Image.fromarray(rng.integers(0, 256, (HEIGHT // 8 + 1, WIDTH // 8 + 1, 3), dtype=np.uint8))
+  background = background.resize((WIDTH, HEIGHT), Image.Resampling.BILINEAR)
+  maxX = WIDTH - imageToFind.width
+  maxY = HEIGHT - imageToFind.height
+  x, y = maxX // 2, maxY // 2
+  frames = []
+  positions = []
+  for _ in range(nbFrames):
+    if rng.random() < jumpProbability:
+      x, y = int(rng.integers(0, maxX)), int(rng.integers(0, maxY))
+    else:
+      x = min(max(x + int(rng.integers(-step, step + 1)), 0), maxX)
+      y = min(max(y + int(rng.integers(-step, step + 1)), 0), maxY)
+    frame = background.copy()
+    frame.paste(imageToFind, (x, y))
+    frames.append(frame)
+    positions.append((x, y))
+  return frames, positions
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description='Compare the search of the whole area and near the recent locations.')
+  parser.add_argument('--frames', type=int, default=50, help='number of frames')
+  parser.add_argument('--image', type=int, default=48, help='width and height of the image to find')
+  parser.add_argument('--step', type=int, default=6, help='largest move in pixels between two frames')
+  parser.add_argument('--jump', type=float, default=0.1, help='probability of a jump to a random position between two frames')
+  parser.add_argument('--margin', type=int, default=16, help='recent margin in pixels')
+  args = parser.parse_args()
+
+  rng = np.random.default_rng(0)
+  imageToFind = Image.fromarray(rng.integers(0, 256, (args.image // 8, args.image // 8, 3), dtype=np.uint8))
+  imageToFind = imageToFind.resize((args.image, args.image), Image.Resampling.BILINEAR)
+  frames, positions = createFrames(rng, imageToFind, args.frames, args.step, args.jump)
+  buffer = BytesIO()
+  imageToFind.save(buffer, format='PNG')
+  action = {'type': 'findImage', 'ratios': [0, 0, 1, 1], 'imageToFind': base64.b64encode(buffer.getvalue()).decode(),
+      'threshold': 5, 'maxResults': 1}
+  recognizer = Recognizer({'borders': (0, 0, WIDTH, HEIGHT), 'actions': [{**action, 'id': 'whole'},
+      {**action, 'id': 'recent', 'recentMargin': args.margin}]}) # type: ignore
+
+  print(f'{args.frames} frames of {WIDTH}x{HEIGHT}, {args.image}x{args.image} image moving up to {args.step} pixels,'
+      f' jump probability {args.jump:.0%}, margin {args.margin}')
+  for actionId in ('whole', 'recent'):
+    nbFound = 0
+    start = time.perf_counter()
+    for frame, position in zip(frames, positions):
+      coords = recognizer.executeFindImage(actionId, screenshot=frame)
+      nbFound += coords == [(position[0], position[1], position[0] + args.image, position[1] + args.image)]
+    duration = time.perf_counter() - start
+    print(f'{actionId:<8}{duration * 1000 / args.frames:>9.1f} ms per frame{nbFound:>6}/{args.frames} found')
+  stats = recognizer.getRecentLocationsStats()['recent']
+  print(f'hit rate {stats["hitRate"]:.0%} ({stats["nbHits"]} hits, {stats["nbMisses"]} misses,'
+      f' {stats["nbFullSearches"]} whole area searches), estimated time saved {stats["savedTime"] * 1000:.0f} ms')
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,75 @@
+"""
+Compare the duration of an image search with a resize interval when its sizes are matched one after another and on
+thread pools of several sizes.
+
+The screen is a synthetic image and the image to find is cropped from it, so no display is needed.
+Run from the root of the repository:
+
+  python -m benchmarks.benchScales
+"""
+import argparse
+import base64
+import os
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer import Recognizer
+
+WIDTH = 1920
+HEIGHT = 1080
+
+
+def measure(execute, nbRepeats: int) -> float:
+  """
+  Return the best duration of the function in seconds.
+
+  :param execute:
+  :param nbRepeats:
+  """
+  execute()
+  durations = []
+  for _ in range(nbRepeats):
+    start = time.perf_counter()
+    execute()
+    durations.append(time.perf_counter() - start)
+  return min(durations)
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description='Compare sequential and threaded matching of the sizes of an image search.')
+  parser.add_argument('--area', type=int, nargs=2, default=[960, 720], help='width and height of the searched area')
+  parser.add_argument('--image', type=int, default=48, help='width and height of the image to find')
+  parser.add_argument('--interval', type=float, nargs=2, default=[0.8, 1.2], help='resize interval of the image to find')
+  parser.add_argument('--step', type=float, default=0.05, help='resize step of the image to find')
+  parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='numbers of threads of the pool')
+  parser.add_argument('--repeats', type=int, default=5, help='number of measures, the best one is kept')
+  args = parser.parse_args()
+
+  rng = np.random.default_rng(0)
+  screenshot = Image.fromarray(rng.integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8))
+  left = (args.area[0] - args.image) // 2
+  top = (args.area[1] - args.image) // 2
+  buffer = BytesIO()
+  screenshot.crop((left, top, left + args.image, top + args.image)).save(buffer, format='PNG')
+  recognizer = Recognizer({'borders': (0, 0, WIDTH, HEIGHT), 'actions': [{'id': 'find', 'type': 'findImage',
+      'ratios': [0, 0, args.area[0] / WIDTH, args.area[1] / HEIGHT], 'imageToFind': base64.b64encode(buffer.getvalue()).decode(),
+      'threshold': 5, 'maxResults': 1, 'resizeInterval': args.interval, 'resizeStep': args.step}]}) # type: ignore
+  nbSizes = len(recognizer.actionById['find'].templatePyramid.grayscales) # type: ignore
+  expected = recognizer.executeFindImage('find', screenshot=screenshot)
+  if len(expected) != 1:
+    print('Warning: the image was not found.')
+
+  print(f'{os.cpu_count()} cores, {nbSizes} sizes of a {args.image}x{args.image} image on a {args.area[0]}x{args.area[1]} area')
+  sequential = measure(lambda: recognizer.executeFindImage('find', screenshot=screenshot), args.repeats)
+  print(f'{"sequential":<12}{sequential * 1000:>10.1f} ms')
+  for maxWorkers in args.workers:
+    recognizer.enableParallelScales(maxWorkers)
+    assert recognizer.executeFindImage('find', screenshot=screenshot) == expected
+    duration = measure(lambda: recognizer.executeFindImage('find', screenshot=screenshot), args.repeats)
+    print(f'{f"{maxWorkers} threads":<12}{duration * 1000:>10.1f} ms{sequential / duration:>8.2f}x')
+  recognizer.disableParallelScales()
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,266 @@
+"""
+Measure the throughput and the peak memory of every action type and preprocessor on synthetic screens.
+
+The screens are synthetic images at several resolutions and the OCR is mocked, so no display nor OCR engine is needed.
+The results can be saved as a baseline and later runs compared to it, the exit code is 1 when a case regressed.
+Run from the root of the repository:
+
+  python -m benchmarks.benchSuite --save baseline.json
+  python -m benchmarks.benchSuite --baseline baseline.json
+  python -m benchmarks.benchSuite --resolutions 1080p --filter findImage
+"""
+import argparse
+import base64
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from contextlib import ExitStack
+from io import BytesIO
+from typing import Any
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer import OcrType, Recognizer
+from guirecognizer.array_image import ArrayImage
+from guirecognizer.mouse_helper import MouseHelper
+
+RESOLUTIONS = {'1080p': (1920, 1080), '1440p': (2560, 1440), '4k': (3840, 2160)}
+BASELINE_VERSION = 1
+IMAGE_TO_FIND_SIZE = 48
+
+# Ratios of the selections of the actions, the same at every resolution.
+POINT_RATIOS = [0.5, 0.5]
+SMALL_AREA_RATIOS = [0.4, 0.4, 0.45, 0.45]
+FIND_IMAGE_RATIOS = [0, 0, 0.5, 0.5]
+FIND_IMAGE_RESIZE_RATIOS = [0.5, 0.5, 0.75, 0.75]
+IMAGE_HASH_RATIOS = [0.1, 0.1, 0.2, 0.2]
+TEXT_RATIOS = [0.1, 0.8, 0.3, 0.85]
+PREPROCESSING_RATIOS = [0.25, 0.25, 0.75, 0.75]
+
+OPERATIONS = {
+  'grayscale': {'type': 'grayscale'},
+  'colorMap/oneToOne': {'type': 'colorMap', 'colorMap': {'method': 'oneToOne', 'inputColor1': [128, 128, 128],
+      'difference': 0.2, 'outputColor1': [0, 0, 0]}},
+  'colorMap/rangeToOne': {'type': 'colorMap', 'colorMap': {'method': 'rangeToOne', 'inputColor1': [0, 0, 0],
+      'inputColor2': [128, 128, 128], 'difference': 0.1, 'outputColor1': [255, 0, 0]}},
+  'colorMap/rangeToRange': {'type': 'colorMap', 'colorMap': {'method': 'rangeToRange', 'inputColor1': [0, 0, 0],
+      'inputColor2': [255, 255, 255], 'difference': 0.1, 'outputColor1': [75, 0, 130], 'outputColor2': [238, 130, 238]}},
+  'threshold/simple': {'type': 'threshold', 'threshold': {'method': 'simple', 'thresholdType': 'binary'}},
+  'threshold/adaptiveMean': {'type': 'threshold', 'threshold': {'method': 'adaptiveMean', 'thresholdType': 'binary'}},
+  'threshold/adaptiveGaussian': {'type': 'threshold', 'threshold': {'method': 'adaptiveGaussian', 'thresholdType': 'binary'}},
+  'threshold/otsu': {'type': 'threshold', 'threshold': {'method': 'otsu', 'thresholdType': 'binary'}},
+  'resize/unfixedRatio': {'type': 'resize', 'resize': {'width': 320, 'height': 180, 'method': 'unfixedRatio'}},
+  'resize/fixedRatioWidth': {'type': 'resize', 'resize': {'width': 320, 'height': 180, 'method': 'fixedRatioWidth'}},
+  'resize/fixedRatioHeight': {'type': 'resize', 'resize': {'width': 320, 'height': 180, 'method': 'fixedRatioHeight'}}}
+
+
+def createScreen(size: tuple[int, int]) -> Image.Image:
+  """
+  Return a noisy screen with flat rectangles, so that the preprocessors have both uniform and detailed areas.
+
+  :param size: width and height
+  """
+  rng = np.random.default_rng(0)
+  width, height = size
+  pixels = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+  for _ in range(20):
+    left, top = rng.integers(0, width), rng.integers(0, height)
+    pixels[top:top + height // 10, left:left + width // 10] = rng.integers(0, 256, 3, dtype=np.uint8)
+  return Image.fromarray(pixels)
+
+def getBox(screen: Image.Image, ratios: list[float]) -> tuple[int, ...]:
+  """
+  :param screen:
+  :param ratios: ratios of a point or an area
+  """
+  return tuple(round(ratio * (screen.width if index % 2 == 0 else screen.height)) for index, ratio in enumerate(ratios))
+
+def encodeImage(image: Image.Image) -> str:
+  """
+  :param image:
+  """
+  buffer = BytesIO()
+  image.save(buffer, format='PNG')
+  return base64.b64encode(buffer.getvalue()).decode()
+
+def getImageToFind(screen: Image.Image, ratios: list[float]) -> str:
+  """
+  Return the image cropped from the center of the area, encoded for the config.
+
+  :param screen:
+  :param ratios: ratios of the searched area
+  """
+  left, top, right, bottom = getBox(screen, ratios)
+  imageLeft = (left + right - IMAGE_TO_FIND_SIZE) // 2
+  imageTop = (top + bottom - IMAGE_TO_FIND_SIZE) // 2
+  return encodeImage(screen.crop((imageLeft, imageTop, imageLeft + IMAGE_TO_FIND_SIZE, imageTop + IMAGE_TO_FIND_SIZE)))
+
+def createRecognizer(screen: Image.Image) -> Recognizer:
+  """
+  Return a recognizer with an action for every action type and an operation for every preprocessor method.
+
+  :param screen:
+  """
+  pixelColor = list(screen.getpixel(getBox(screen, POINT_RATIOS)))
+  imageHash = Recognizer.getImageHash(screen.crop(getBox(screen, IMAGE_HASH_RATIOS)))
+  actions: list[dict[str, Any]] = [
+    {'id': 'coordinates', 'type': 'coordinates', 'ratios': SMALL_AREA_RATIOS},
+    {'id': 'selection/point', 'type': 'selection', 'ratios': POINT_RATIOS},
+    {'id': 'selection/area', 'type': 'selection', 'ratios': SMALL_AREA_RATIOS},
+    {'id': 'findImage', 'type': 'findImage', 'ratios': FIND_IMAGE_RATIOS,
+        'imageToFind': getImageToFind(screen, FIND_IMAGE_RATIOS), 'threshold': 5, 'maxResults': 1},
+    {'id': 'findImage/resizeInterval', 'type': 'findImage', 'ratios': FIND_IMAGE_RESIZE_RATIOS,
+        'imageToFind': getImageToFind(screen, FIND_IMAGE_RESIZE_RATIOS), 'threshold': 5, 'maxResults': 1,
+        'resizeInterval': [0.9, 1.1]},
+    {'id': 'click', 'type': 'click', 'ratios': POINT_RATIOS},
+    {'id': 'pixelColor/point', 'type': 'pixelColor', 'ratios': POINT_RATIOS},
+    {'id': 'pixelColor/area', 'type': 'pixelColor', 'ratios': SMALL_AREA_RATIOS},
+    {'id': 'comparePixelColor', 'type': 'comparePixelColor', 'ratios': POINT_RATIOS, 'pixelColor': pixelColor},
+    {'id': 'isSamePixelColor', 'type': 'isSamePixelColor', 'ratios': POINT_RATIOS, 'pixelColor': pixelColor},
+    {'id': 'imageHash', 'type': 'imageHash', 'ratios': IMAGE_HASH_RATIOS},
+    {'id': 'compareImageHash', 'type': 'compareImageHash', 'ratios': IMAGE_HASH_RATIOS, 'imageHash': imageHash},
+    {'id': 'isSameImageHash', 'type': 'isSameImageHash', 'ratios': IMAGE_HASH_RATIOS, 'imageHash': imageHash},
+    {'id': 'text', 'type': 'text', 'ratios': TEXT_RATIOS},
+    {'id': 'number', 'type': 'number', 'ratios': TEXT_RATIOS}]
+  operations = [{'id': operationId, 'suboperations': [suboperation]} for operationId, suboperation in OPERATIONS.items()]
+  recognizer = Recognizer({'borders': (0, 0, screen.width, screen.height), 'actions': actions, 'operations': operations}) # type: ignore
+  if len(recognizer.actionById) != len(actions) or len(recognizer.preprocessing.operationById) != len(operations):
+    raise RuntimeError('Some actions or operations of the benchmark were ignored, check the logs.')
+  return recognizer
+
+def getCases(recognizer: Recognizer, screen: Image.Image) -> dict[str, Callable[[], Any]]:
+  """
+  Return the function measured by case name.
+
+  :param recognizer:
+  :param screen:
+  """
+  cases: dict[str, Callable[[], Any]] = {}
+  for actionId in recognizer.actionById:
+    cases[f'action/{actionId}'] = lambda actionId=actionId: recognizer.execute(actionId, screenshot=screen)
+  area = screen.crop(getBox(screen, PREPROCESSING_RATIOS))
+  arrayArea = ArrayImage.fromImage(area)
+  for operationId in recognizer.preprocessing.operationById:
+    cases[f'preprocessing/{operationId}'] = \
+        lambda operationId=operationId: recognizer.preprocessing.processArray(arrayArea, operationId)
+  return cases
+
+def measureThroughput(function: Callable[[], Any], duration: float) -> float:
+  """
+  Return the number of calls per second, calling the function during at least the duration.
+
+  :param function:
+  :param duration: in seconds
+  """
+  function()
+  nbCalls = 0
+  start = time.perf_counter()
+  end = start + duration
+  while True:
+    function()
+    nbCalls += 1
+    now = time.perf_counter()
+    if now >= end:
+      return nbCalls / (now - start)
+
+def measurePeakMemory(function: Callable[[], Any]) -> int:
+  """
+  Return the peak of the memory allocated by a call in bytes.
+
+  Only the allocations of Python and numpy are traced, not the internal buffers of OpenCV.
+
+  :param function:
+  """
+  tracemalloc.start()
+  try:
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    function()
+    return tracemalloc.get_traced_memory()[1] - baseline
+  finally:
+    tracemalloc.stop()
+
+def run(resolutions: list[str], filters: list[str], duration: float) -> dict[str, dict[str, float]]:
+  """
+  Return the throughput and the peak memory by case name prefixed by the resolution.
+
+  :param resolutions: names of RESOLUTIONS
+  :param filters: substrings of the names of the measured cases, every case is measured when empty
+  :param duration: measure duration of the throughput of a case in seconds
+  """
+  results = {}
+  for resolution in resolutions:
+    screen = createScreen(RESOLUTIONS[resolution])
+    recognizer = createRecognizer(screen)
+    recognizer.setOcrOrder([OcrType.EASY_OCR])
+    with ExitStack() as stack:
+      stack.enter_context(patch.object(recognizer, 'getTextEasyOcr', return_value='1234'))
+      stack.enter_context(patch.object(MouseHelper, 'clickOnPosition'))
+      for name, function in getCases(recognizer, screen).items():
+        name = f'{resolution}/{name}'
+        if len(filters) > 0 and not any(filter in name for filter in filters):
+          continue
+        results[name] = {'opsPerSecond': measureThroughput(function, duration), 'peakMemory': measurePeakMemory(function)}
+        print(f'{name:<48}{results[name]["opsPerSecond"]:>12.1f} ops/s{results[name]["peakMemory"] / 1024:>12.1f} KiB')
+  return results
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], tolerance: float) -> list[str]:
+  """
+  Return the descriptions of the regressions of the results against the baseline.
+
+  :param results:
+  :param baseline: results of a previous run
+  :param tolerance: accepted relative decrease of the throughput and increase of the peak memory
+  """
+  regressions = []
+  for name, result in results.items():
+    if name not in baseline:
+      continue
+    reference = baseline[name]
+    if result['opsPerSecond'] < reference['opsPerSecond'] * (1 - tolerance):
+      regressions.append(f'{name}: {result["opsPerSecond"]:.1f} ops/s instead of {reference["opsPerSecond"]:.1f} ops/s')
+    # A few KiB of peak memory are noise of the allocator and the caches.
+    if result['peakMemory'] > reference['peakMemory'] * (1 + tolerance) + 64 * 1024:
+      regressions.append(f'{name}: peak memory {result["peakMemory"] / 1024:.1f} KiB'
+          f' instead of {reference["peakMemory"] / 1024:.1f} KiB')
+  return regressions
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description='Measure every action type and preprocessor on synthetic screens.')
+  parser.add_argument('--resolutions', nargs='+', choices=list(RESOLUTIONS), default=list(RESOLUTIONS),
+      help='resolutions of the synthetic screens')
+  parser.add_argument('--filter', nargs='+', default=[], help='measure only the cases whose name contains one of these strings')
+  parser.add_argument('--duration', type=float, default=0.5, help='measure duration of the throughput of a case in seconds')
+  parser.add_argument('--save', help='write the results to this baseline json file')
+  parser.add_argument('--baseline', help='compare the results to this baseline json file')
+  parser.add_argument('--tolerance', type=float, default=0.2,
+      help='accepted relative decrease of the throughput and increase of the peak memory')
+  args = parser.parse_args()
+
+  results = run(args.resolutions, args.filter, args.duration)
+  if args.save is not None:
+    with open(args.save, 'w') as file:
+      json.dump({'version': BASELINE_VERSION, 'python': platform.python_version(), 'results': results}, file, indent=2)
+  if args.baseline is not None:
+    with open(args.baseline) as file:
+      baseline = json.load(file)
+    if baseline.get('version') != BASELINE_VERSION:
+      sys.exit(f'Unsupported baseline version {baseline.get("version")}.')
+    regressions = compare(results, baseline['results'], args.tolerance)
+    missing = len([name for name in results if name not in baseline['results']])
+    if missing > 0:
+      print(f'{missing} cases are not in the baseline.')
+    if len(regressions) > 0:
+      print(f'Regressions ({len(regressions)}):')
+      for regression in regressions:
+        print(f'  {regression}')
+      sys.exit(1)
+    print('No regression.')
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,94 @@
+"""
+Measure how the number of executions per second scales with the number of threads sharing one recognizer.
+
+With the GIL, only the parts releasing it (OpenCV, numpy, PIL) run in parallel. On the free-threaded build of Python 3.13,
+the Python parts of the executions run in parallel too. Run from the root of the repository, for instance:
+
+  python -m benchmarks.benchThreads
+  python3.13t -X gil=0 -m benchmarks.benchThreads
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.benchParallel import HEIGHT, WIDTH, createRecognizer
+from guirecognizer import ActionType, Recognizer
+
+
+def getWorkload(recognizer: Recognizer, screenshot: Image.Image, name: str):
+  """
+  Return a function making one iteration of the workload.
+
+  :param recognizer:
+  :param screenshot:
+  :param name: pixel, findImage or mixed
+  """
+  findImageIds = list(recognizer.actionById)
+  pixelColorRequests = [(ActionType.PIXEL_COLOR, {'coord': (x, y, x + 8, y + 8)}) for x in range(0, 400, 40) for y in range(0, 200, 40)]
+  def pixel() -> None:
+    for actionIdOrType, kwargs in pixelColorRequests:
+      recognizer.execute(actionIdOrType, screenshot=screenshot, **kwargs)
+  def findImage() -> None:
+    for actionId in findImageIds:
+      recognizer.executeFindImage(actionId, screenshot=screenshot)
+  def mixed() -> None:
+    pixel()
+    recognizer.executeFindImage(findImageIds[0], screenshot=screenshot)
+  return {'pixel': pixel, 'findImage': findImage, 'mixed': mixed}[name]
+
+def measure(work, nbThreads: int, duration: float) -> float:
+  """
+  Return the number of iterations per second of the threads running the workload together.
+
+  :param work:
+  :param nbThreads:
+  :param duration: duration of the measure in seconds
+  """
+  barrier = threading.Barrier(nbThreads + 1)
+  stop = threading.Event()
+  counts = [0] * nbThreads
+  def run(index: int) -> None:
+    barrier.wait()
+    while not stop.is_set():
+      work()
+      counts[index] += 1
+  threads = [threading.Thread(target=run, args=(index,)) for index in range(nbThreads)]
+  for thread in threads:
+    thread.start()
+  barrier.wait()
+  start = time.perf_counter()
+  time.sleep(duration)
+  stop.set()
+  for thread in threads:
+    thread.join()
+  return sum(counts) / (time.perf_counter() - start)
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description='Measure the scaling of executions with threads sharing one recognizer.')
+  parser.add_argument('--workload', choices=['pixel', 'findImage', 'mixed'], default='mixed', help='executions of each iteration')
+  parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8], help='numbers of threads')
+  parser.add_argument('--duration', type=float, default=2, help='duration of each measure in seconds')
+  args = parser.parse_args()
+
+  rng = np.random.default_rng(0)
+  screenshot = Image.fromarray(rng.integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8))
+  recognizer = createRecognizer(screenshot, 8, (480, 360), 32)
+  work = getWorkload(recognizer, screenshot, args.workload)
+  work()
+
+  isGilEnabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+  print(f'Python {sys.version.split()[0]}, GIL {"enabled" if isGilEnabled else "disabled"}, {os.cpu_count()} cores,'
+      f' workload {args.workload}')
+  reference = None
+  for nbThreads in args.threads:
+    rate = measure(work, nbThreads, args.duration)
+    reference = rate if reference is None else reference
+    print(f'{f"{nbThreads} threads":<12}{rate:>10.1f} it/s{rate / reference:>8.2f}x')
+
+if __name__ == '__main__':
+  main()
@@ -5,7 +5,7 @@ import time
 from enum import Enum, auto, unique
 
 import keyboard
-from guirecognizer import Recognizer
+from guirecognizer import AsyncRecognizer, Recognizer
 
 
 @unique
@@ -56,6 +56,7 @@ class Sushi(Enum):
 class Kitchen:
   def __init__(self, recognizer: Recognizer):
     self.recognizer = recognizer
+    self.asyncRecognizer = AsyncRecognizer(recognizer)
     self.reset()
 
   def reset(self) -> None:
@@ -137,26 +138,27 @@ class Kitchen:
 
   async def updateAfterShipping(self, ingredient: Ingredient) -> None:
     await asyncio.sleep(0.5)
-    while self.isShippingIngredient(ingredient):
-      await asyncio.sleep(0.5)
+    notShippingActionId = self.getNotShippingActionId(ingredient)
+    if notShippingActionId is not None:
+      await self.asyncRecognizer.waitUntil(notShippingActionId, interval=0.1)
     self.nbByIngredient[ingredient] += ingredient.nbByPayment
     self.isShipping[ingredient] = False
 
-  def isShippingIngredient(self, ingredient: Ingredient) -> bool:
+  def getNotShippingActionId(self, ingredient: Ingredient) -> str | None:
     match(ingredient):
       case Ingredient.RICE:
-        return not self.recognizer.executeIsSamePixelColor('isNotShippingRice')
+        return 'isNotShippingRice'
       case Ingredient.NORI:
-        return not self.recognizer.executeIsSamePixelColor('isNotShippingNori')
+        return 'isNotShippingNori'
       case Ingredient.FISH_EGG:
-        return not self.recognizer.executeIsSamePixelColor('isNotShippingFishEgg')
+        return 'isNotShippingFishEgg'
       case Ingredient.SHRIMP:
-        return not self.recognizer.executeIsSamePixelColor('isNotShippingShrimp')
+        return 'isNotShippingShrimp'
       case Ingredient.SALMON:
-        return not self.recognizer.executeIsSamePixelColor('isNotShippingSalmon')
+        return 'isNotShippingSalmon'
       case Ingredient.UNAGI:
-        return not self.recognizer.executeIsSamePixelColor('isNotShippingUnagi')
-    return False
+        return 'isNotShippingUnagi'
+    return None
 
   def canMakeOrder(self, order: Sushi) -> bool:
     for ingredient in Ingredient:
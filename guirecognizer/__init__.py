@@ -1,13 +1,25 @@
 from guirecognizer.action_type import ActionType, SelectionType
+from guirecognizer.async_recognizer import AsyncRecognizer
+from guirecognizer.background_capturer import BackgroundCapturer
+from guirecognizer.capture import (CaptureBackend, PilCaptureBackend,
+                                   ReplayCaptureBackend, XShmCaptureBackend)
 from guirecognizer.common import RecognizerValueError
+from guirecognizer.dirty_regions import DirtyRegionTracker
+from guirecognizer.frame import Frame
+from guirecognizer.instrumentation import Instrumentation, Stage
 from guirecognizer.mouse_helper import MouseHelper
+from guirecognizer.plan import CompiledPlan
 from guirecognizer.preprocessing import (ColorMapMethod, ColorMapPreprocessor,
                                          GrayscalePreprocessor, Preprocessing,
                                          ResizeMethod, ResizePreprocessor,
                                          ThresholdMethod,
                                          ThresholdPreprocessor, ThresholdType)
 from guirecognizer.preprocessing_type import PreprocessingType
+from guirecognizer.recent_locations import RecentLocations
 from guirecognizer.recognizer import OcrType, Recognizer
+from guirecognizer.template_pyramid import (TemplatePyramid,
+                                            TemplatePyramidCache)
+from guirecognizer.watcher import WatchEvent, Watcher
 
 """A library to help recognize some patterns on screen and make GUI actions."""
 
@@ -0,0 +1,83 @@
+from typing import TYPE_CHECKING
+
+from imagehash import ImageHash
+from PIL import Image
+
+from guirecognizer.action_type import ActionType
+from guirecognizer.types import AreaCoord, Coord, PixelColor, Ratios
+
+if TYPE_CHECKING:
+  from guirecognizer.recent_locations import RecentLocations
+  from guirecognizer.recognizer import ResizeInterval
+  from guirecognizer.template_pyramid import TemplatePyramid
+
+
+class Action:
+  """
+  Action loaded from the config data with the data derived from it, computed once when it's loaded.
+
+  The absolute coordinates are computed again only when the borders change.
+  """
+  __slots__ = ('id', 'type', 'ratios', 'pixelColor', 'imageHash', 'imageToFind', 'threshold', 'maxResults', 'resizeInterval',
+      'resizeStep', 'searchLevels', 'refineMargin', 'recentMargin', 'captureScale', 'imageToFindImage', 'templatePyramid',
+      'recentLocations', 'rawImageHash', 'resolvedCoord')
+  id: str
+  type: ActionType
+  ratios: Ratios
+  #: Reference pixel color of the pixel color comparisons.
+  pixelColor: PixelColor | None
+  #: Reference image hash of the image hash comparisons.
+  imageHash: str | None
+  #: Base64 image to find of the image search.
+  imageToFind: str | None
+  threshold: int | None
+  maxResults: int | None
+  resizeInterval: 'ResizeInterval | None'
+  #: Difference between two consecutive ratios of the resize interval, None for the default step.
+  resizeStep: float | None
+  #: Number of halvings of the coarse image search, 0 for an exhaustive search.
+  searchLevels: int
+  #: Distance in pixels around a coarse candidate searched at full resolution, None for the default margin.
+  refineMargin: int | None
+  #: Distance in pixels of the area around the recent locations searched first, None to always search the whole area.
+  recentMargin: int | None
+  captureScale: float | None
+  #: Decoded image to find.
+  imageToFindImage: Image.Image | None
+  #: Grayscale pixels and image hashes of the image to find at every size of the resize interval.
+  templatePyramid: 'TemplatePyramid | None'
+  #: Where the image search found its image recently, None without recent margin.
+  recentLocations: 'RecentLocations | None'
+  #: Parsed reference image hash.
+  rawImageHash: tuple[ImageHash, ImageHash] | None
+  #: Borders and the absolute coordinates computed from them.
+  resolvedCoord: tuple[AreaCoord, Coord] | None
+
+  def __init__(self, id: str, type: ActionType, ratios: Ratios) -> None:
+    """
+    :param id:
+    :param type:
+    :param ratios:
+    """
+    self.id = id
+    self.type = type
+    self.ratios = ratios
+    self.pixelColor = None
+    self.imageHash = None
+    self.imageToFind = None
+    self.threshold = None
+    self.maxResults = None
+    self.resizeInterval = None
+    self.resizeStep = None
+    self.searchLevels = 0
+    self.refineMargin = None
+    self.recentMargin = None
+    self.captureScale = None
+    self.imageToFindImage = None
+    self.templatePyramid = None
+    self.recentLocations = None
+    self.rawImageHash = None
+    self.resolvedCoord = None
+
+  def __repr__(self) -> str:
+    return f'Action({self.id!r}, {self.type!r}, {self.ratios!r})'
@@ -0,0 +1,130 @@
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer.types import AreaCoord
+
+
+class ArrayImage:
+  """
+  Image backed by a numpy array of shape (height, width) for grayscale or (height, width, 3 or 4) for RGB or RGBA.
+
+  Crops are views of the same array. The PIL image is only created when it's needed and then kept.
+  """
+  __slots__ = ('array', 'mode', '_image')
+  array: np.ndarray
+  mode: str
+
+  _MODE_BY_NB_CHANNELS = {3: 'RGB', 4: 'RGBA'}
+
+  def __init__(self, array: np.ndarray, image: Image.Image | None=None) -> None:
+    """
+    :param array: uint8 array of shape (height, width), (height, width, 3) or (height, width, 4)
+    :param image: (optional) PIL image with the same pixels
+    :raise ValueError: invalid `array`
+    """
+    if array.dtype != np.uint8:
+      raise ValueError('Invalid array: expects an array of type uint8.')
+    if array.ndim == 2:
+      self.mode = 'L'
+    elif array.ndim == 3 and array.shape[2] in self._MODE_BY_NB_CHANNELS:
+      self.mode = self._MODE_BY_NB_CHANNELS[array.shape[2]]
+    else:
+      raise ValueError('Invalid array: expects a shape (height, width), (height, width, 3) or (height, width, 4).')
+    self.array = array
+    self._image = image
+
+  @classmethod
+  def fromImage(cls, image: Image.Image) -> 'ArrayImage':
+    """
+    Copy the pixels of a PIL image. Modes other than L, RGB and RGBA are converted to RGB or RGBA.
+
+    :param image:
+    """
+    if image.mode not in ('L', 'RGB', 'RGBA'):
+      image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    return cls(np.asarray(image), image)
+
+  @classmethod
+  def isArrayDataValid(cls, arrayData: Any) -> bool:
+    """
+    :param arrayData:
+    """
+    return isinstance(arrayData, np.ndarray) and arrayData.dtype == np.uint8 and arrayData.shape[0] != 0 \
+        and (arrayData.ndim == 2 or (arrayData.ndim == 3 and arrayData.shape[2] in cls._MODE_BY_NB_CHANNELS)) \
+        and arrayData.shape[1] != 0
+
+  @property
+  def width(self) -> int:
+    return self.array.shape[1]
+
+  @property
+  def height(self) -> int:
+    return self.array.shape[0]
+
+  @property
+  def size(self) -> tuple[int, int]:
+    return (self.array.shape[1], self.array.shape[0])
+
+  def crop(self, coord: AreaCoord) -> 'ArrayImage':
+    """
+    Return a view of the area. Like PIL, pixels outside of the image are black and only then the pixels are copied.
+
+    :param coord: coordinates relative to the image
+    """
+    left, top, right, bottom = coord
+    if 0 <= left and 0 <= top and right <= self.width and bottom <= self.height:
+      return ArrayImage(self.array[top:bottom, left:right])
+    shape = (max(bottom - top, 0), max(right - left, 0)) + self.array.shape[2:]
+    array = np.zeros(shape, dtype=np.uint8)
+    clipped = (max(left, 0), max(top, 0), min(right, self.width), min(bottom, self.height))
+    if clipped[0] < clipped[2] and clipped[1] < clipped[3]:
+      array[clipped[1] - top:clipped[3] - top, clipped[0] - left:clipped[2] - left] = \
+          self.array[clipped[1]:clipped[3], clipped[0]:clipped[2]]
+    return ArrayImage(array)
+
+  def getpixel(self, coord: tuple[int, int]) -> Any:
+    """
+    Return the pixel like PIL: an int for grayscale, a tuple otherwise.
+
+    :param coord: coordinates relative to the image
+    """
+    pixel = self.array[coord[1], coord[0]]
+    if self.array.ndim == 2:
+      return int(pixel)
+    return tuple(int(value) for value in pixel)
+
+  def getRgbArray(self) -> np.ndarray:
+    """
+    Return the RGB pixels, a view when the image is RGB or RGBA.
+    """
+    if self.array.ndim == 2:
+      return np.repeat(self.array[:, :, np.newaxis], 3, axis=2)
+    return self.array[:, :, :3]
+
+  def getGrayscaleArray(self) -> np.ndarray:
+    """
+    Return the grayscale pixels with the same rounding as the PIL conversion to mode L.
+    """
+    if self.array.ndim == 2:
+      return self.array
+    rgb = self.array.astype(np.uint32)
+    return ((rgb[:, :, 0] * 19595 + rgb[:, :, 1] * 38470 + rgb[:, :, 2] * 7471 + 0x8000) >> 16).astype(np.uint8)
+
+  def getMeanColor(self) -> tuple[float, ...]:
+    """
+    Return the mean of each band like PIL.ImageStat.
+    """
+    nbPixels = self.width * self.height
+    if self.array.ndim == 2:
+      return (int(self.array.sum(dtype=np.int64)) / nbPixels,)
+    return tuple(int(total) / nbPixels for total in self.array.sum(axis=(0, 1), dtype=np.int64))
+
+  def toImage(self) -> Image.Image:
+    """
+    Return the PIL image, created at the first call.
+    """
+    if self._image is None:
+      self._image = Image.fromarray(np.ascontiguousarray(self.array))
+    return self._image
@@ -0,0 +1,290 @@
+import asyncio
+import contextvars
+import functools
+import time
+from collections.abc import AsyncIterator, Callable, Mapping, Sequence
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar, Unpack, overload
+
+from PIL import Image
+
+from guirecognizer.action_type import ActionType
+from guirecognizer.frame import Frame
+from guirecognizer.plan import CompiledPlan, PlanParams
+from guirecognizer.recognizer import (AnyActionReturnType, ExecuteParams,
+                                      ExecuteRequest, Recognizer)
+from guirecognizer.types import AreaCoord, Coord, PixelColor, Point
+from guirecognizer.watcher import Watcher
+
+T = TypeVar('T')
+
+
+class AsyncRecognizer:
+  """
+  Asyncio interface of a :class:`guirecognizer.Recognizer`.
+
+  Executions run in an executor so that the event loop keeps running the other tasks while the screen is captured,
+  images are searched and texts are read. Every method accepts a **timeout** in seconds and raises TimeoutError
+  when it's exceeded. When a task is cancelled or times out, it stops waiting at once but the execution already running
+  in the executor finishes in the background and its result is dropped.
+
+  .. code-block:: python
+
+    recognizer = AsyncRecognizer(Recognizer('config.json'))
+    async with recognizer.frame():
+      score, coords = await asyncio.gather(recognizer.executeNumber('score'), recognizer.executeFindImage('enemy'))
+  """
+  recognizer: Recognizer
+  executor: Executor | None
+
+  # Parameters giving the pixels of an execution instead of the frame session.
+  _SOURCE_NAMES = ('screenshot', 'screenshotFilepath', 'bordersImage', 'bordersImageFilepath', 'frame')
+
+  def __init__(self, recognizer: Recognizer, executor: Executor | None=None) -> None:
+    """
+    :param recognizer: recognizer executing the actions, it can still be used directly
+    :param executor: (optional) executor running the executions - default: the default executor of the event loop
+    """
+    self.recognizer = recognizer
+    self.executor = executor
+    self._currentFrame: contextvars.ContextVar[Frame | None] = contextvars.ContextVar('currentFrame', default=None)
+
+  @property
+  def currentFrame(self) -> Frame | None:
+    """
+    Frame of the frame session of the current task, see :meth:`frame`.
+    """
+    return self._currentFrame.get()
+
+  @asynccontextmanager
+  async def frame(self, frame: Frame | None=None, timeout: float | None=None) -> AsyncIterator[Frame]:
+    """
+    Capture the borders area once and use it for every execution of the current task inside the async with block.
+
+    Tasks created inside the block, for instance by asyncio.gather, share the frame. See :meth:`guirecognizer.Recognizer.frame`.
+
+    :param frame: (optional) frame to use instead of capturing a new one
+    :param timeout: (optional) maximum duration of the capture in seconds - default: no limit
+    :raise RecognizerValueError: no borders data
+    """
+    if frame is None:
+      frame = await self._run(timeout, self.recognizer.captureFrame)
+    token = self._currentFrame.set(frame)
+    try:
+      yield frame
+    finally:
+      self._currentFrame.reset(token)
+
+  async def _run(self, timeout: float | None, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run the function in the executor and wait for its result.
+
+    :param timeout: maximum duration in seconds, None for no limit
+    :param function:
+    :param args: arguments of the function
+    :param kwargs: keyword arguments of the function
+    :raise TimeoutError: the timeout is exceeded
+    """
+    future = asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+    if timeout is None:
+      return await future
+    return await asyncio.wait_for(future, timeout)
+
+  def _addCurrentFrame(self, kwargs: Any) -> Any:
+    """
+    Add the frame of the frame session to the parameters without pixels.
+
+    :param kwargs: modified in place
+    """
+    frame = self._currentFrame.get()
+    if frame is not None and not any(name in kwargs for name in self._SOURCE_NAMES):
+      kwargs['frame'] = frame
+    return kwargs
+
+  async def executeCoordinates(self, *args: str | ActionType, timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> Coord:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.COORDINATES, timeout=timeout, **kwargs) # type: ignore
+
+  async def executeSelection(self, *args: str | ActionType, timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> Point | Image.Image:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.SELECTION, timeout=timeout, **kwargs) # type: ignore
+
+  async def executeFindImage(self, *args: str | ActionType, timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> list[AreaCoord]:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.FIND_IMAGE, timeout=timeout, **kwargs) # type: ignore
+
+  async def executeClick(self, *args: str | ActionType, timeout: float | None=None, **kwargs: Unpack[ExecuteParams]) -> None:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    await self.execute(*args, expectedActionType=ActionType.CLICK, timeout=timeout, **kwargs)
+
+  async def executePixelColor(self, *args: str | ActionType, timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> PixelColor:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.PIXEL_COLOR, timeout=timeout, **kwargs) # type: ignore
+
+  async def executeComparePixelColor(self, *args: str | ActionType, timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> int | float:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.COMPARE_PIXEL_COLOR, timeout=timeout, **kwargs) # type: ignore
+
+  async def executeIsSamePixelColor(self, *args: str | ActionType, timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> bool:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.IS_SAME_PIXEL_COLOR, timeout=timeout, **kwargs) # type: ignore
+
+  async def executeImageHash(self, *args: str | ActionType, timeout: float | None=None, **kwargs: Unpack[ExecuteParams]) -> str:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.IMAGE_HASH, timeout=timeout, **kwargs) # type: ignore
+
+  async def executeCompareImageHash(self, *args: str | ActionType, timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> int:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.COMPARE_IMAGE_HASH, timeout=timeout, **kwargs) # type: ignore
+
+  async def executeIsSameImageHash(self, *args: str | ActionType, timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> bool:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.IS_SAME_IMAGE_HASH, timeout=timeout, **kwargs) # type: ignore
+
+  async def executeText(self, *args: str | ActionType, timeout: float | None=None, **kwargs: Unpack[ExecuteParams]) -> str:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.TEXT, timeout=timeout, **kwargs) # type: ignore
+
+  async def executeNumber(self, *args: str | ActionType, timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> float | None:
+    """
+    Wrapper with more precise type hinting for :meth:`execute`.
+    """
+    return await self.execute(*args, expectedActionType=ActionType.NUMBER, timeout=timeout, **kwargs) # type: ignore
+
+  async def execute(self, *args: str | ActionType, expectedActionType: ActionType | None=None, timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> AnyActionReturnType:
+    """
+    Return the result of the given action(s), see :meth:`guirecognizer.Recognizer.execute`.
+
+    Inside a frame session, see :meth:`frame`, executions without their own pixels use the frame of the session.
+
+    :param args: Action ids or types. At least one must be given.
+    :param expectedActionType: Expected last action type or through reinterpret option. Raises an exception if wrong type.
+    :param timeout: (optional) maximum duration of the execution in seconds - default: no limit
+    :param kwargs: Extra parameters, see :class:`guirecognizer.recognizer.ExecuteParams`
+    :return: The result of the last action in the pipeline.
+    :raises RecognizerValueError: see :meth:`guirecognizer.Recognizer.execute`
+    :raises TimeoutError: the timeout is exceeded
+    """
+    return await self._run(timeout, self.recognizer.execute, *args, expectedActionType=expectedActionType,
+        **self._addCurrentFrame(kwargs))
+
+  @overload
+  async def executeMany(self, requests: Mapping[Any, ExecuteRequest], timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> dict[Any, AnyActionReturnType]: ...
+  @overload
+  async def executeMany(self, requests: Sequence[ExecuteRequest], timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> list[AnyActionReturnType]: ...
+  async def executeMany(self, requests: Mapping[Any, ExecuteRequest] | Sequence[ExecuteRequest], timeout: float | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> dict[Any, AnyActionReturnType] | list[AnyActionReturnType]:
+    """
+    Execute many pipelines on the same pixels, see :meth:`guirecognizer.Recognizer.executeMany`.
+
+    :param requests: requests in a list or by key in a dict
+    :param timeout: (optional) maximum duration of the executions in seconds - default: no limit
+    :param kwargs: Extra parameters given to every request, see :class:`guirecognizer.recognizer.ExecuteParams`
+    :return: The result of each request, in the same order or by the same key.
+    :raises RecognizerValueError: see :meth:`guirecognizer.Recognizer.executeMany`
+    :raises TimeoutError: the timeout is exceeded
+    """
+    return await self._run(timeout, self.recognizer.executeMany, requests, **self._addCurrentFrame(kwargs))
+
+  async def waitUntil(self, *args: str | ActionType, predicate: Callable[[Any], bool] | None=None,
+      timeout: float | None=None, interval: float=0.01, maxInterval: float=0.5, backoff: float=1.5,
+      expectedActionType: ActionType | None=None, **kwargs: Unpack[ExecuteParams]) -> AnyActionReturnType:
+    """
+    Execute the pipeline until its result satisfies the predicate and return this result,
+    see :meth:`guirecognizer.Recognizer.waitUntil`.
+
+    Each poll runs in the executor and the event loop runs the other tasks between polls. A frame session is ignored.
+
+    :param args: Action ids or types. At least one must be given.
+    :param predicate: (optional) condition on the result - default: the result is truthy
+    :param timeout: (optional) maximum duration of the wait in seconds - default: no limit
+    :param interval: (optional) first interval between two polls in seconds - default: 0.01
+    :param maxInterval: (optional) maximum interval between two polls in seconds - default: 0.5
+    :param backoff: (optional) factor applied to the interval after each poll - default: 1.5
+    :param expectedActionType: Expected last action type or through reinterpret option. Raises an exception if wrong type.
+    :param kwargs: Extra parameters given to every execution, see :class:`guirecognizer.recognizer.ExecuteParams`
+    :return: The first result satisfying the predicate.
+    :raises RecognizerValueError: same as :meth:`execute` or invalid wait parameter
+    :raises TimeoutError: the predicate is still not satisfied after the timeout
+    """
+    self.recognizer._checkWaitParams(timeout, interval, maxInterval, backoff)
+    plan = self.recognizer.compile(*args, expectedActionType=expectedActionType, **kwargs)
+    if predicate is None:
+      predicate = bool
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+      result = await self._run(None if deadline is None else max(deadline - time.monotonic(), 0), plan)
+      if predicate(result):
+        return result
+      remaining = None if deadline is None else deadline - time.monotonic()
+      if remaining is not None and remaining <= 0:
+        raise TimeoutError(f'{plan!r} did not satisfy the predicate after {timeout} seconds.')
+      await asyncio.sleep(interval if remaining is None else min(interval, remaining))
+      interval = min(interval * backoff, maxInterval)
+
+  def watch(self, requests: Mapping[Any, ExecuteRequest] | Sequence[ExecuteRequest], rate: float=10,
+      **kwargs: Unpack[ExecuteParams]) -> Watcher:
+    """
+    Return an async iterator yielding an event each time the result of a request changes,
+    see :meth:`guirecognizer.Recognizer.watch`. The polls run in the executor.
+
+    .. code-block:: python
+
+      async for event in recognizer.watch(['score', 'isGameOver']):
+        print(event.key, event.result)
+
+    :param requests: requests in a list or by key in a dict
+    :param rate: (optional) number of polls per second - default: 10
+    :param kwargs: Extra parameters given to every request, see :class:`guirecognizer.recognizer.ExecuteParams`
+    :raises RecognizerValueError: see :meth:`guirecognizer.Recognizer.watch`
+    """
+    watcher = self.recognizer.watch(requests, rate, **kwargs)
+    watcher.executor = self.executor
+    return watcher
+
+  async def executePlan(self, plan: CompiledPlan, timeout: float | None=None, **kwargs: Unpack[PlanParams]) -> AnyActionReturnType:
+    """
+    Execute a compiled plan, see :meth:`guirecognizer.Recognizer.compile`.
+
+    :param plan:
+    :param timeout: (optional) maximum duration of the execution in seconds - default: no limit
+    :param kwargs: Images or frame to use, see :class:`guirecognizer.plan.PlanParams`
+    :return: The result of the last action in the pipeline.
+    :raises TimeoutError: the timeout is exceeded
+    """
+    return await self._run(timeout, plan, **self._addCurrentFrame(kwargs))
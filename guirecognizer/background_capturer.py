@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from guirecognizer.capture import CaptureBackend
+from guirecognizer.common import RecognizerValueError
+from guirecognizer.frame import Frame
+from guirecognizer.types import AreaCoord
+
+logger = logging.getLogger(__name__)
+
+class BackgroundCapturer:
+  """
+  Capture the borders area in a background thread at a given rate into a bounded ring buffer of frames.
+
+  See :meth:`guirecognizer.Recognizer.startBackgroundCapture`.
+  """
+  nbCapturedFrames: int
+  nbDroppedFrames: int
+
+  def __init__(self, captureBackend: CaptureBackend, borders: AreaCoord, rate: float=30, bufferSize: int=4,
+      maxFrameAge: float | None=None, maxUnreadFrames: int | None=None, allScreens: bool=False) -> None:
+    """
+    :param captureBackend: backend used to grab the borders area
+    :param borders: absolute coordinates of the area to capture
+    :param rate: (optional) maximum number of captures per second - default: 30
+    :param bufferSize: (optional) maximum number of frames kept, the oldest frame is dropped first - default: 4
+    :param maxFrameAge: (optional) frames older than this duration in seconds are dropped - default: no limit
+    :param maxUnreadFrames: (optional) pause the capture when this number of frames has been captured
+      since the last read - default: never pause
+    :param allScreens: (optional) grab all monitors - default: False
+    :raise RecognizerValueError: invalid parameter
+    """
+    if not isinstance(rate, (int, float)) or rate <= 0:
+      raise RecognizerValueError('Invalid rate value: expects a positive number.')
+    if not isinstance(bufferSize, int) or bufferSize <= 0:
+      raise RecognizerValueError('Invalid bufferSize value: expects a positive integer.')
+    if maxFrameAge is not None and (not isinstance(maxFrameAge, (int, float)) or maxFrameAge <= 0):
+      raise RecognizerValueError('Invalid maxFrameAge value: expects a positive number.')
+    if maxUnreadFrames is not None and (not isinstance(maxUnreadFrames, int) or maxUnreadFrames <= 0):
+      raise RecognizerValueError('Invalid maxUnreadFrames value: expects a positive integer.')
+    self.captureBackend = captureBackend
+    self.borders = borders
+    self.period = 1 / rate
+    self.maxFrameAge = maxFrameAge
+    self.maxUnreadFrames = maxUnreadFrames
+    self.allScreens = allScreens
+    self.nbCapturedFrames = 0
+    self.nbDroppedFrames = 0
+    self._frames: deque[Frame] = deque(maxlen=bufferSize)
+    self._nbUnreadFrames = 0
+    self._condition = threading.Condition()
+    self._stopEvent = threading.Event()
+    self._thread = None
+    self._error = None
+
+  @property
+  def isRunning(self) -> bool:
+    """
+    Whether the capture thread is running.
+    """
+    return self._thread is not None and self._thread.is_alive()
+
+  def start(self) -> None:
+    """
+    Start the capture thread. Does nothing if it's already running.
+    """
+    if self.isRunning:
+      return
+    self._stopEvent.clear()
+    self._error = None
+    self._thread = threading.Thread(target=self._run, name='guirecognizer-capture', daemon=True)
+    self._thread.start()
+
+  def stop(self) -> None:
+    """
+    Stop the capture thread and wait for it to finish.
+    """
+    self._stopEvent.set()
+    with self._condition:
+      self._condition.notify_all()
+    if self._thread is not None and self._thread is not threading.current_thread():
+      self._thread.join()
+    self._thread = None
+
+  def _run(self) -> None:
+    nextCaptureTime = time.monotonic()
+    while not self._stopEvent.is_set():
+      with self._condition:
+        # Back-pressure: no need to capture frames nobody reads.
+        while self.maxUnreadFrames is not None and self._nbUnreadFrames >= self.maxUnreadFrames and not self._stopEvent.is_set():
+          self._condition.wait()
+      if self._stopEvent.is_set():
+        break
+      try:
+        frame = self._capture()
+      except Exception as e:
+        logger.exception('Background capture failed.')
+        with self._condition:
+          self._error = e
+          self._condition.notify_all()
+        return
+      with self._condition:
+        if len(self._frames) == self._frames.maxlen:
+          self.nbDroppedFrames += 1
+        self._frames.append(frame)
+        self._dropStaleFrames()
+        self.nbCapturedFrames += 1
+        self._nbUnreadFrames += 1
+        self._condition.notify_all()
+      nextCaptureTime += self.period
+      now = time.monotonic()
+      # When a capture takes longer than the period, missed captures are skipped instead of piling up.
+      if nextCaptureTime < now:
+        nextCaptureTime = now
+      self._stopEvent.wait(nextCaptureTime - now)
+    with self._condition:
+      self._condition.notify_all()
+
+  def _capture(self) -> Frame:
+    timestamp = time.time()
+    monotonicTimestamp = time.monotonic()
+    borders = self.borders
+    image = self.captureBackend.grabArea(borders, self.allScreens)
+    return Frame(image, borders, timestamp, monotonicTimestamp, time.monotonic() - monotonicTimestamp)
+
+  def _dropStaleFrames(self) -> None:
+    """
+    Assume the condition lock is held.
+    """
+    if self.maxFrameAge is None:
+      return
+    while len(self._frames) > 0 and self._frames[0].age > self.maxFrameAge:
+      self._frames.popleft()
+      self.nbDroppedFrames += 1
+
+  def getFrames(self) -> list[Frame]:
+    """
+    Return the buffered frames from the oldest to the newest.
+    """
+    with self._condition:
+      self._dropStaleFrames()
+      return list(self._frames)
+
+  def getLatestFrame(self) -> Frame | None:
+    """
+    Return the newest frame or None if there is no frame or if it's too old.
+    """
+    with self._condition:
+      self._dropStaleFrames()
+      if len(self._frames) == 0:
+        return None
+      self._markRead()
+      return self._frames[-1]
+
+  def waitForFrame(self, newerThan: float | None=None, timeout: float | None=None) -> Frame:
+    """
+    Return the newest frame, waiting for one captured after `newerThan` if necessary.
+
+    :param newerThan: (optional) monotonic timestamp as returned by time.monotonic() - default: any frame
+    :param timeout: (optional) maximum waiting duration in seconds - default: no limit
+    :raise TimeoutError: no frame after `timeout`
+    :raise RecognizerValueError: the capture thread is not running
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with self._condition:
+      while True:
+        if self._error is not None:
+          raise RecognizerValueError(f'Background capture failed: {self._error}')
+        self._dropStaleFrames()
+        if len(self._frames) > 0 and (newerThan is None or self._frames[-1].monotonicTimestamp > newerThan):
+          self._markRead()
+          return self._frames[-1]
+        if not self.isRunning:
+          raise RecognizerValueError('Background capture is not running.')
+        # Waiting for a frame counts as a read, otherwise a paused capture would never resume.
+        self._markRead()
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+          raise TimeoutError('No new frame has been captured in time.')
+        # A stale frame may be dropped while waiting, so the wait is bounded by the capture period.
+        self._condition.wait(self.period if remaining is None else min(remaining, self.period))
+
+  def _markRead(self) -> None:
+    """
+    Assume the condition lock is held.
+    """
+    if self._nbUnreadFrames > 0:
+      self._nbUnreadFrames = 0
+      self._condition.notify_all()
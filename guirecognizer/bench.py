@@ -0,0 +1,163 @@
+import argparse
+import json
+import math
+import time
+from collections.abc import Sequence
+from typing import TypedDict, Unpack
+
+from PIL import Image
+
+from guirecognizer.action_type import ActionType
+from guirecognizer.common import RecognizerValueError
+from guirecognizer.instrumentation import Stage
+from guirecognizer.recognizer import ExecuteParams, Recognizer
+
+#: Stages shown by the benchmark, the action stage is the whole execution.
+BENCHMARK_STAGES = (Stage.CAPTURE, Stage.PREPROCESSING, Stage.MATCH_TEMPLATE, Stage.HASH_VERIFICATION, Stage.IMAGE_HASH, Stage.OCR)
+
+
+class ActionBenchmarkDict(TypedDict):
+  actionId: str
+  actionType: str
+  #: Number of measured executions.
+  count: int
+  #: Latencies in seconds.
+  mean: float
+  p50: float
+  p95: float
+  p99: float
+  #: Mean duration of each stage in an execution in seconds.
+  stages: dict[str, float]
+  #: Why the action was not measured, None if it was.
+  error: str | None
+
+
+def getPercentile(sortedDurations: Sequence[float], percent: float) -> float:
+  """
+  Return the nearest-rank percentile.
+
+  :param sortedDurations: durations sorted in increasing order
+  :param percent: between 0 and 100
+  """
+  if len(sortedDurations) == 0:
+    return 0
+  rank = max(math.ceil(percent / 100 * len(sortedDurations)), 1)
+  return sortedDurations[rank - 1]
+
+def benchmarkActions(recognizer: Recognizer, nbIterations: int=20, nbWarmups: int=1, actionIds: Sequence[str] | None=None,
+    **kwargs: Unpack[ExecuteParams]) -> list[ActionBenchmarkDict]:
+  """
+  Execute every action several times and return its latencies and the time spent in each stage.
+
+  Click actions are not executed. An action failing, for instance because an OCR engine is not installed, gets an error
+  instead of measures. The instrumentation of the recognizer is replaced during the benchmark and restored after it.
+
+  :param recognizer:
+  :param nbIterations: (optional) number of measured executions of each action - default: 20
+  :param nbWarmups: (optional) number of executions of each action before the measures - default: 1
+  :param actionIds: (optional) default: every action of the recognizer
+  :param kwargs: Extra parameters of the executions like `screenshot` or `preprocessing`,
+      see :class:`guirecognizer.recognizer.ExecuteParams`
+  :raise RecognizerValueError: invalid number of iterations or warmups or unknown action id
+  """
+  if not isinstance(nbIterations, int) or nbIterations <= 0:
+    raise RecognizerValueError('Invalid number of iterations: expects a positive integer.')
+  if not isinstance(nbWarmups, int) or nbWarmups < 0:
+    raise RecognizerValueError('Invalid number of warmups: expects a non-negative integer.')
+  if actionIds is None:
+    actionIds = list(recognizer.actionById)
+  for actionId in actionIds:
+    if actionId not in recognizer.actionById:
+      raise RecognizerValueError(f'Unknown action id \'{actionId}\'.')
+
+  previousInstrumentation = recognizer.instrumentation
+  results = []
+  try:
+    for actionId in actionIds:
+      action = recognizer.actionById[actionId]
+      result: ActionBenchmarkDict = {'actionId': actionId, 'actionType': action.type.value, 'count': 0, 'mean': 0, 'p50': 0,
+          'p95': 0, 'p99': 0, 'stages': {}, 'error': None}
+      results.append(result)
+      if action.type == ActionType.CLICK:
+        result['error'] = 'click actions are not executed'
+        continue
+      try:
+        recognizer.disableInstrumentation()
+        for _ in range(nbWarmups):
+          recognizer.execute(actionId, **kwargs)
+        instrumentation = recognizer.enableInstrumentation()
+        durations = []
+        for _ in range(nbIterations):
+          start = time.perf_counter()
+          recognizer.execute(actionId, **kwargs)
+          durations.append(time.perf_counter() - start)
+      except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+        continue
+      durations.sort()
+      result.update({'count': nbIterations, 'mean': sum(durations) / nbIterations, 'p50': getPercentile(durations, 50),
+          'p95': getPercentile(durations, 95), 'p99': getPercentile(durations, 99)})
+      statsByStage = instrumentation.getStats()['actions'].get(actionId, {})
+      result['stages'] = {str(stage): statsByStage[stage]['total'] / nbIterations for stage in BENCHMARK_STAGES if stage in statsByStage}
+  finally:
+    recognizer.instrumentation = previousInstrumentation
+  return results
+
+def formatBenchmark(results: Sequence[ActionBenchmarkDict]) -> str:
+  """
+  Return a table of the latencies and stage durations in milliseconds, one action per row.
+
+  :param results: as returned by :func:`benchmarkActions`
+  """
+  idWidth = max([len('action')] + [len(result['actionId']) for result in results])
+  typeWidth = max([len('type')] + [len(result['actionType']) for result in results])
+  columns = ['p50', 'p95', 'p99'] + [str(stage) for stage in BENCHMARK_STAGES]
+  widths = [max(len(column), 8) for column in columns]
+  lines = [f'{"action":<{idWidth}}  {"type":<{typeWidth}}' + ''.join(f'  {column:>{width}}' for column, width in zip(columns, widths))]
+  for result in results:
+    line = f'{result["actionId"]:<{idWidth}}  {result["actionType"]:<{typeWidth}}'
+    if result['error'] is not None:
+      lines.append(f'{line}  {result["error"]}')
+      continue
+    values = [result['p50'], result['p95'], result['p99']] + [result['stages'].get(str(stage)) for stage in BENCHMARK_STAGES]
+    line += ''.join(f'  {"-":>{width}}' if value is None else f'  {value * 1000:>{width}.3f}' for value, width in zip(values, widths))
+    lines.append(line)
+  lines.append('Latencies and mean stage durations per execution in milliseconds.')
+  return '\n'.join(lines)
+
+def main(argv: Sequence[str] | None=None) -> None:
+  """
+  Command line interface, see `python -m guirecognizer --help`.
+
+  :param argv: (optional) default: arguments of the command line
+  """
+  parser = argparse.ArgumentParser(prog='python -m guirecognizer', description='Tools for guirecognizer configs.')
+  subparsers = parser.add_subparsers(dest='command', required=True)
+  benchParser = subparsers.add_parser('bench', help='measure the latency of every action of a config',
+      description='Execute every action of a config several times and print its latency percentiles and the time spent'
+      ' in each stage. Click actions are not executed. Without screenshot, the screen is captured.')
+  benchParser.add_argument('config', help='json config file')
+  benchParser.add_argument('--screenshot', help='image of the whole screen the actions are executed on')
+  benchParser.add_argument('--iterations', type=int, default=20, help='number of measured executions of each action')
+  benchParser.add_argument('--warmups', type=int, default=1, help='number of executions of each action before the measures')
+  benchParser.add_argument('--actions', nargs='+', help='ids of the measured actions, default: every action')
+  benchParser.add_argument('--preprocessing', help='id of a preprocessing operation applied by every execution')
+  benchParser.add_argument('--sort', choices=['config', 'p50', 'p95', 'p99'], default='config',
+      help='order of the actions, the slowest first when sorted by latency')
+  benchParser.add_argument('--json', action='store_true', help='print the results as json instead of a table')
+  args = parser.parse_args(argv)
+
+  kwargs: ExecuteParams = {}
+  if args.screenshot is not None:
+    with Image.open(args.screenshot) as image:
+      kwargs['screenshot'] = image.convert('RGB')
+  if args.preprocessing is not None:
+    kwargs['preprocessing'] = args.preprocessing
+  try:
+    recognizer = Recognizer(args.config)
+    results = benchmarkActions(recognizer, args.iterations, args.warmups, args.actions, **kwargs)
+  except RecognizerValueError as e:
+    parser.exit(2, f'error: {e}\n')
+  if args.sort != 'config':
+    results.sort(key=lambda result: result[args.sort], reverse=True)
+  print(json.dumps(results, indent=2) if args.json else formatBenchmark(results))
@@ -0,0 +1,502 @@
+import ctypes
+import ctypes.util
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import numpy as np
+from PIL import Image, ImageGrab
+
+from guirecognizer.common import RecognizerValueError
+from guirecognizer.types import AreaCoord, Coord, Point
+
+
+def scaleImage(image: Image.Image, scale: float) -> Image.Image:
+  """
+  Downsample an image by a scale factor in (0, 1]. Integer reduction factors use a fast box reduction.
+
+  :param image:
+  :param scale:
+  """
+  if scale == 1:
+    return image
+  factor = 1 / scale
+  if abs(factor - round(factor)) < 1e-9:
+    return image.reduce(round(factor))
+  return image.resize((max(round(image.width * scale), 1), max(round(image.height * scale), 1)), Image.Resampling.BOX)
+
+class CaptureBackend(ABC):
+  """
+  Grab pixels from the screen.
+
+  Every live capture of a :class:`guirecognizer.Recognizer` goes through its capture backend.
+  """
+
+  @abstractmethod
+  def grabArea(self, coord: AreaCoord, allScreens: bool=False) -> Image.Image:
+    """
+    :param coord: absolute coordinates
+    :param allScreens: (optional) grab all monitors - default: False
+    """
+    pass
+
+  def grabAreaScaled(self, coord: AreaCoord, scale: float, allScreens: bool=False) -> Image.Image:
+    """
+    Grab an area downsampled by a scale factor.
+
+    :param coord: absolute coordinates
+    :param scale: scale factor in (0, 1]
+    :param allScreens: (optional) grab all monitors - default: False
+    """
+    return scaleImage(self.grabArea(coord, allScreens), scale)
+
+  def grabPoint(self, coord: Coord, allScreens: bool=False) -> Point:
+    """
+    :param coord: absolute coordinates
+    :param allScreens: (optional) grab all monitors - default: False
+    :return: rgb colors - If outside screen (0, 0, 0).
+    """
+    image = self.grabArea((coord[0], coord[1], coord[0] + 1, coord[1] + 1), allScreens)
+    return image.getpixel((0, 0)) # type: ignore
+
+  @contextmanager
+  def grabBatch(self) -> Iterator[None]:
+    """
+    Group grabs which must show the same state of the screen, as the regions of one frame.
+    Live backends grab the screen as it is and do nothing.
+    """
+    yield
+
+  def close(self) -> None:
+    """
+    Release the resources of the backend.
+    """
+    pass
+
+  def __enter__(self) -> 'CaptureBackend':
+    return self
+
+  def __exit__(self, *args) -> None:
+    self.close()
+
+class PilCaptureBackend(CaptureBackend):
+  """
+  Grab the screen with PIL.ImageGrab. Default backend, available on every platform supported by pillow.
+  """
+
+  def grabArea(self, coord: AreaCoord, allScreens: bool=False) -> Image.Image:
+    return ImageGrab.grab(coord, all_screens=allScreens) # type: ignore
+
+class ReplayCaptureBackend(CaptureBackend):
+  """
+  Grab the frames of a recorded session instead of the screen.
+
+  The source can be a directory of images read in filename order, a numpy file *.npy* of a stack of RGB or RGBA frames,
+  a numpy file *.npz* of a stack or of one frame per array, or a video file decoded with OpenCV.
+
+  By default, every grab moves to the next frame, as fast as possible. In real time, the frame is chosen
+  from the time elapsed since the first grab. The grabs of a batch, see :meth:`grabBatch`, all read the same frame.
+  """
+  frameIndex: int
+
+  def __init__(self, source: str, realTime: bool=False, fps: float | None=None, loop: bool=False,
+      origin: tuple[int, int]=(0, 0)) -> None:
+    """
+    :param source: filepath of a directory of images, of a numpy file or of a video
+    :param realTime: (optional) pace the frames in real time instead of moving to the next frame at every grab - default: False
+    :param fps: (optional) number of frames per second of the recording - default: frame rate of the video or 30
+    :param loop: (optional) go back to the first frame after the last one - default: False
+    :param origin: (optional) absolute screen coordinates of the top left pixel of the frames - default: (0, 0)
+    :raise OSError: the source cannot be read
+    :raise RecognizerValueError: invalid `fps`
+    """
+    if fps is not None and (not isinstance(fps, (int, float)) or fps <= 0):
+      raise RecognizerValueError('Invalid fps value: expects a positive number.')
+    self.realTime = realTime
+    self.loop = loop
+    self.origin = origin
+    self.frameIndex = -1
+    self._lock = threading.Lock()
+    self._batch = threading.local()
+    self._startTime = None
+    self._image = None
+    self._imageIndex = None
+    self._filepaths = None
+    self._frames = None
+    self._video = None
+    if os.path.isdir(source):
+      self._filepaths = sorted(os.path.join(source, filename) for filename in os.listdir(source)
+          if os.path.isfile(os.path.join(source, filename)))
+      self.nbFrames = len(self._filepaths)
+    elif source.endswith('.npy'):
+      self._frames = np.load(source, mmap_mode='r')
+      self.nbFrames = len(self._frames)
+    elif source.endswith('.npz'):
+      with np.load(source) as data:
+        arrays = [data[name] for name in data.files]
+      self._frames = arrays[0] if len(arrays) == 1 and arrays[0].ndim == 4 else arrays
+      self.nbFrames = len(self._frames)
+    else:
+      import cv2 as cv
+      self._video = cv.VideoCapture(source)
+      if not self._video.isOpened():
+        raise OSError(f'Could not open the video \'{source}\'.')
+      self.nbFrames = int(self._video.get(cv.CAP_PROP_FRAME_COUNT))
+      if fps is None and self._video.get(cv.CAP_PROP_FPS) > 0:
+        fps = self._video.get(cv.CAP_PROP_FPS)
+    if self.nbFrames == 0:
+      self.close()
+      raise OSError(f'No frame in \'{source}\'.')
+    self.fps = 30 if fps is None else fps
+
+  def rewind(self) -> None:
+    """
+    Start again from the first frame.
+    """
+    with self._lock:
+      self.frameIndex = -1
+      self._startTime = None
+
+  def _getNextFrameIndex(self) -> int:
+    """
+    :raise EOFError: no frame left
+    """
+    if self.realTime:
+      now = time.monotonic()
+      if self._startTime is None:
+        self._startTime = now
+      index = int((now - self._startTime) * self.fps)
+    else:
+      index = self.frameIndex + 1
+    if index >= self.nbFrames:
+      if not self.loop:
+        raise EOFError('No frame left in the recording.')
+      index %= self.nbFrames
+    return index
+
+  def _readImage(self, index: int) -> Image.Image:
+    """
+    :param index:
+    :raise OSError: the frame cannot be read
+    """
+    if self._filepaths is not None:
+      with Image.open(self._filepaths[index]) as image:
+        image.load()
+        return image.copy()
+    if self._frames is not None:
+      return Image.fromarray(np.ascontiguousarray(self._frames[index]))
+    import cv2 as cv
+    assert self._video is not None
+    if self._imageIndex is None or index != self._imageIndex + 1:
+      self._video.set(cv.CAP_PROP_POS_FRAMES, index)
+    isRead, bgrFrame = self._video.read()
+    if not isRead:
+      raise OSError(f'Could not read the frame {index} of the video.')
+    return Image.fromarray(cv.cvtColor(bgrFrame, cv.COLOR_BGR2RGB))
+
+  def _getImage(self) -> Image.Image:
+    """
+    Return the image of the frame to grab: the frame of the batch of the current thread or the next one.
+
+    :raise EOFError: no frame left
+    """
+    with self._lock:
+      index = getattr(self._batch, 'frameIndex', None)
+      if index is None:
+        self.frameIndex = self._getNextFrameIndex()
+        index = self.frameIndex
+      if index != self._imageIndex:
+        self._image = self._readImage(index)
+        self._imageIndex = index
+      assert self._image is not None
+      return self._image
+
+  @contextmanager
+  def grabBatch(self) -> Iterator[None]:
+    """
+    Move to the next frame once: every grab of the current thread in the batch reads this frame.
+    A nested batch reads the frame of the outer one.
+
+    :raise EOFError: no frame left
+    """
+    if getattr(self._batch, 'frameIndex', None) is not None:
+      yield
+      return
+    with self._lock:
+      self.frameIndex = self._getNextFrameIndex()
+      self._batch.frameIndex = self.frameIndex
+    try:
+      yield
+    finally:
+      self._batch.frameIndex = None
+
+  def grabArea(self, coord: AreaCoord, allScreens: bool=False) -> Image.Image:
+    """
+    :param coord: absolute coordinates - pixels outside of the frame are black
+    :param allScreens: (optional) ignored
+    :raise EOFError: no frame left
+    """
+    image = self._getImage()
+    return image.crop((coord[0] - self.origin[0], coord[1] - self.origin[1], coord[2] - self.origin[0], coord[3] - self.origin[1]))
+
+  def close(self) -> None:
+    if self._video is not None:
+      self._video.release()
+      self._video = None
+
+class _XShmSegmentInfo(ctypes.Structure):
+  _fields_ = [
+    ('shmseg', ctypes.c_ulong),
+    ('shmid', ctypes.c_int),
+    ('shmaddr', ctypes.c_void_p),
+    ('readOnly', ctypes.c_int),
+  ]
+
+class _XImage(ctypes.Structure):
+  _fields_ = [
+    ('width', ctypes.c_int),
+    ('height', ctypes.c_int),
+    ('xoffset', ctypes.c_int),
+    ('format', ctypes.c_int),
+    ('data', ctypes.c_void_p),
+    ('byte_order', ctypes.c_int),
+    ('bitmap_unit', ctypes.c_int),
+    ('bitmap_bit_order', ctypes.c_int),
+    ('bitmap_pad', ctypes.c_int),
+    ('depth', ctypes.c_int),
+    ('bytes_per_line', ctypes.c_int),
+    ('bits_per_pixel', ctypes.c_int),
+    ('red_mask', ctypes.c_ulong),
+    ('green_mask', ctypes.c_ulong),
+    ('blue_mask', ctypes.c_ulong),
+    ('obdata', ctypes.c_void_p),
+    ('f', ctypes.c_void_p * 6),
+  ]
+
+class XShmCaptureBackend(CaptureBackend):
+  """
+  Grab the screen of an X11 display with the MIT-SHM extension.
+
+  The X server writes the pixels directly into a shared memory segment allocated once for the whole screen.
+  :meth:`grabAreaArray` returns a numpy view of this segment without any copy or allocation.
+  The other grabs convert the pixels while holding the lock of the backend and can be called from several threads.
+  Only available on Linux with an X11 display, including Xvfb.
+  """
+
+  _ZPIXMAP = 2
+  _IPC_PRIVATE = 0
+  _IPC_CREAT = 0o1000
+  _IPC_RMID = 0
+  _ALL_PLANES = ctypes.c_ulong(-1)
+
+  def __init__(self, display: str | None=None) -> None:
+    """
+    :param display: (optional) X11 display name - default: value of the environment variable DISPLAY
+    :raise OSError: X11 or its MIT-SHM extension is not available
+    """
+    self._lock = threading.Lock()
+    self._display = None
+    self._shmInfo = None
+    self._ximageBySize = {}
+    self._loadLibraries()
+
+    self._display = self._x11.XOpenDisplay(display.encode() if display is not None else None)
+    if not self._display:
+      raise OSError('Could not open the X11 display.')
+    if not self._xext.XShmQueryExtension(self._display):
+      self.close()
+      raise OSError('The X11 display does not support the MIT-SHM extension.')
+    screen = self._x11.XDefaultScreen(self._display)
+    self._root = self._x11.XDefaultRootWindow(self._display)
+    self._visual = self._x11.XDefaultVisual(self._display, screen)
+    self._depth = self._x11.XDefaultDepth(self._display, screen)
+    self.screenSize = (self._x11.XDisplayWidth(self._display, screen), self._x11.XDisplayHeight(self._display, screen))
+    if self._depth not in (24, 32):
+      self.close()
+      raise OSError(f'Unsupported X11 display depth {self._depth}.')
+
+    # One segment large enough for the whole screen is shared by the images of every size.
+    size = self.screenSize[0] * self.screenSize[1] * 4
+    self._shmInfo = _XShmSegmentInfo()
+    self._shmInfo.shmid = self._libc.shmget(self._IPC_PRIVATE, size, self._IPC_CREAT | 0o600)
+    if self._shmInfo.shmid < 0:
+      self._shmInfo = None
+      self.close()
+      raise OSError('Could not allocate the shared memory segment.')
+    self._shmInfo.shmaddr = self._libc.shmat(self._shmInfo.shmid, None, 0)
+    self._shmInfo.readOnly = 0
+    if not self._xext.XShmAttach(self._display, ctypes.byref(self._shmInfo)):
+      self.close()
+      raise OSError('Could not attach the shared memory segment to the X11 display.')
+    self._x11.XSync(self._display, 0)
+    # The segment is destroyed as soon as both the X server and this process detach from it.
+    self._libc.shmctl(self._shmInfo.shmid, self._IPC_RMID, None)
+    self._buffer = np.ctypeslib.as_array(ctypes.cast(self._shmInfo.shmaddr, ctypes.POINTER(ctypes.c_uint8)), shape=(size,))
+
+  def _loadLibraries(self) -> None:
+    """
+    :raise OSError: a library is missing
+    """
+    libraries = {}
+    for name in ['X11', 'Xext', 'c']:
+      filepath = ctypes.util.find_library(name)
+      if filepath is None:
+        raise OSError(f'Library {name} is not available.')
+      libraries[name] = ctypes.CDLL(filepath)
+    self._x11 = libraries['X11']
+    self._xext = libraries['Xext']
+    self._libc = libraries['c']
+
+    self._x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    self._x11.XOpenDisplay.restype = ctypes.c_void_p
+    self._x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    self._x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    self._x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    self._x11.XDefaultRootWindow.restype = ctypes.c_ulong
+    self._x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    self._x11.XDefaultVisual.restype = ctypes.c_void_p
+    self._x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    self._x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    self._x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    self._x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    self._x11.XDestroyImage.argtypes = [ctypes.POINTER(_XImage)]
+    self._xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+    self._xext.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p,
+        ctypes.POINTER(_XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint]
+    self._xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+    self._xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+    self._xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+    self._xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage), ctypes.c_int, ctypes.c_int,
+        ctypes.c_ulong]
+    self._libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+    self._libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    self._libc.shmat.restype = ctypes.c_void_p
+    self._libc.shmdt.argtypes = [ctypes.c_void_p]
+    self._libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+  def _getXImage(self, width: int, height: int) -> ctypes._Pointer:
+    """
+    Return an image of the given size backed by the shared memory segment.
+
+    :param width:
+    :param height:
+    """
+    ximage = self._ximageBySize.get((width, height))
+    if ximage is None:
+      assert self._shmInfo is not None
+      ximage = self._xext.XShmCreateImage(self._display, self._visual, self._depth, self._ZPIXMAP, None,
+          ctypes.byref(self._shmInfo), width, height)
+      if not ximage:
+        raise OSError('Could not create the shared memory image.')
+      ximage.contents.data = self._shmInfo.shmaddr
+      self._ximageBySize[(width, height)] = ximage
+    return ximage
+
+  def _grabLocked(self, coord: AreaCoord) -> np.ndarray:
+    """
+    Return the pixels of the area as a BGRA numpy array, a view of the shared memory segment when the area is inside
+    the screen. The lock must be held until the array is no longer read.
+
+    :param coord: absolute coordinates
+    :raise OSError: the backend is closed
+    """
+    if self._display is None:
+      raise OSError('The capture backend is closed.')
+    width = coord[2] - coord[0]
+    height = coord[3] - coord[1]
+    clipped = (max(coord[0], 0), max(coord[1], 0), min(coord[2], self.screenSize[0]), min(coord[3], self.screenSize[1]))
+    clippedWidth = clipped[2] - clipped[0]
+    clippedHeight = clipped[3] - clipped[1]
+    if clippedWidth <= 0 or clippedHeight <= 0:
+      return np.zeros((height, width, 4), dtype=np.uint8)
+    ximage = self._getXImage(clippedWidth, clippedHeight)
+    self._xext.XShmGetImage(self._display, self._root, ximage, clipped[0], clipped[1], self._ALL_PLANES)
+    bytesPerLine = ximage.contents.bytes_per_line
+    array = self._buffer[:bytesPerLine * clippedHeight].reshape(clippedHeight, bytesPerLine)[:, :clippedWidth * 4] \
+        .reshape(clippedHeight, clippedWidth, 4)
+    if clipped == tuple(coord):
+      return array
+    # Partially outside of the screen: only this case allocates a new array.
+    paddedArray = np.zeros((height, width, 4), dtype=np.uint8)
+    paddedArray[clipped[1] - coord[1]:clipped[3] - coord[1], clipped[0] - coord[0]:clipped[2] - coord[0]] = array
+    return paddedArray
+
+  @classmethod
+  def _toImage(cls, array: np.ndarray) -> Image.Image:
+    """
+    Convert BGRA pixels to a new RGB image which does not share the memory of the array.
+
+    :param array:
+    """
+    return Image.frombytes('RGB', (array.shape[1], array.shape[0]), np.ascontiguousarray(array).tobytes(), 'raw', 'BGRX', 0, 1)
+
+  def grabAreaArray(self, coord: AreaCoord) -> np.ndarray:
+    """
+    Return the pixels of the area as a BGRA numpy array.
+
+    The array is a view of the shared memory segment when the area is inside the screen:
+    it is overwritten by the next grab, copy it to keep it.
+    The view is not protected by the lock of the backend: only use it when no other thread grabs with the same backend.
+    Pixels outside of the screen are black.
+
+    :param coord: absolute coordinates
+    :raise OSError: the backend is closed
+    """
+    with self._lock:
+      return self._grabLocked(coord)
+
+  def grabArea(self, coord: AreaCoord, allScreens: bool=False) -> Image.Image:
+    """
+    :param coord: absolute coordinates
+    :param allScreens: (optional) ignored, the X11 root window already spans all monitors
+    :raise OSError: the backend is closed
+    """
+    with self._lock:
+      return self._toImage(self._grabLocked(coord))
+
+  def grabAreaScaled(self, coord: AreaCoord, scale: float, allScreens: bool=False) -> Image.Image:
+    """
+    Only every n-th pixel is converted when 1 / `scale` is an integer n.
+
+    :param coord: absolute coordinates
+    :param scale: scale factor in (0, 1]
+    :param allScreens: (optional) ignored, the X11 root window already spans all monitors
+    :raise OSError: the backend is closed
+    """
+    factor = 1 / scale
+    if scale == 1 or abs(factor - round(factor)) >= 1e-9:
+      return scaleImage(self.grabArea(coord), scale)
+    step = round(factor)
+    with self._lock:
+      return self._toImage(self._grabLocked(coord)[::step, ::step])
+
+  def grabPoint(self, coord: Coord, allScreens: bool=False) -> Point:
+    """
+    :param coord: absolute coordinates
+    :param allScreens: (optional) ignored, the X11 root window already spans all monitors
+    :return: rgb colors - If outside screen (0, 0, 0).
+    :raise OSError: the backend is closed
+    """
+    with self._lock:
+      array = self._grabLocked((coord[0], coord[1], coord[0] + 1, coord[1] + 1))
+      return (int(array[0, 0, 2]), int(array[0, 0, 1]), int(array[0, 0, 0]))
+
+  def close(self) -> None:
+    with self._lock:
+      if self._display is None:
+        return
+      for ximage in self._ximageBySize.values():
+        # The data belongs to the shared memory segment and must not be freed with the image.
+        ximage.contents.data = None
+        self._x11.XDestroyImage(ximage)
+      self._ximageBySize.clear()
+      if self._shmInfo is not None:
+        self._xext.XShmDetach(self._display, ctypes.byref(self._shmInfo))
+        self._x11.XSync(self._display, 0)
+        self._libc.shmdt(self._shmInfo.shmaddr)
+        self._shmInfo = None
+      self._x11.XCloseDisplay(self._display)
+      self._display = None
@@ -35,3 +35,17 @@ def isImageDataValid(imageData: Any) -> TypeIs[Image.Image]:
   :param imageData:
   """
   return isinstance(imageData, Image.Image) and imageData.width != 0 and imageData.height != 0
+
+def copyResult(result: Any) -> Any:
+  """
+  Return a copy of a mutable result of an execution, a list of coordinates or an image, and the result itself otherwise.
+
+  Kept results are copied so that a caller modifying its result does not change the result of the others.
+
+  :param result:
+  """
+  if isinstance(result, list):
+    return list(result)
+  if isinstance(result, Image.Image):
+    return result.copy()
+  return result
@@ -0,0 +1,172 @@
+import threading
+from typing import Any
+
+import numpy as np
+
+from guirecognizer.common import RecognizerValueError, copyResult
+from guirecognizer.frame import Frame
+from guirecognizer.types import AreaCoord
+
+
+class DirtyRegionTracker:
+  """
+  Compare consecutive frames tile by tile and keep the results of executions whose pixels did not change.
+
+  See :meth:`guirecognizer.Recognizer.enableDirtyRegionDetection`.
+  """
+  tileSize: int
+  nbHits: int
+  nbMisses: int
+
+  def __init__(self, tileSize: int=32) -> None:
+    """
+    :param tileSize: (optional) width and height in pixels of the compared tiles - default: 32
+    :raise RecognizerValueError: invalid `tileSize`
+    """
+    if not isinstance(tileSize, int) or tileSize <= 0:
+      raise RecognizerValueError('Invalid tileSize value: expects a positive integer.')
+    self.tileSize = tileSize
+    self.nbHits = 0
+    self.nbMisses = 0
+    self._lock = threading.Lock()
+    self._lastFrame = None
+    self._lastPixels = None
+    self._lastImageRegions = None
+    self._frameIndex = 0
+    self._lastChangedFrameIndexes = None
+    self._resultByKey = {}
+
+  @property
+  def hitRate(self) -> float:
+    """
+    Ratio of executions answered from the cache, 0 if there was no lookup.
+    """
+    nbLookups = self.nbHits + self.nbMisses
+    return self.nbHits / nbLookups if nbLookups > 0 else 0
+
+  def clear(self) -> None:
+    """
+    Forget the previous frame and every cached result. Counters are kept.
+    """
+    with self._lock:
+      self._clear()
+
+  def resetCounters(self) -> None:
+    """
+    Set the hit and miss counters back to 0.
+    """
+    with self._lock:
+      self.nbHits = 0
+      self.nbMisses = 0
+
+  def _clear(self) -> None:
+    """
+    Assume the lock is held.
+    """
+    self._lastFrame = None
+    self._lastPixels = None
+    self._lastImageRegions = None
+    self._lastChangedFrameIndexes = None
+    self._resultByKey.clear()
+
+  def _update(self, frame: Frame) -> None:
+    """
+    Mark the tiles that changed since the previous frame. Assume the lock is held.
+
+    The tiles cover the borders of the frame. The images of a frame of several regions are compared one by one.
+
+    :param frame:
+    """
+    if frame is self._lastFrame:
+      return
+    imageRegions = frame.imageRegions
+    pixels = [frame.getRegionArrayImage(index).array for index in range(len(imageRegions))]
+    if self._lastPixels is None or self._lastFrame is None or self._lastImageRegions != imageRegions \
+        or any(lastPixels.shape != imagePixels.shape for lastPixels, imagePixels in zip(self._lastPixels, pixels)) \
+        or tuple(self._lastFrame.borders[:2]) != tuple(frame.borders[:2]):
+      self._clear()
+      height = max(region[3] for region in imageRegions) - frame.borders[1]
+      width = max(region[2] for region in imageRegions) - frame.borders[0]
+      nbTiles = (-(-height // self.tileSize), -(-width // self.tileSize))
+      self._lastChangedFrameIndexes = np.zeros(nbTiles, dtype=np.int64)
+    else:
+      assert self._lastChangedFrameIndexes is not None
+      self._frameIndex += 1
+      for region, lastPixels, imagePixels in zip(imageRegions, self._lastPixels, pixels):
+        offset = (region[1] - frame.borders[1], region[0] - frame.borders[0])
+        self._markChangedTiles(self._lastChangedFrameIndexes, lastPixels, imagePixels, offset)
+    self._lastFrame = frame
+    self._lastPixels = pixels
+    self._lastImageRegions = imageRegions
+
+  def _markChangedTiles(self, lastChangedFrameIndexes: np.ndarray, previousPixels: np.ndarray, pixels: np.ndarray,
+      offset: tuple[int, int]) -> None:
+    """
+    Set the current frame index to the tiles with at least one different pixel.
+
+    :param lastChangedFrameIndexes: grid of the tiles of the frame
+    :param previousPixels:
+    :param pixels: same shape as `previousPixels`
+    :param offset: top and left of the pixels in the frame
+    """
+    changed = previousPixels != pixels
+    if changed.ndim == 3:
+      changed = changed.any(axis=2)
+    height, width = changed.shape
+    # The pixels are padded so that they start and end on tile boundaries.
+    top = offset[0] % self.tileSize
+    left = offset[1] % self.tileSize
+    nbTilesY = -(-(top + height) // self.tileSize)
+    nbTilesX = -(-(left + width) // self.tileSize)
+    padded = np.zeros((nbTilesY * self.tileSize, nbTilesX * self.tileSize), dtype=bool)
+    padded[top:top + height, left:left + width] = changed
+    changedTiles = padded.reshape(nbTilesY, self.tileSize, nbTilesX, self.tileSize).any(axis=(1, 3))
+    tileTop = offset[0] // self.tileSize
+    tileLeft = offset[1] // self.tileSize
+    lastChangedFrameIndexes[tileTop:tileTop + nbTilesY, tileLeft:tileLeft + nbTilesX][changedTiles] = self._frameIndex
+
+  def _getRegionLastChangedFrameIndex(self, frame: Frame, region: AreaCoord) -> int:
+    """
+    Assume the lock is held and the frame is the last updated one.
+
+    :param frame:
+    :param region: absolute coordinates inside the frame
+    """
+    assert self._lastChangedFrameIndexes is not None
+    left = (region[0] - frame.borders[0]) // self.tileSize
+    top = (region[1] - frame.borders[1]) // self.tileSize
+    right = (region[2] - 1 - frame.borders[0]) // self.tileSize
+    bottom = (region[3] - 1 - frame.borders[1]) // self.tileSize
+    return int(self._lastChangedFrameIndexes[top:bottom + 1, left:right + 1].max())
+
+  def getResult(self, frame: Frame, key: Any, region: AreaCoord) -> tuple[bool, Any]:
+    """
+    Return whether a result computed on a previous frame is still valid for this frame and the result.
+
+    Lists and images are copied: modifying the returned result does not change the kept one.
+
+    :param frame:
+    :param key: key identifying the execution
+    :param region: absolute coordinates inside the frame of every pixel read by the execution
+    """
+    with self._lock:
+      self._update(frame)
+      if key in self._resultByKey:
+        frameIndex, result = self._resultByKey[key]
+        if self._getRegionLastChangedFrameIndex(frame, region) <= frameIndex:
+          self.nbHits += 1
+          return True, copyResult(result)
+      self.nbMisses += 1
+      return False, None
+
+  def setResult(self, frame: Frame, key: Any, result: Any) -> None:
+    """
+    Keep a copy of the result of an execution on the frame.
+
+    :param frame:
+    :param key: key identifying the execution
+    :param result:
+    """
+    with self._lock:
+      if frame is self._lastFrame:
+        self._resultByKey[key] = (self._frameIndex, copyResult(result))
@@ -0,0 +1,149 @@
+import time
+from typing import Any
+
+from PIL import Image
+
+from guirecognizer.array_image import ArrayImage
+from guirecognizer.common import RecognizerValueError
+from guirecognizer.types import AreaCoord, Coord
+
+
+class Frame:
+  """
+  Capture of the borders area shared by every execution inside a frame session.
+
+  See :meth:`guirecognizer.Recognizer.frame`.
+
+  A frame of separately captured regions keeps the image of each region only, the pixels between them are not stored.
+  """
+  #: Image of the borders area, None for a frame of several separately captured regions.
+  image: Image.Image | None
+  borders: AreaCoord
+  timestamp: float
+  monotonicTimestamp: float
+  captureDuration: float
+  regions: list[AreaCoord] | None
+  #: Image of each captured area, in the order of `regions`. A frame of the whole borders area has one.
+  regionImages: list[Image.Image]
+  #: Results memoized by the executions of the frame. Executions get copies of the lists and images.
+  results: dict[Any, Any]
+
+  def __init__(self, image: Image.Image | None, borders: AreaCoord, timestamp: float | None=None,
+      monotonicTimestamp: float | None=None, captureDuration: float=0, regions: list[AreaCoord] | None=None,
+      regionImages: list[Image.Image] | None=None) -> None:
+    """
+    :param image: image of the borders area, None with `regionImages`
+    :param borders: absolute coordinates of the borders area
+    :param timestamp: (optional) time of the capture as returned by time.time() - default: now
+    :param monotonicTimestamp: (optional) time of the capture as returned by time.monotonic() - default: now
+    :param captureDuration: (optional) duration of the capture in seconds - default: 0
+    :param regions: (optional) absolute coordinates of the only captured areas of the image - default: the whole image
+    :param regionImages: (optional) image of each region when the image of the borders area is None - default: the image
+    :raise RecognizerValueError: neither image nor one image for each region
+    """
+    if image is None:
+      if regions is None or regionImages is None or len(regions) != len(regionImages):
+        raise RecognizerValueError('Invalid frame: expects an image or one image for each region.')
+      self.regionImages = regionImages
+      self._imageRegions = list(regions)
+    else:
+      self.regionImages = [image]
+      self._imageRegions = [(borders[0], borders[1], borders[0] + image.width, borders[1] + image.height)]
+    self.image = image
+    self.borders = borders
+    self.regions = regions
+    self.timestamp = time.time() if timestamp is None else timestamp
+    self.monotonicTimestamp = time.monotonic() if monotonicTimestamp is None else monotonicTimestamp
+    self.captureDuration = captureDuration
+    self.results = {}
+    self._arrayImages: list[ArrayImage | None] = [None] * len(self.regionImages)
+
+  @property
+  def arrayImage(self) -> ArrayImage:
+    """
+    Pixels of the image backed by a numpy array, converted once for the whole frame.
+
+    :raise RecognizerValueError: frame of several separately captured regions, see :meth:`getRegionArrayImage`
+    """
+    if self.image is None:
+      raise RecognizerValueError('The frame has no image of the borders area, only images of its regions.')
+    return self.getRegionArrayImage(0)
+
+  @property
+  def imageRegions(self) -> list[AreaCoord]:
+    """
+    Absolute coordinates of the area of each image of `regionImages`.
+    """
+    return list(self._imageRegions)
+
+  def getRegionArrayImage(self, index: int) -> ArrayImage:
+    """
+    Pixels of the image of a region backed by a numpy array, converted once.
+
+    :param index: index in `regionImages`
+    """
+    arrayImage = self._arrayImages[index]
+    if arrayImage is None:
+      arrayImage = self._arrayImages[index] = ArrayImage.fromImage(self.regionImages[index])
+    return arrayImage
+
+  @property
+  def age(self) -> float:
+    """
+    Time elapsed since the capture in seconds.
+    """
+    return time.monotonic() - self.monotonicTimestamp
+
+  def containsCoord(self, coord: Coord) -> bool:
+    """
+    Return whether the coordinates are inside the captured area.
+
+    :param coord:
+    """
+    return self._getRegionIndex(coord) is not None
+
+  def _getRegionIndex(self, coord: Coord) -> int | None:
+    """
+    Return the index of the image containing the coordinates, None if they are not inside the captured area.
+
+    :param coord:
+    """
+    if len(coord) == 2:
+      coord = (coord[0], coord[1], coord[0] + 1, coord[1] + 1)
+    for index, region in enumerate(self._imageRegions):
+      if region[0] <= coord[0] and region[1] <= coord[1] and coord[2] <= region[2] and coord[3] <= region[3]:
+        return index
+    return None
+
+  def _getImageIndex(self, coord: Coord) -> int:
+    """
+    :param coord: absolute coordinates inside the captured area
+    :raise RecognizerValueError: coordinates outside the captured area
+    """
+    if self.image is not None:
+      return 0
+    index = self._getRegionIndex(coord)
+    if index is None:
+      raise RecognizerValueError('The coordinates are not inside a captured region of the frame.')
+    return index
+
+  def getPoint(self, coord: Coord) -> Any:
+    """
+    :param coord: absolute coordinates inside the captured area
+    :raise RecognizerValueError: coordinates outside the captured regions
+    """
+    index = self._getImageIndex(coord)
+    region = self._imageRegions[index]
+    return self.regionImages[index].getpixel((coord[0] - region[0], coord[1] - region[1]))
+
+  def getArea(self, coord: AreaCoord) -> ArrayImage:
+    """
+    Return a view of the area, without copying the pixels.
+
+    :param coord: absolute coordinates inside the captured area
+    :raise RecognizerValueError: area outside the captured regions
+    """
+    index = self._getImageIndex(coord)
+    region = self._imageRegions[index]
+    return self.getRegionArrayImage(index).crop((coord[0] - region[0], coord[1] - region[1],
+        coord[2] - region[0], coord[3] - region[1]))
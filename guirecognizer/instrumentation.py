@@ -0,0 +1,237 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from enum import StrEnum, unique
+from typing import Any, TypedDict
+
+from guirecognizer.common import RecognizerValueError
+
+# Stage and action of the pipeline executed by the current thread, set only while an instrumentation is enabled.
+_context = threading.local()
+
+
+@unique
+class Stage(StrEnum):
+  """
+  Measured part of an execution.
+  """
+  #: Whole step of a pipeline, recorded for each action.
+  ACTION = 'action'
+  #: Grab of pixels from the screen by the capture backend.
+  CAPTURE = 'capture'
+  #: Preprocessing of the selected area.
+  PREPROCESSING = 'preprocessing'
+  #: Template matching of a findImage action, all the sizes of the image to find together.
+  MATCH_TEMPLATE = 'matchTemplate'
+  #: Verification of the best template matches of a findImage action by their image hash.
+  HASH_VERIFICATION = 'hashVerification'
+  #: Image hash of the selected area.
+  IMAGE_HASH = 'imageHash'
+  #: Text or number recognition.
+  OCR = 'ocr'
+
+
+class StageStatsDict(TypedDict):
+  #: Number of measures.
+  count: int
+  #: Sum of the durations in seconds.
+  total: float
+  #: Mean duration in seconds.
+  mean: float
+  #: Shortest duration in seconds.
+  min: float
+  #: Longest duration in seconds.
+  max: float
+  #: Number of measures by upper bound of duration in seconds, the last bound is infinite.
+  histogram: list[tuple[float, int]]
+
+
+class InstrumentationStatsDict(TypedDict):
+  #: Statistics of every execution by stage.
+  stages: dict[str, StageStatsDict]
+  #: Statistics by action id, or action type for steps without action, then by stage.
+  actions: dict[str, dict[str, StageStatsDict]]
+
+
+#: Function called with the stage, the action id or type or None outside a pipeline, the start and the duration
+#: of each measure in seconds. The start is a time.perf_counter() value.
+InstrumentationHook = Callable[[Stage, str | None, float, float], None]
+
+
+class _StageStats:
+  """
+  Counters and latency histogram of a stage.
+  """
+  __slots__ = ('count', 'total', 'min', 'max', 'bucketCounts')
+
+  def __init__(self) -> None:
+    self.count = 0
+    self.total = 0.
+    self.min = float('inf')
+    self.max = 0.
+    self.bucketCounts = [0] * (len(Instrumentation.HISTOGRAM_BOUNDS) + 1)
+
+  def add(self, duration: float) -> None:
+    self.count += 1
+    self.total += duration
+    self.min = min(self.min, duration)
+    self.max = max(self.max, duration)
+    self.bucketCounts[bisect_left(Instrumentation.HISTOGRAM_BOUNDS, duration)] += 1
+
+  def toDict(self) -> StageStatsDict:
+    bounds = Instrumentation.HISTOGRAM_BOUNDS + (float('inf'),)
+    return {'count': self.count, 'total': self.total, 'mean': self.total / self.count if self.count > 0 else 0,
+        'min': self.min if self.count > 0 else 0, 'max': self.max, 'histogram': list(zip(bounds, self.bucketCounts))}
+
+
+class Instrumentation:
+  """
+  Durations of the stages of the executions of a recognizer, see :meth:`guirecognizer.Recognizer.enableInstrumentation`.
+
+  Every measure updates the counters and the latency histogram of its stage and of its action, calls the hooks
+  and, when tracing, is kept as a Chrome trace event.
+  """
+  #: Upper bounds in seconds of the buckets of the latency histograms, a last bucket holds the longer durations.
+  HISTOGRAM_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.)
+
+  isTracing: bool
+  maxTraceEvents: int
+
+  def __init__(self, isTracing: bool=False, maxTraceEvents: int=100000) -> None:
+    """
+    :param isTracing: (optional) whether to keep the measures as trace events - default: False
+    :param maxTraceEvents: (optional) number of kept trace events, the oldest ones are dropped - default: 100000
+    :raise RecognizerValueError: invalid `maxTraceEvents`
+    """
+    if not isinstance(maxTraceEvents, int) or maxTraceEvents <= 0:
+      raise RecognizerValueError('Invalid maxTraceEvents value: expects a positive integer.')
+    self.isTracing = isTracing
+    self.maxTraceEvents = maxTraceEvents
+    self._lock = threading.Lock()
+    self._hooks: list[InstrumentationHook] = []
+    self._statsByStage: dict[Stage, _StageStats] = {}
+    self._statsByAction: dict[str, dict[Stage, _StageStats]] = {}
+    self._traceEvents: deque[tuple[Stage, str | None, float, float, int]] = deque(maxlen=maxTraceEvents)
+
+  def addHook(self, hook: InstrumentationHook) -> None:
+    """
+    Call the function after each measure, in the thread of the measure.
+
+    :param hook:
+    """
+    with self._lock:
+      self._hooks = self._hooks + [hook]
+
+  def removeHook(self, hook: InstrumentationHook) -> None:
+    """
+    :param hook: function given to :meth:`addHook`
+    """
+    with self._lock:
+      self._hooks = [otherHook for otherHook in self._hooks if otherHook != hook]
+
+  def record(self, stage: Stage, start: float, actionId: str | None=None) -> None:
+    """
+    Record a measure ending now.
+
+    :param stage:
+    :param start: start of the measure as returned by time.perf_counter()
+    :param actionId: (optional) action id or type - default: the action executed by the current thread
+    """
+    duration = time.perf_counter() - start
+    if actionId is None:
+      actionId = getattr(_context, 'actionId', None)
+    with self._lock:
+      stats = self._statsByStage.get(stage)
+      if stats is None:
+        stats = self._statsByStage[stage] = _StageStats()
+      stats.add(duration)
+      if actionId is not None:
+        statsByStage = self._statsByAction.setdefault(actionId, {})
+        stats = statsByStage.get(stage)
+        if stats is None:
+          stats = statsByStage[stage] = _StageStats()
+        stats.add(duration)
+      if self.isTracing:
+        self._traceEvents.append((stage, actionId, start, duration, threading.get_ident()))
+      hooks = self._hooks
+    for hook in hooks:
+      hook(stage, actionId, start, duration)
+
+  def getStats(self) -> InstrumentationStatsDict:
+    """
+    Return a copy of the statistics by stage and by action.
+    """
+    with self._lock:
+      return {
+        'stages': {str(stage): stats.toDict() for stage, stats in self._statsByStage.items()},
+        'actions': {actionId: {str(stage): stats.toDict() for stage, stats in statsByStage.items()}
+            for actionId, statsByStage in self._statsByAction.items()}}
+
+  def clear(self) -> None:
+    """
+    Forget the statistics and the trace events. Hooks are kept.
+    """
+    with self._lock:
+      self._statsByStage.clear()
+      self._statsByAction.clear()
+      self._traceEvents.clear()
+
+  def getChromeTrace(self) -> dict[str, Any]:
+    """
+    Return the trace events in the Chrome trace event format, to open with chrome://tracing or https://ui.perfetto.dev.
+    """
+    pid = os.getpid()
+    with self._lock:
+      traceEvents = list(self._traceEvents)
+    events = []
+    for stage, actionId, start, duration, tid in traceEvents:
+      events.append({'name': actionId if stage == Stage.ACTION and actionId is not None else str(stage), 'cat': str(stage),
+          'ph': 'X', 'ts': start * 1e6, 'dur': duration * 1e6, 'pid': pid, 'tid': tid, 'args': {'actionId': actionId}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+  def exportChromeTrace(self, filepath: str) -> None:
+    """
+    Write the trace events in the Chrome trace event format to a json file.
+
+    :param filepath:
+    """
+    with open(filepath, 'w') as file:
+      json.dump(self.getChromeTrace(), file)
+
+  @contextmanager
+  def actionScope(self, actionId: str) -> Iterator[None]:
+    """
+    Attribute the measures recorded by the current thread inside the scope to the action. The stages measured inside
+    the library during the scope, like the template matching, are recorded by this instrumentation.
+    Scopes can be nested: the previous action is restored at the end.
+
+    .. code-block:: python
+
+      with instrumentation.actionScope('score'):
+        start = time.perf_counter()
+        ...
+        instrumentation.record(Stage.OCR, start)
+
+    :param actionId:
+    """
+    previousActionId = getattr(_context, 'actionId', None)
+    previousInstrumentation = getattr(_context, 'instrumentation', None)
+    _context.actionId = actionId
+    _context.instrumentation = self
+    try:
+      yield
+    finally:
+      _context.actionId = previousActionId
+      _context.instrumentation = previousInstrumentation
+
+
+def getActiveInstrumentation() -> Instrumentation | None:
+  """
+  Return the instrumentation of the pipeline executed by the current thread, None if it's not instrumented.
+  """
+  return getattr(_context, 'instrumentation', None)
@@ -1,3 +1,4 @@
+import threading
 import time
 
 import pyautogui
@@ -8,7 +9,10 @@ from guirecognizer.types import PointCoord
 class MouseHelper:
   """
   Helper for mouse actions.
+
+  Mouse actions of different threads are executed one after another.
   """
+  _lock = threading.Lock()
 
   @classmethod
   def clickOnPosition(cls, xy: tuple[int, int], pauseDuration: float=0.02, nbClicks: int=1) -> None:
@@ -17,12 +21,12 @@ class MouseHelper:
     :param pauseDuration: (optional) pause duration of the click in second - default: 0.02
     :param nbClicks: (optional) number of clicks - default: 1
     """
-    previousPause = pyautogui.PAUSE
-    pyautogui.moveTo(xy)
-    pyautogui.PAUSE = pauseDuration
-    for _ in range(nbClicks):
-      pyautogui.click()
-    pyautogui.PAUSE = previousPause
+    with cls._lock:
+      pyautogui.moveTo(xy)
+      # The pause is made here instead of changing the global pyautogui.PAUSE used by other threads.
+      for _ in range(nbClicks):
+        pyautogui.click(_pause=False)
+        time.sleep(pauseDuration)
 
   @classmethod
   def dragCoords(cls, coords: tuple[PointCoord, ...] | list[PointCoord], pauseDuration: float=0.1, moveDuration: float=0.25) -> None:
@@ -31,13 +35,14 @@ class MouseHelper:
     :param pauseDuration: (optional) pause duration at the beginning and end of the drag - default: 0.01
     :param moveDuration: (optional) move duration between two coordinates - default: 0.25
     """
-    for i, coord in enumerate(coords):
-      if i == 0:
-        pyautogui.moveTo(coord)
-        pyautogui.mouseDown();
-        time.sleep(pauseDuration)
-      else:
-        pyautogui.moveTo(coord[0], coord[1], moveDuration)
-      if i == len(coords) - 1:
-        time.sleep(pauseDuration)
-        pyautogui.mouseUp();
+    with cls._lock:
+      for i, coord in enumerate(coords):
+        if i == 0:
+          pyautogui.moveTo(coord)
+          pyautogui.mouseDown();
+          time.sleep(pauseDuration)
+        else:
+          pyautogui.moveTo(coord[0], coord[1], moveDuration)
+        if i == len(coords) - 1:
+          time.sleep(pauseDuration)
+          pyautogui.mouseUp();
@@ -0,0 +1,98 @@
+from typing import TYPE_CHECKING, TypedDict, Unpack
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer.action_type import ActionType
+from guirecognizer.array_image import ArrayImage
+from guirecognizer.frame import Frame
+from guirecognizer.types import AreaCoord
+
+if TYPE_CHECKING:
+  from guirecognizer.recognizer import (AnyActionReturnType, ExecuteParams,
+                                        PipeStep, Recognizer)
+
+
+class PlanParams(TypedDict, total=False):
+  """
+  Keyword arguments of a call to a :class:`guirecognizer.CompiledPlan`.
+  """
+  #: Screenshot image to use instead of taking a live one, or its RGB, RGBA or grayscale uint8 numpy array.
+  screenshot: Image.Image | np.ndarray
+  #: Image of the borders area, or its RGB, RGBA or grayscale uint8 numpy array.
+  bordersImage: Image.Image | np.ndarray
+  #: Captured frame to use instead of taking a live screenshot.
+  frame: Frame
+  #: Wait for a frame of the background capture newer than this monotonic timestamp.
+  frameNewerThan: float
+
+
+class CompiledPlan:
+  """
+  Pipeline of actions resolved once and executed each time the plan is called.
+
+  See :meth:`guirecognizer.Recognizer.compile`.
+  """
+  __slots__ = ('actionIdOrTypes', '_recognizer', '_steps', '_pipeInfo', '_frameResultKey', '_resolvedPipeInfo')
+  actionIdOrTypes: tuple[str | ActionType, ...]
+
+  # Values of the pipe info which make the first action skip its coordinates.
+  _COORD_FREE_NAMES = ('coord', 'selectedPoint', 'selectedArea', 'pixelColor', 'pixelColorDifference', 'imageHash',
+      'imageHashDifference')
+
+  def __init__(self, recognizer: 'Recognizer', actionIdOrTypes: list[str | ActionType], steps: list['PipeStep'],
+      pipeInfo: 'ExecuteParams', frameResultKey: tuple | None) -> None:
+    """
+    :param recognizer:
+    :param actionIdOrTypes: checked action ids or types
+    :param steps: steps of the pipeline
+    :param pipeInfo: checked parameters given to every execution
+    :param frameResultKey: key of the result in a frame, None if it cannot be memoized
+    """
+    self.actionIdOrTypes = tuple(actionIdOrTypes)
+    self._recognizer = recognizer
+    self._steps = steps
+    self._pipeInfo = pipeInfo
+    self._frameResultKey = frameResultKey
+    self._resolvedPipeInfo = self._resolve(recognizer.borders)
+
+  def _resolve(self, borders: AreaCoord | None) -> 'ExecuteParams':
+    """
+    Return the parameters of the executions with the absolute coordinates of the pipeline for the given borders.
+
+    :param borders: borders of the recognizer
+    """
+    pipeInfo = self._pipeInfo.copy()
+    if 'borders' not in pipeInfo:
+      if borders is None:
+        return pipeInfo
+      pipeInfo['borders'] = borders
+    firstAction = self._steps[0][1]
+    if firstAction is not None and not any(name in pipeInfo for name in self._COORD_FREE_NAMES):
+      pipeInfo['coord'] = self._recognizer._getActionCoord(firstAction, pipeInfo['borders'])
+    return pipeInfo
+
+  def __call__(self, **kwargs: Unpack[PlanParams]) -> 'AnyActionReturnType':
+    """
+    Execute the pipeline. The parameters are not checked.
+
+    :param kwargs: Images or frame to use, see :class:`.PlanParams`
+    :return: The result of the last action in the pipeline.
+    """
+    recognizer = self._recognizer
+    resolvedPipeInfo = self._resolvedPipeInfo
+    borders = recognizer.borders
+    if 'borders' not in self._pipeInfo and resolvedPipeInfo.get('borders') is not borders:
+      # The parameters are replaced at once so that concurrent calls never mix old and new coordinates.
+      resolvedPipeInfo = self._resolve(borders)
+      self._resolvedPipeInfo = resolvedPipeInfo
+    pipeInfo = resolvedPipeInfo.copy()
+    if kwargs:
+      for name in ('screenshot', 'bordersImage'):
+        if name in kwargs and isinstance(kwargs[name], np.ndarray):
+          kwargs[name] = ArrayImage(kwargs[name]) # type: ignore
+      pipeInfo.update(kwargs) # type: ignore
+    return recognizer._executePipeSteps(self._steps, self.actionIdOrTypes, pipeInfo, self._frameResultKey)
+
+  def __repr__(self) -> str:
+    return 'CompiledPlan({args})'.format(args=', '.join(repr(actionIdOrType) for actionIdOrType in self.actionIdOrTypes))
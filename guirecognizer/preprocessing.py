@@ -6,6 +6,7 @@ from typing import Any, Literal, TypedDict, TypeGuard, TypeIs, assert_never
 import numpy as np
 from PIL import Image, ImageOps
 
+from guirecognizer.array_image import ArrayImage
 from guirecognizer.common import (RecognizerValueError, isIdDataValid,
                                   isImageDataValid, isPixelColorDataValid,
                                   isPixelColorDifferenceDataValid)
@@ -22,10 +23,22 @@ class Preprocessor(ABC):
     """
     pass
 
+  def processArray(self, image: ArrayImage) -> ArrayImage:
+    """
+    Process an image backed by a numpy array. Preprocessors working on numpy arrays avoid any PIL conversion.
+
+    :param image:
+    """
+    return ArrayImage.fromImage(self.process(image.toImage()))
+
   def checkImage(self, image):
     if not Preprocessing.isImageDataValid(image):
       raise RecognizerValueError('Invalid image to process value.')
 
+  def checkArrayImage(self, image: ArrayImage) -> None:
+    if not isinstance(image, ArrayImage) or image.width == 0 or image.height == 0:
+      raise RecognizerValueError('Invalid image to process value.')
+
 class GrayscalePreprocessor(Preprocessor):
   """
   Grayscale the image.
@@ -35,6 +48,10 @@ class GrayscalePreprocessor(Preprocessor):
     self.checkImage(image)
     return ImageOps.grayscale(image)
 
+  def processArray(self, image: ArrayImage) -> ArrayImage:
+    self.checkArrayImage(image)
+    return ArrayImage(image.getGrayscaleArray())
+
 @unique
 class ColorMapMethod(StrEnum):
   """
@@ -100,29 +117,33 @@ class ColorMapPreprocessor(Preprocessor):
 
   def process(self, image: Image.Image) -> Image.Image:
     self.checkImage(image)
+    return self.processArray(ArrayImage.fromImage(image)).toImage()
+
+  def processArray(self, image: ArrayImage) -> ArrayImage:
+    self.checkArrayImage(image)
+    # The pixels are copied once since the result is written in place.
+    npimage = np.array(image.getRgbArray())
     match self.method:
       case ColorMapMethod.ONE_TO_ONE:
-        return self._processOneToOne(image)
+        return ArrayImage(self._processOneToOne(npimage))
       case ColorMapMethod.RANGE_TO_ONE:
-        return self._processRangeToOne(image)
+        return ArrayImage(self._processRangeToOne(npimage))
       case ColorMapMethod.RANGE_TO_RANGE:
-        return self._processRangeToRange(image)
+        return ArrayImage(self._processRangeToRange(npimage))
       case _ as unreachable:
         assert_never(self.method)
 
-  def _processOneToOne(self, image: Image.Image) -> Image.Image:
+  def _processOneToOne(self, npimage: np.ndarray) -> np.ndarray:
     """
-    :param image:
+    :param npimage: RGB pixels, modified in place
     """
-    npimage = np.array(image.convert('RGB'))
     input1 = np.array(self.inputColor1)
     output1 = np.array(self.outputColor1)
 
     threshold = self.difference * 255 * 3
     inThreshold = np.sum(np.abs(npimage - input1), axis=2) <= threshold
     npimage[inThreshold] = output1
-    newImage = Image.fromarray(np.uint8(npimage))
-    return newImage
+    return npimage
 
   def _computeClosestColor(self, image: np.ndarray, input1: np.ndarray, input2: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
     """
@@ -142,26 +163,23 @@ class ColorMapPreprocessor(Preprocessor):
     closest = np.round(input1 + t * (input2 - input1))
     return closest, t
 
-  def _processRangeToOne(self, image: Image.Image) -> Image.Image:
+  def _processRangeToOne(self, npimage: np.ndarray) -> np.ndarray:
     """
-    :param image:
+    :param npimage: RGB pixels, modified in place
     """
-    npimage = np.array(image.convert('RGB'))
     closest, _ = self._computeClosestColor(npimage, np.array(self.inputColor1), np.array(self.inputColor2))
     threshold = self.difference * 255 * 3
     inThreshold = np.sum(np.abs(npimage - closest), axis=2) <= threshold
     npimage[inThreshold] = np.array(self.outputColor1)
-    newImage = Image.fromarray(np.uint8(npimage))
-    return newImage
+    return npimage
 
-  def _processRangeToRange(self, image: Image.Image) -> Image.Image:
+  def _processRangeToRange(self, npimage: np.ndarray) -> np.ndarray:
     """
-    :param image:
+    :param npimage: RGB pixels, modified in place
     """
     if self.outputColor1 == self.outputColor2:
-      return self._processRangeToOne(image)
+      return self._processRangeToOne(npimage)
 
-    npimage = np.array(image.convert('RGB'))
     closest, t = self._computeClosestColor(npimage, np.array(self.inputColor1), np.array(self.inputColor2))
     threshold = self.difference * 255 * 3
     inThreshold = np.sum(np.abs(npimage - closest), axis=2) <= threshold
@@ -173,8 +191,7 @@ class ColorMapPreprocessor(Preprocessor):
       output2 = np.array(self.outputColor2)
       output = np.round(output1 + t * (output2 - output1))
       npimage[inThreshold] = output[inThreshold]
-    newImage = Image.fromarray(np.uint8(npimage))
-    return newImage
+    return npimage
 
 @unique
 class ThresholdMethod(StrEnum):
@@ -303,12 +320,16 @@ class ThresholdPreprocessor(Preprocessor):
 
   def process(self, image: Image.Image) -> Image.Image:
     self.checkImage(image)
+    return self.processArray(ArrayImage.fromImage(image)).toImage()
+
+  def processArray(self, image: ArrayImage) -> ArrayImage:
+    self.checkArrayImage(image)
 
     import cv2 as cv
 
     # TODO: With some threshold type, could keep the color by using the generated image after threshold as a mask.
     #       It could be the default behavior since the user can always add a grayscale preprocessing.
-    imageCv = np.array(ImageOps.grayscale(image))
+    imageCv = image.getGrayscaleArray()
     match self.thresholdType:
       case ThresholdType.BINARY:
         thresholdType = cv.THRESH_BINARY
@@ -345,7 +366,7 @@ class ThresholdPreprocessor(Preprocessor):
         newImageCv = cv.adaptiveThreshold(imageCv, self.maxValue, adaptiveType, thresholdType, self.blockSize, self.cConstant)
       case _ as unreachable:
         assert_never(self.method)
-    return Image.fromarray(newImageCv)
+    return ArrayImage(newImageCv)
 
 @unique
 class ResizeMethod(StrEnum):
@@ -408,12 +429,15 @@ class ResizePreprocessor(Preprocessor):
 
   def process(self, image: Image.Image) -> Image.Image:
     self.checkImage(image)
+    # The preprocessor is not modified so that it can be shared by threads.
     match self.method:
       case ResizeMethod.FIXED_RATIO_WIDTH:
-        self.height = max(round(image.size[1] / image.size[0] * self.width), 1)
+        size = (self.width, max(round(image.size[1] / image.size[0] * self.width), 1))
       case ResizeMethod.FIXED_RATIO_HEIGHT:
-        self.width = max(round(image.size[0] / image.size[1] * self.height), 1)
-    return image.resize((self.width, self.height))
+        size = (max(round(image.size[0] / image.size[1] * self.height), 1), self.height)
+      case _:
+        size = (self.width, self.height)
+    return image.resize(size)
 
 class OperationDict(TypedDict):
   id: str
@@ -621,3 +645,19 @@ class Preprocessing:
     for preprocessor in operation['suboperations']:
       image = preprocessor.process(image)
     return image
+
+  def processArray(self, image: ArrayImage, operationId: str) -> ArrayImage:
+    """
+    Process an image backed by a numpy array, converted to PIL only by the preprocessors that need it.
+
+    :param image:
+    :param operationId:
+    :raise RecognizerValueError: invalid `operationId`
+    """
+    if not isinstance(image, ArrayImage) or image.width == 0 or image.height == 0:
+      raise RecognizerValueError('Invalid image to process value.')
+    self.checkProcessInput(operationId)
+    operation = self.operationById[operationId]
+    for preprocessor in operation['suboperations']:
+      image = preprocessor.processArray(image)
+    return image
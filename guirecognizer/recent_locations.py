@@ -0,0 +1,128 @@
+import threading
+from collections.abc import Sequence
+from typing import TypedDict
+
+from guirecognizer.common import RecognizerValueError
+
+#: Number of locations kept by the image searches with a recent margin.
+DEFAULT_RECENT_LOCATIONS_SIZE = 4
+
+#: Left, top, right and bottom of a found image as ratios of the searched area.
+LocationRatios = tuple[float, float, float, float]
+
+
+class RecentLocationsStatsDict(TypedDict):
+  #: Searches which found the image near a recent location.
+  nbHits: int
+  #: Searches near the recent locations which found nothing and searched the whole area.
+  nbMisses: int
+  #: Searches of the whole area, after a miss or without recent location.
+  nbFullSearches: int
+  #: Hits divided by the searches near recent locations, 0 without such search.
+  hitRate: float
+  #: Estimated time saved in seconds: the mean duration of a search of the whole area for each hit minus
+  #: the durations of the searches near recent locations.
+  savedTime: float
+
+
+class RecentLocations:
+  """
+  Bounded history of the locations where an image search found its image, the most recent first.
+
+  The locations are ratios of the searched area so that they stay valid when the borders move or the capture scale changes.
+  """
+  maxSize: int
+  nbHits: int
+  nbMisses: int
+  nbFullSearches: int
+
+  def __init__(self, maxSize: int=DEFAULT_RECENT_LOCATIONS_SIZE) -> None:
+    """
+    :param maxSize: (optional) number of kept locations - default: 4
+    :raise RecognizerValueError: invalid `maxSize`
+    """
+    if not isinstance(maxSize, int) or maxSize <= 0:
+      raise RecognizerValueError('Invalid maxSize value: expects a positive integer.')
+    self.maxSize = maxSize
+    self.nbHits = 0
+    self.nbMisses = 0
+    self.nbFullSearches = 0
+    self._hitDuration = 0.
+    self._missDuration = 0.
+    self._fullSearchDuration = 0.
+    self._lock = threading.Lock()
+    self._locations: list[LocationRatios] = []
+
+  def __len__(self) -> int:
+    return len(self._locations)
+
+  def getLocations(self) -> list[LocationRatios]:
+    """
+    Return a copy of the locations, the most recent first.
+    """
+    with self._lock:
+      return list(self._locations)
+
+  def add(self, locations: Sequence[LocationRatios]) -> None:
+    """
+    Make the locations the most recent ones, in order. The kept locations intersecting one of them are dropped:
+    the image moved from there.
+
+    :param locations:
+    """
+    with self._lock:
+      keptLocations = [keptLocation for keptLocation in self._locations
+          if not any(self._doIntersect(keptLocation, location) for location in locations)]
+      self._locations = list(dict.fromkeys([*locations, *keptLocations]))[:self.maxSize]
+
+  @classmethod
+  def _doIntersect(cls, location: LocationRatios, otherLocation: LocationRatios) -> bool:
+    """
+    :param location:
+    :param otherLocation:
+    """
+    return location[0] < otherLocation[2] and otherLocation[0] < location[2] and location[1] < otherLocation[3] \
+        and otherLocation[1] < location[3]
+
+  def recordHit(self, duration: float) -> None:
+    """
+    :param duration: duration of the searches near the recent locations in seconds
+    """
+    with self._lock:
+      self.nbHits += 1
+      self._hitDuration += duration
+
+  def recordMiss(self, duration: float) -> None:
+    """
+    :param duration: duration of the searches near the recent locations in seconds
+    """
+    with self._lock:
+      self.nbMisses += 1
+      self._missDuration += duration
+
+  def recordFullSearch(self, duration: float) -> None:
+    """
+    :param duration: duration of the search of the whole area in seconds
+    """
+    with self._lock:
+      self.nbFullSearches += 1
+      self._fullSearchDuration += duration
+
+  def getStats(self) -> RecentLocationsStatsDict:
+    """
+    Return the hit rate and the estimated time saved by the searches near the recent locations.
+    """
+    with self._lock:
+      nbNearSearches = self.nbHits + self.nbMisses
+      savedTime = 0.
+      if self.nbFullSearches > 0:
+        savedTime = self.nbHits * self._fullSearchDuration / self.nbFullSearches - self._hitDuration - self._missDuration
+      return {'nbHits': self.nbHits, 'nbMisses': self.nbMisses, 'nbFullSearches': self.nbFullSearches,
+          'hitRate': self.nbHits / nbNearSearches if nbNearSearches > 0 else 0, 'savedTime': savedTime}
+
+  def clear(self) -> None:
+    """
+    Drop every location. Counters are kept.
+    """
+    with self._lock:
+      self._locations = []
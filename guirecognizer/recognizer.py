@@ -3,9 +3,14 @@ import json
 import logging
 import math
 import os
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import StrEnum, unique
+from functools import lru_cache
 from io import BytesIO
-from math import ceil
 from statistics import mean
 from typing import (Annotated, Any, Literal, Required, TypedDict, TypeGuard,
                     TypeIs, Unpack, assert_never, cast, overload)
@@ -14,40 +19,52 @@ import numpy as np
 from imagehash import ImageHash, colorhash, hex_to_flathash, hex_to_hash, phash
 from PIL import Image, ImageGrab, ImageOps, ImageStat
 
+from guirecognizer.action import Action
 from guirecognizer.action_type import ActionType, SelectionType
-from guirecognizer.common import (RecognizerValueError, isIdDataValid,
-                                  isImageDataValid, isPixelColorDataValid,
+from guirecognizer.array_image import ArrayImage
+from guirecognizer.background_capturer import BackgroundCapturer
+from guirecognizer.capture import (CaptureBackend, PilCaptureBackend,
+                                   scaleImage)
+from guirecognizer.common import (RecognizerValueError, copyResult,
+                                  isIdDataValid, isImageDataValid,
+                                  isPixelColorDataValid,
                                   isPixelColorDifferenceDataValid)
+from guirecognizer.dirty_regions import DirtyRegionTracker
+from guirecognizer.frame import Frame
+from guirecognizer.instrumentation import (Instrumentation,
+                                           InstrumentationStatsDict, Stage,
+                                           getActiveInstrumentation)
 from guirecognizer.mouse_helper import MouseHelper
+from guirecognizer.plan import CompiledPlan
 from guirecognizer.preprocessing import Preprocessing, PreprocessingData
+from guirecognizer.recent_locations import (LocationRatios, RecentLocations,
+                                            RecentLocationsStatsDict)
+from guirecognizer.template_pyramid import (DEFAULT_RESIZE_STEP,
+                                            TemplatePyramid,
+                                            TemplatePyramidCache)
 from guirecognizer.types import (AreaCoord, AreaRatios, Coord, PixelColor,
-                                 PointRatios, Ratios)
+                                 Point, PointRatios, Ratios)
+from guirecognizer.watcher import Watcher
 
 logger = logging.getLogger(__name__)
 
-Point = PixelColor | int | tuple[int, int, int, int]
 ResizeInterval = tuple[int | float, int | float] | Annotated[list[int | float], 2]
+#: Distance in pixels around a candidate of a coarse image search where the full resolution match is searched.
+DEFAULT_REFINE_MARGIN = 4
+# Smallest width and height of an image to find halved for a coarse image search.
+_MIN_COARSE_IMAGE_SIZE = 4
 AnyActionReturnType = Coord | Point | Image.Image | list[AreaCoord] | str | int | float | bool | None
 
-class ActionDict(TypedDict, total=False):
-  id: Required[str]
-  type: Required[ActionType]
-  ratios: Required[Ratios]
-  pixelColor: PixelColor
-  imageHash: str
-  imageToFind: str
-  threshold: int
-  maxResults: int
-  resizeInterval: ResizeInterval | None
-
 class PipeInfoDict(TypedDict, total=False):
   """
   Optional arguments for pipeline execution.
   """
-  #: Screenshot image to use instead of taking a live one.
-  screenshot: Image.Image
-  #: Image of the borders area.
-  bordersImage: Image.Image
+  #: Screenshot image to use instead of taking a live one, or its RGB, RGBA or grayscale uint8 numpy array.
+  screenshot: Image.Image | np.ndarray
+  #: Image of the borders area, or its RGB, RGBA or grayscale uint8 numpy array.
+  bordersImage: Image.Image | np.ndarray
+  #: Captured frame to use instead of taking a live screenshot. See :meth:`guirecognizer.Recognizer.frame`.
+  frame: Frame
   #: Absolute coordinates.
   coord: Coord
   #: RGB colors with or without alpha, or grayscale value.
@@ -70,10 +87,17 @@ class PipeInfoDict(TypedDict, total=False):
   imageHashReference: str
   #: Image hash difference.
   imageHashDifference: int
+  #: Absolute coordinates of the borders to use instead of the ones of the recognizer when the execution starts.
+  borders: AreaCoord
   #: Reinterpret the last action as this type.
   reinterpret: ActionType
   #: ID of a preprocessing operation.
   preprocessing: str
+  #: Scale factor in (0, 1] of the selected area when it's captured, overrides the scale of the action and of the recognizer.
+  #: See :meth:`guirecognizer.Recognizer.setCaptureScale`.
+  captureScale: float
+  #: Ratio between the size of the selected area on the screen and its size, set by the capture scale and the preprocessing.
+  sizeRatio: tuple[float, float]
 
 class ExecuteParams(PipeInfoDict, total=False):
   """
@@ -85,6 +109,14 @@ class ExecuteParams(PipeInfoDict, total=False):
   bordersImageFilepath: str
   #: Filepath of the selected area image.
   selectedAreaFilepath: str
+  #: Wait for a frame of the background capture newer than this monotonic timestamp, as returned by time.monotonic().
+  #: See :meth:`guirecognizer.Recognizer.startBackgroundCapture`.
+  frameNewerThan: float
+
+PipeStepHandler = Callable[[Action | None, bool, PipeInfoDict], AnyActionReturnType]
+PipeStep = tuple[PipeStepHandler, Action | None, bool]
+#: Action id or type, or tuple of action ids or types optionally ending with a dict of :class:`ExecuteParams`.
+ExecuteRequest = str | ActionType | tuple[Any, ...]
 
 @unique
 class OcrType(StrEnum):
@@ -107,6 +139,11 @@ class ActionData(TypedDict, total=False):
   threshold: int
   maxResults: int
   resizeInterval: ResizeInterval | None
+  resizeStep: float
+  searchLevels: int
+  refineMargin: int
+  recentMargin: int
+  captureScale: float
 
 class RecognizerData(PreprocessingData):
   borders: Required[AreaCoord]
@@ -114,8 +151,15 @@ class RecognizerData(PreprocessingData):
 
 class Recognizer():
   borders: AreaCoord | None
-  actionById: dict[str, ActionDict]
-  sizeRatio: tuple[float, float]
+  actionById: dict[str, Action]
+  captureScale: float
+  backgroundCapturer: BackgroundCapturer | None
+  dirtyRegionTracker: DirtyRegionTracker | None
+  instrumentation: Instrumentation | None
+  captureBackend: CaptureBackend
+  executor: ThreadPoolExecutor | None
+  scaleExecutor: ThreadPoolExecutor | None
+  templatePyramidCache: TemplatePyramidCache
 
   """
   Recognize given patterns and make GUI actions.
@@ -125,18 +169,38 @@ class Recognizer():
   Can also be used as a static class to call a single action.
   """
 
-  def __init__(self, data: str | RecognizerData | None=None) -> None:
+  # Parameters of a request of executeMany which make it read its own pixels.
+  _SOURCE_NAMES = ('screenshot', 'screenshotFilepath', 'bordersImage', 'bordersImageFilepath', 'frame', 'frameNewerThan')
+  # Given values which make a request not share its first steps.
+  _VALUE_NAMES = ('selectedPoint', 'selectedArea', 'selectedAreaFilepath', 'pixelColor', 'pixelColorDifference', 'imageHash',
+      'imageHashDifference')
+  # Values computed by the first steps of a pipeline which only depend on its coordinates, capture scale and preprocessing.
+  _PREFIX_NAMES = ('selectedPoint', 'selectedArea', 'captureScale', 'sizeRatio', 'pixelColor', 'imageHash')
+
+  def __init__(self, data: str | RecognizerData | None=None, captureBackend: CaptureBackend | None=None) -> None:
     """
     :param data: (optional) config filepath or config data
+    :param captureBackend: (optional) backend used to grab the screen - default: :class:`guirecognizer.PilCaptureBackend`
     :raise RecognizerValueError: invalid `data`
     """
     self.borders = None
+    self._bordersLock = threading.Lock()
     self.actionById = {}
     self.allScreens = False
+    self.captureScale = 1
     self.ocrOrder = [OcrType.EASY_OCR, OcrType.TESSERACT]
     self.easyOcrReader = None
     self.tesseractOptions = None
     self.preprocessing = Preprocessing()
+    # Each thread has its own frame session.
+    self._frameSession = threading.local()
+    self.backgroundCapturer = None
+    self.dirtyRegionTracker = None
+    self.executor = None
+    self.scaleExecutor = None
+    self.instrumentation = None
+    self.templatePyramidCache = TemplatePyramidCache()
+    self.captureBackend = PilCaptureBackend() if captureBackend is None else captureBackend
     if isinstance(data, str):
       self.loadFilepath(data)
     elif isinstance(data, dict):
@@ -154,10 +218,12 @@ class Recognizer():
         and bordersData[0] <= bordersData[2] and bordersData[1] <= bordersData[3]
 
   @classmethod
-  def isImageDataValid(cls, imageData: Any) -> TypeIs[Image.Image]:
+  def isImageDataValid(cls, imageData: Any) -> TypeIs[Image.Image | ArrayImage]:
     """
     :param imageData:
     """
+    if isinstance(imageData, ArrayImage):
+      return imageData.width != 0 and imageData.height != 0
     return isImageDataValid(imageData)
 
   @classmethod
@@ -215,11 +281,11 @@ class Recognizer():
     return isPixelColorDifferenceDataValid(differenceData)
 
   @classmethod
-  def isAreaDataValid(cls, areaData: Any) -> TypeIs[Image.Image]:
+  def isAreaDataValid(cls, areaData: Any) -> TypeIs[Image.Image | ArrayImage]:
     """
     :param areaData:
     """
-    return isinstance(areaData, Image.Image)
+    return isinstance(areaData, (Image.Image, ArrayImage))
 
   @classmethod
   def isImageToFindDataValid(cls, imageToFindData: Any) -> TypeGuard[str]:
@@ -256,6 +322,49 @@ class Recognizer():
     return isinstance(resizeIntervalData, (list, tuple)) and len(resizeIntervalData) == 2 \
         and all(isinstance(i, (int, float)) and i > 0 for i in resizeIntervalData) and resizeIntervalData[0] <= resizeIntervalData[1]
 
+  @classmethod
+  def isResizeStepDataValid(cls, resizeStepData: Any) -> TypeGuard[int | float]:
+    """
+    :param resizeStepData:
+    """
+    return isinstance(resizeStepData, (int, float)) and not isinstance(resizeStepData, bool) and resizeStepData > 0
+
+  @classmethod
+  def isSearchLevelsDataValid(cls, searchLevelsData: Any) -> TypeGuard[int]:
+    """
+    :param searchLevelsData:
+    """
+    return isinstance(searchLevelsData, int) and not isinstance(searchLevelsData, bool) and searchLevelsData >= 0
+
+  @classmethod
+  def isRefineMarginDataValid(cls, refineMarginData: Any) -> TypeGuard[int]:
+    """
+    :param refineMarginData:
+    """
+    return isinstance(refineMarginData, int) and not isinstance(refineMarginData, bool) and refineMarginData >= 0
+
+  @classmethod
+  def isRecentMarginDataValid(cls, recentMarginData: Any) -> TypeGuard[int]:
+    """
+    :param recentMarginData:
+    """
+    return isinstance(recentMarginData, int) and not isinstance(recentMarginData, bool) and recentMarginData >= 0
+
+  @classmethod
+  def isCaptureScaleDataValid(cls, captureScaleData: Any) -> TypeGuard[int | float]:
+    """
+    :param captureScaleData:
+    """
+    return isinstance(captureScaleData, (int, float)) and not isinstance(captureScaleData, bool) and 0 < captureScaleData <= 1
+
+  @classmethod
+  def isSizeRatioDataValid(cls, sizeRatioData: Any) -> TypeGuard[tuple[float, float]]:
+    """
+    :param sizeRatioData:
+    """
+    return isinstance(sizeRatioData, (tuple, list)) and len(sizeRatioData) == 2 \
+        and all(isinstance(value, (int, float)) and value > 0 for value in sizeRatioData)
+
   @classmethod
   def isImageToFindCompatibleWithSelection(cls, imageToFind: str, borders: AreaCoord, ratios: AreaRatios,
       resizeInterval: ResizeInterval | None=None) -> bool:
@@ -276,8 +385,16 @@ class Recognizer():
     :param areaSize:
     :param resizeInterval: (optional)
     """
-    image = cls.getImageToFindFromData(imageToFindValue)
-    imageSize = (image.width, image.height)
+    return cls._isImageSizeCompatibleWithAreaSize(cls.getImageToFindFromData(imageToFindValue).size, areaSize, resizeInterval)
+
+  @classmethod
+  def _isImageSizeCompatibleWithAreaSize(cls, imageSize: tuple[int, int], areaSize: tuple[int, int],
+      resizeInterval: ResizeInterval | None=None) -> bool:
+    """
+    :param imageSize:
+    :param areaSize:
+    :param resizeInterval: (optional)
+    """
     if resizeInterval is not None:
       imageSize = (int(imageSize[0] * resizeInterval[1]), int(imageSize[1] * resizeInterval[1]))
     return imageSize[0] <= areaSize[0] and imageSize[1] <= areaSize[1]
@@ -353,7 +470,7 @@ class Recognizer():
     return image.getpixel((0, 0)) # type: ignore
 
   @classmethod
-  def getPointFromScreenshot(cls, screenshot: Image.Image, coord: Coord) -> Point:
+  def getPointFromScreenshot(cls, screenshot: Image.Image | ArrayImage, coord: Coord) -> Point:
     """
     :param screenshot:
     :param coord:
@@ -365,7 +482,7 @@ class Recognizer():
       return screenshot.getpixel((coord[0], coord[1])) # type: ignore
 
   @classmethod
-  def getPointFromBordersImage(cls, bordersImage: Image.Image, coord: Coord, borders: Coord) -> Point:
+  def getPointFromBordersImage(cls, bordersImage: Image.Image | ArrayImage, coord: Coord, borders: Coord) -> Point:
     """
     :param bordersImage:
     :param coord:
@@ -386,13 +503,13 @@ class Recognizer():
     return point[0:3]
 
   @classmethod
-  def getAveragePixelColor(cls, area: Image.Image) -> PixelColor:
+  def getAveragePixelColor(cls, area: Image.Image | ArrayImage) -> PixelColor:
     """
     :param area:
     :return: rgb colors without alpha
     """
-    stat = ImageStat.Stat(area)
-    pixelColor = tuple([round(i) for i in stat.mean])
+    mean = area.getMeanColor() if isinstance(area, ArrayImage) else ImageStat.Stat(area).mean
+    pixelColor = tuple([round(i) for i in mean])
     if len(pixelColor) == 1:
       pixelColor = (pixelColor[0], pixelColor[0], pixelColor[0])
     pixelColor = cast(tuple[int, int, int], pixelColor)
@@ -414,15 +531,16 @@ class Recognizer():
     return ImageGrab.grab(coord, all_screens=allScreens) # type: ignore
 
   @classmethod
-  def getAreaFromScreenshot(cls, screenshot: Image.Image, coord: AreaCoord) -> Image.Image:
+  def getAreaFromScreenshot(cls, screenshot: Image.Image | ArrayImage, coord: AreaCoord) -> Image.Image | ArrayImage:
     """
-    :param screenshot:
+    :param screenshot: a view of the area is returned for a numpy backed image
     :param coord:
     """
     return screenshot.crop(coord) # type: ignore
 
   @classmethod
-  def getAreaFromBordersImage(cls, bordersImage: Image.Image, coord: AreaCoord, borders: AreaCoord) -> Image.Image:
+  def getAreaFromBordersImage(cls, bordersImage: Image.Image | ArrayImage, coord: AreaCoord,
+      borders: AreaCoord) -> Image.Image | ArrayImage:
     """
     :param bordersImage:
     :param coord:
@@ -432,8 +550,9 @@ class Recognizer():
     return cls.getAreaFromScreenshot(bordersImage, relativeCoord)
 
   @classmethod
-  def findImageCoordinates(cls, areaCoord: AreaCoord, area: Image.Image, imageToFindValue: str, threshold: int,
-      maxResults: int, resizeInterval: ResizeInterval | None=None, sizeRatio: tuple[float, float]=(1, 1)) -> list[AreaCoord]:
+  def findImageCoordinates(cls, areaCoord: AreaCoord, area: Image.Image | ArrayImage, imageToFindValue: str, threshold: int,
+      maxResults: int, resizeInterval: ResizeInterval | None=None, sizeRatio: tuple[float, float]=(1, 1),
+      resizeStep: float=DEFAULT_RESIZE_STEP, searchLevels: int=0, refineMargin: int=DEFAULT_REFINE_MARGIN) -> list[AreaCoord]:
     """
     :param areaCoord:
     :param area:
@@ -441,73 +560,201 @@ class Recognizer():
     :param threshold:
     :param maxResults:
     :param resizeInterval: (optional)
+    :param resizeStep: (optional) difference between two consecutive ratios of `resizeInterval` - default: 0.05
+    :param searchLevels: (optional) number of halvings of the coarse search, 0 for an exhaustive search - default: 0
+    :param refineMargin: (optional) distance in pixels around a coarse candidate searched at full resolution - default: 4
     """
     imageToFind = cls.getImageToFindFromData(imageToFindValue)
-    return cls.findImageCoordinatesWithImageToFindAsImage(areaCoord, area, imageToFind, threshold, maxResults, resizeInterval, sizeRatio)
+    return cls.findImageCoordinatesWithImageToFindAsImage(areaCoord, area, imageToFind, threshold, maxResults, resizeInterval, sizeRatio,
+        resizeStep, searchLevels, refineMargin)
 
   @classmethod
-  def findImageCoordinatesWithImageToFindAsImage(cls, areaCoord: AreaCoord, area: Image.Image, imageToFind: Image.Image,
-      threshold: int, maxResults: int, resizeInterval: ResizeInterval | None=None, sizeRatio: tuple[float, float]=(1, 1)) -> list[AreaCoord]:
+  def findImageCoordinatesWithImageToFindAsImage(cls, areaCoord: AreaCoord, area: Image.Image | ArrayImage, imageToFind: Image.Image,
+      threshold: int, maxResults: int, resizeInterval: ResizeInterval | None=None, sizeRatio: tuple[float, float]=(1, 1),
+      resizeStep: float=DEFAULT_RESIZE_STEP, searchLevels: int=0, refineMargin: int=DEFAULT_REFINE_MARGIN) -> list[AreaCoord]:
     """
+    The resized images to find are computed at each call, actions keep them in a :class:`guirecognizer.template_pyramid.TemplatePyramid`.
+
     :param areaCoord:
     :param area:
     :param imageToFind:
     :param threshold:
     :param maxResults:
     :param resizeInterval: (optional)
+    :param resizeStep: (optional) difference between two consecutive ratios of `resizeInterval` - default: 0.05
+    :param searchLevels: (optional) number of halvings of the coarse search, 0 for an exhaustive search - default: 0
+    :param refineMargin: (optional) distance in pixels around a coarse candidate searched at full resolution - default: 4
     """
-    imageToFindHash = cls._getRawImageHash(imageToFind)
-    areaCv = np.array(ImageOps.grayscale(area))
-
-    if resizeInterval is None:
-      results = cls._computeFindImageMatchResults(imageToFind, areaCv)
-    else:
-      nbMatches = 1 + ceil((resizeInterval[1] - resizeInterval[0]) / 0.05)
-      precedentSize = None
-      results = []
-      # Multiprocessing seemed like a good idea but the overhead is too high.
-      for ratio in np.linspace(resizeInterval[0], resizeInterval[1], num=nbMatches):
-        newSize = (max(int(imageToFind.size[0] * ratio), 1), max(int(imageToFind.size[1] * ratio), 1))
-        if newSize == precedentSize:
-          continue
-        precedentSize = newSize
-        localImageToFind = imageToFind.resize(newSize, Image.LANCZOS) # type: ignore
-        localResults = cls._computeFindImageMatchResults(localImageToFind, areaCv)
-        results += localResults
+    return cls._findImageCoordinates(areaCoord, area, TemplatePyramid(imageToFind, resizeInterval, resizeStep), threshold, maxResults,
+        sizeRatio, searchLevels, refineMargin)
 
-    results.sort(key=lambda result: result[2], reverse=True)
-    coords = []
+  @classmethod
+  def _findImageCoordinates(cls, areaCoord: AreaCoord, area: Image.Image | ArrayImage, pyramid: TemplatePyramid, threshold: int,
+      maxResults: int, sizeRatio: tuple[float, float], searchLevels: int=0, refineMargin: int=DEFAULT_REFINE_MARGIN,
+      executor: Executor | None=None) -> list[AreaCoord]:
+    """
+    :param areaCoord:
+    :param area:
+    :param pyramid: grayscale pixels of the image to find at every searched size and its image hash
+    :param threshold:
+    :param maxResults:
+    :param sizeRatio:
+    :param searchLevels: (optional) number of halvings of the coarse search, 0 for an exhaustive search - default: 0
+    :param refineMargin: (optional) distance in pixels around a coarse candidate searched at full resolution - default: 4
+    :param executor: (optional) pool matching the sizes of the pyramid concurrently - default: the sizes are matched one after another
+    """
+    instrumentation = getActiveInstrumentation()
+    areaCv = area.getGrayscaleArray() if isinstance(area, ArrayImage) else np.array(ImageOps.grayscale(area))
     # Only a certain number of the best matches are tested using their image hash.
     maxResultsToInspect = 2 * maxResults + 5
+
+    def computeMatchResults(grayscale: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+      if searchLevels > 0:
+        return cls._computeCoarseToFineMatchResults(grayscale, areaCv, searchLevels, refineMargin, maxResultsToInspect)
+      return cls._computeFindImageMatchResults(grayscale, areaCv)
+
+    start = time.perf_counter()
+    xsBySize, ysBySize, valuesBySize, widthsBySize, heightsBySize = [], [], [], [], []
+    # Processes cost too much to start and to copy the area, threads share it and matchTemplate releases the GIL.
+    if executor is not None and len(pyramid.grayscales) > 1:
+      matchResults = executor.map(computeMatchResults, pyramid.grayscales)
+    else:
+      matchResults = map(computeMatchResults, pyramid.grayscales)
+    for grayscale, (xs, ys, values) in zip(pyramid.grayscales, matchResults):
+      xsBySize.append(xs)
+      ysBySize.append(ys)
+      valuesBySize.append(values)
+      widthsBySize.append(np.full(len(xs), grayscale.shape[1]))
+      heightsBySize.append(np.full(len(xs), grayscale.shape[0]))
+    if instrumentation is not None:
+      instrumentation.record(Stage.MATCH_TEMPLATE, start)
+
+    start = time.perf_counter()
+    relativeLefts = np.concatenate(xsBySize).astype(np.int64)
+    relativeTops = np.concatenate(ysBySize).astype(np.int64)
+    values = np.concatenate(valuesBySize)
+    relativeRights = relativeLefts + np.concatenate(widthsBySize)
+    relativeBottoms = relativeTops + np.concatenate(heightsBySize)
+    lefts = areaCoord[0] + np.floor(relativeLefts * sizeRatio[0]).astype(np.int64)
+    tops = np.ceil(areaCoord[1] + relativeTops * sizeRatio[1]).astype(np.int64)
+    rights = np.floor(areaCoord[0] + relativeRights * sizeRatio[0]).astype(np.int64)
+    bottoms = np.ceil(areaCoord[1] + relativeBottoms * sizeRatio[1]).astype(np.int64)
+
+    # Candidates are inspected by decreasing match value. Instead of sorting every match, the best ones are selected
+    # by batches and the matches overlaying a found coord are dropped after each batch.
+    isRemaining = np.ones(len(values), dtype=bool)
+    batchSize = 4 * maxResultsToInspect
+    coords = []
     nbInspections = 0
-    for result in results:
-      if nbInspections == maxResultsToInspect or len(coords) == maxResults:
+    while nbInspections < maxResultsToInspect and len(coords) < maxResults:
+      remainingIndices = np.flatnonzero(isRemaining)
+      if len(remainingIndices) == 0:
         break
-      relativeCoord = (int(result[0]), int(result[1]), int(result[0] + result[3][0]), int(result[1] + result[3][1]))
-      coord = (areaCoord[0] + math.floor(relativeCoord[0] * sizeRatio[0]), math.ceil(areaCoord[1] + relativeCoord[1] * sizeRatio[1]),
-          math.floor(areaCoord[0] + relativeCoord[2] * sizeRatio[0]), math.ceil(areaCoord[1] + relativeCoord[3] * sizeRatio[1]))
-      if cls._doesOverlay(coord, coords):
-        continue
-      nbInspections += 1
-      resultHash = cls._getRawImageHash(area.crop(relativeCoord))
-      if cls._getRawImageHashDifference(resultHash, imageToFindHash) > threshold:
-        continue
-      coords.append(coord)
+      batchIndices = remainingIndices[cls._getBestIndices(values[remainingIndices], batchSize)]
+      isRemaining[batchIndices] = False
+      nbCoords = len(coords)
+      for index in batchIndices.tolist():
+        if nbInspections == maxResultsToInspect or len(coords) == maxResults:
+          break
+        coord = (int(lefts[index]), int(tops[index]), int(rights[index]), int(bottoms[index]))
+        if cls._doesOverlay(coord, coords):
+          continue
+        nbInspections += 1
+        relativeCoord = (int(relativeLefts[index]), int(relativeTops[index]), int(relativeRights[index]), int(relativeBottoms[index]))
+        resultHash = cls._getRawImageHash(cls._toImage(area.crop(relativeCoord)))
+        if cls._getRawImageHashDifference(resultHash, pyramid.hash) > threshold:
+          continue
+        coords.append(coord)
+      for coord in coords[nbCoords:]:
+        isRemaining &= ~cls._getOverlayMask(coord, lefts, tops, rights - lefts, bottoms - tops)
+    if instrumentation is not None:
+      instrumentation.record(Stage.HASH_VERIFICATION, start)
     return coords
 
   @classmethod
-  def _computeFindImageMatchResults(cls, imageToFind: Image.Image, areaCv: np.ndarray) -> list[tuple]:
+  def _getBestIndices(cls, values: np.ndarray, nbBest: int) -> np.ndarray:
     """
-    :param imageToFind:
-    :param areaCv:
+    Return the indices of the `nbBest` greatest values by decreasing value, equal values by increasing index.
+
+    The values equal to the smallest selected value are all selected so that the selection does not depend on the partition.
+
+    :param values:
+    :param nbBest:
+    """
+    if len(values) > nbBest:
+      smallestBestValue = np.partition(values, len(values) - nbBest)[len(values) - nbBest]
+      indices = np.flatnonzero(values >= smallestBestValue)
+    else:
+      indices = np.arange(len(values))
+    return indices[np.argsort(-values[indices], kind='stable')]
+
+  @classmethod
+  def _computeFindImageMatchResults(cls, imageToFindCv: np.ndarray, areaCv: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return the x and y positions of the matches in the area and their match values, row by row.
+
+    :param imageToFindCv: grayscale pixels of the image to find
+    :param areaCv: grayscale pixels of the area
     """
     import cv2 as cv
 
-    imageToFindCv = np.array(ImageOps.grayscale(imageToFind))
     matches = cv.matchTemplate(areaCv, imageToFindCv, cv.TM_CCOEFF_NORMED)
     # Matches with a very low match value are not considered.
-    indices = np.where(matches >= 0.2)
-    return [(indice[1], indice[0], matches[indice], imageToFind.size) for indice in zip(*indices)]
+    ys, xs = np.nonzero(matches >= 0.2)
+    return xs, ys, matches[ys, xs]
+
+  @classmethod
+  def _computeCoarseToFineMatchResults(cls, imageToFindCv: np.ndarray, areaCv: np.ndarray, searchLevels: int, refineMargin: int,
+      maxCandidates: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Match the image to find in the area downscaled by 2 ** `searchLevels`, then match it at full resolution around
+    the best local maxima of the coarse matches only. Return the same arrays as :meth:`_computeFindImageMatchResults`.
+
+    The levels are reduced so that the downscaled image to find keeps a few pixels in each direction.
+
+    :param imageToFindCv: grayscale pixels of the image to find
+    :param areaCv: grayscale pixels of the area
+    :param searchLevels: number of halvings
+    :param refineMargin: distance in pixels around a candidate searched at full resolution
+    :param maxCandidates: number of refined candidates
+    """
+    import cv2 as cv
+
+    height, width = imageToFindCv.shape
+    while searchLevels > 0 and min(width, height) >> searchLevels < _MIN_COARSE_IMAGE_SIZE:
+      searchLevels -= 1
+    if searchLevels == 0:
+      return cls._computeFindImageMatchResults(imageToFindCv, areaCv)
+    factor = 1 << searchLevels
+    coarseArea = cv.resize(areaCv, (areaCv.shape[1] // factor, areaCv.shape[0] // factor), interpolation=cv.INTER_AREA)
+    coarseImageToFind = cv.resize(imageToFindCv, (width // factor, height // factor), interpolation=cv.INTER_AREA)
+    coarseMatches = cv.matchTemplate(coarseArea, coarseImageToFind, cv.TM_CCOEFF_NORMED)
+    # Candidates are the local maxima so that a single strong match does not take every candidate.
+    isCandidate = (coarseMatches >= cv.dilate(coarseMatches, np.ones((3, 3), np.uint8))) & (coarseMatches >= 0.2)
+    candidateYs, candidateXs = np.nonzero(isCandidate)
+    if len(candidateXs) > maxCandidates:
+      best = np.argpartition(coarseMatches[candidateYs, candidateXs], -maxCandidates)[-maxCandidates:]
+      candidateYs, candidateXs = candidateYs[best], candidateXs[best]
+
+    # The downscaling loses up to factor - 1 pixels of position.
+    margin = max(refineMargin, factor - 1)
+    nbColumns = areaCv.shape[1] - width + 1
+    positions = []
+    values = []
+    for candidateX, candidateY in zip(candidateXs.tolist(), candidateYs.tolist()):
+      left = max(candidateX * factor - margin, 0)
+      top = max(candidateY * factor - margin, 0)
+      right = min(candidateX * factor + margin + width, areaCv.shape[1])
+      bottom = min(candidateY * factor + margin + height, areaCv.shape[0])
+      matches = cv.matchTemplate(areaCv[top:bottom, left:right], imageToFindCv, cv.TM_CCOEFF_NORMED)
+      ys, xs = np.nonzero(matches >= 0.2)
+      positions.append((top + ys) * nbColumns + left + xs)
+      values.append(matches[ys, xs])
+    if len(positions) == 0:
+      return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    # Windows of close candidates overlap: a position is kept once.
+    positions, firstIndices = np.unique(np.concatenate(positions), return_index=True)
+    return positions % nbColumns, positions // nbColumns, np.concatenate(values)[firstIndices]
 
   @classmethod
   def _doesOverlay(cls, coord: AreaCoord, coords: list[AreaCoord]) -> bool:
@@ -525,6 +772,37 @@ class Recognizer():
         return True
     return False
 
+  @classmethod
+  def _getOverlayMask(cls, coord: AreaCoord, lefts: np.ndarray, tops: np.ndarray, widths: np.ndarray,
+      heights: np.ndarray) -> np.ndarray:
+    """
+    Return for each coord of the arrays whether it overlays `coord` as defined by :meth:`_doesOverlay`.
+
+    :param coord:
+    :param lefts:
+    :param tops:
+    :param widths:
+    :param heights:
+    """
+    overlayThreshold = 1 - 0.7
+    return (np.abs(coord[0] - lefts) < overlayThreshold * widths) & (np.abs(coord[1] - tops) < overlayThreshold * heights)
+
+  @classmethod
+  def _toImage(cls, image: Image.Image | ArrayImage) -> Image.Image:
+    """
+    Return the PIL image, for the public results and the libraries only working with PIL.
+
+    :param image:
+    """
+    return image.toImage() if isinstance(image, ArrayImage) else image
+
+  @classmethod
+  def _toArrayImage(cls, image: Image.Image | ArrayImage) -> ArrayImage:
+    """
+    :param image:
+    """
+    return image if isinstance(image, ArrayImage) else ArrayImage.fromImage(image)
+
   @classmethod
   def getImageToFindFromData(cls, imageToFindValue: str) -> Image.Image:
     """
@@ -550,10 +828,26 @@ class Recognizer():
   @classmethod
   def _getRawImageHashFromStr(cls, hashValue: str) -> tuple[ImageHash, ImageHash]:
     """
+    Each call returns new hashes sharing the cached bits of the string.
+
+    :param hashValue:
+    """
+    phashBits, colorhashBits = cls._getImageHashBitsFromStr(hashValue)
+    return (ImageHash(phashBits), ImageHash(colorhashBits))
+
+  @classmethod
+  @lru_cache(maxsize=1024)
+  def _getImageHashBitsFromStr(cls, hashValue: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The parsed bits are cached and read-only.
+
     :param hashValue:
     """
     phashValue, colorhashValue = hashValue.split(',')
-    return (hex_to_hash(phashValue), hex_to_flathash(colorhashValue, 14))
+    bits = (hex_to_hash(phashValue).hash, hex_to_flathash(colorhashValue, 14).hash)
+    for array in bits:
+      array.flags.writeable = False
+    return bits
 
   @classmethod
   def getImageHashDifference(cls, hashA: str, hashB: str) -> int:
@@ -648,6 +942,8 @@ class Recognizer():
     else:
       raise RecognizerValueError('Incomplete data: the list of actions is missing.')
     self.preprocessing.loadData(data)
+    if self.dirtyRegionTracker is not None:
+      self.dirtyRegionTracker.clear()
 
   def clearAllData(self) -> None:
     """
@@ -655,6 +951,58 @@ class Recognizer():
     """
     self.actionById.clear()
     self.preprocessing.clearAllData()
+    if self.dirtyRegionTracker is not None:
+      self.dirtyRegionTracker.clear()
+
+  def setBorders(self, borders: AreaCoord) -> None:
+    """
+    Change the borders, for instance when the window moved.
+
+    The absolute coordinates of every action are computed again, images to find are not decoded again.
+    Executions already running finish with the borders they started with. A running background capture
+    captures the new borders from its next frame.
+
+    .. code-block:: python
+
+      recognizer.setBorders((100, 50, 900, 650))
+
+    :param borders: absolute coordinates (left, top, right, bottom)
+    :raise RecognizerValueError: invalid `borders`
+    """
+    if not self.isBordersDataValid(borders):
+      raise RecognizerValueError('Invalid borders value: expects 4 integers (left, top, right, bottom).')
+    with self._bordersLock:
+      self._setBorders(borders)
+
+  def moveBorders(self, dx: int, dy: int) -> None:
+    """
+    Move the borders by a number of pixels, see :meth:`setBorders`.
+
+    :param dx: horizontal move in pixels
+    :param dy: vertical move in pixels
+    :raise RecognizerValueError: no borders data or invalid move
+    """
+    if not isinstance(dx, int) or not isinstance(dy, int):
+      raise RecognizerValueError('Invalid move: expects integers.')
+    with self._bordersLock:
+      if self.borders is None:
+        raise RecognizerValueError('No borders data.')
+      borders = self.borders
+      self._setBorders((borders[0] + dx, borders[1] + dy, borders[2] + dx, borders[3] + dy))
+
+  def _setBorders(self, borders: AreaCoord) -> None:
+    """
+    Assume the borders lock is held and the borders are valid.
+
+    :param borders:
+    """
+    borders = tuple(borders)
+    for action in list(self.actionById.values()):
+      self._getActionCoord(action, borders)
+    self.borders = borders
+    backgroundCapturer = self.backgroundCapturer
+    if backgroundCapturer is not None:
+      backgroundCapturer.borders = borders
 
   def setAllScreens(self, allScreens: bool) -> None:
     """
@@ -664,6 +1012,45 @@ class Recognizer():
     """
     self.allScreens = allScreens
 
+  def setCaptureScale(self, captureScale: float) -> None:
+    """
+    Set the default scale factor of the captured areas.
+
+    Areas are downsampled when they are captured, before any preprocessing. Actions can override it with their own
+    **captureScale** and executions with the option **captureScale**. Coordinates found in a downsampled area are mapped back
+    to screen coordinates. Points are never downsampled.
+
+    :param captureScale: scale factor in (0, 1], 1 to capture at full resolution
+    :raise RecognizerValueError: invalid `captureScale`
+    """
+    if not self.isCaptureScaleDataValid(captureScale):
+      raise RecognizerValueError('Invalid capture scale: expects a number in (0, 1].')
+    self.captureScale = captureScale
+
+  def setTemplatePyramidCacheSize(self, maxSize: int) -> None:
+    """
+    Set the number of kept template pyramids of the image searches with a capture scale other than 1.
+
+    The images to find are resized to every ratio of their resize interval, converted to grayscale and hashed once when
+    the actions are loaded. For a downsampled capture, they are computed again for each capture scale and kept
+    in :attr:`templatePyramidCache`, the least recently used ones are dropped first.
+
+    :param maxSize: number of kept pyramids - default: 128
+    :raise RecognizerValueError: invalid `maxSize`
+    """
+    self.templatePyramidCache.setMaxSize(maxSize)
+
+  def setCaptureBackend(self, captureBackend: CaptureBackend) -> None:
+    """
+    Set the backend used to grab the screen.
+
+    :param captureBackend:
+    :raise RecognizerValueError: invalid `captureBackend`
+    """
+    if not isinstance(captureBackend, CaptureBackend):
+      raise RecognizerValueError('Invalid capture backend: expects an instance of CaptureBackend.')
+    self.captureBackend = captureBackend
+
   def setOcrOrder(self, ocrOrder: tuple[OcrType, ...] | list[OcrType]) -> None:
     """
     :param ocrOrder:
@@ -797,85 +1184,515 @@ class Recognizer():
       if actionId in self.actionById:
         logger.warning(f'Action id \'{actionId}\' is already used. This action is ignored.')
         return
-      action = cast(ActionDict, {'id': actionId})
     else:
       logger.warning('Invalid action id. This action is ignored.')
       return
 
     if 'ratios' in data and self.isRatiosDataValid(data['ratios']):
-      action['ratios'] = data['ratios']
+      ratios = data['ratios']
     else:
       logger.warning(f'Invalid action ratios. This action \'{actionId}\' is ignored.')
       return
 
     rawType = data.get('type')
     if isinstance(rawType, ActionType):
-      action['type'] = rawType
+      action = Action(actionId, rawType, ratios)
     elif self.isTypeDataValid(rawType):
-      action['type'] = ActionType(rawType)
+      action = Action(actionId, ActionType(rawType), ratios)
     else:
       logger.warning(f'Invalid action type. This action \'{actionId}\' is ignored.')
       return
 
-    if not action['type'].isCompatibleWithSelection(action['ratios']):
+    if 'captureScale' in data:
+      if self.isCaptureScaleDataValid(data['captureScale']):
+        action.captureScale = data['captureScale']
+      else:
+        logger.warning(f'Invalid capture scale value. This action \'{actionId}\' is ignored.')
+        return
+
+    if not action.type.isCompatibleWithSelection(action.ratios):
       logger.warning('Size of action ratios (2) is too small for action type \'{actionType}\'. This action \'{actionId}\' is ignored.'
-          .format(actionType=action['type'].value, actionId=actionId))
+          .format(actionType=action.type.value, actionId=actionId))
       return
 
-    match action['type']:
+    match action.type:
       case ActionType.FIND_IMAGE:
         if 'imageToFind' in data and self.isImageToFindDataValid(data['imageToFind']):
-          action['imageToFind'] = data['imageToFind']
+          action.imageToFind = data['imageToFind']
         else:
           logger.warning(f'Invalid imageToFind value. This action \'{actionId}\' is ignored.')
           return
         if 'threshold' in data and self.isThresholdDataValid(data['threshold']):
-          action['threshold'] = data['threshold']
+          action.threshold = data['threshold']
         else:
           logger.warning(f'Invalid threshold value. This action \'{actionId}\' is ignored.')
           return
         if 'maxResults' in data and self.isMaxResultsDataValid(data['maxResults']):
-          action['maxResults'] = data['maxResults']
+          action.maxResults = data['maxResults']
         else:
           logger.warning(f'Invalid maxResults value. This action \'{actionId}\' is ignored.')
           return
-        action['resizeInterval'] = None
         if 'resizeInterval' in data:
           if self.isResizeIntervalDataValid(data['resizeInterval']):
-            action['resizeInterval'] = data['resizeInterval']
+            action.resizeInterval = data['resizeInterval']
           else:
             logger.warning(f'Invalid min and max size ratios. This action \'{actionId}\' is ignored.')
             return
-        else:
-          action['resizeInterval'] = None
+        if 'resizeStep' in data:
+          if self.isResizeStepDataValid(data['resizeStep']):
+            action.resizeStep = data['resizeStep']
+          else:
+            logger.warning(f'Invalid resize step value. This action \'{actionId}\' is ignored.')
+            return
+        if 'searchLevels' in data:
+          if self.isSearchLevelsDataValid(data['searchLevels']):
+            action.searchLevels = data['searchLevels']
+          else:
+            logger.warning(f'Invalid search levels value. This action \'{actionId}\' is ignored.')
+            return
+        if 'refineMargin' in data:
+          if self.isRefineMarginDataValid(data['refineMargin']):
+            action.refineMargin = data['refineMargin']
+          else:
+            logger.warning(f'Invalid refine margin value. This action \'{actionId}\' is ignored.')
+            return
+        if 'recentMargin' in data:
+          if self.isRecentMarginDataValid(data['recentMargin']):
+            action.recentMargin = data['recentMargin']
+            action.recentLocations = RecentLocations()
+          else:
+            logger.warning(f'Invalid recent margin value. This action \'{actionId}\' is ignored.')
+            return
         assert self.borders is not None
-        if not self.isImageToFindCompatibleWithSelection(action['imageToFind'], self.borders, cast(AreaRatios, action['ratios']),
-            cast(ResizeInterval, action['resizeInterval'])):
+        if not self.isImageToFindCompatibleWithSelection(action.imageToFind, self.borders, cast(AreaRatios, action.ratios),
+            action.resizeInterval):
           logger.warning('The size of the image to find is too big for the selected area considering the max size ratio.'
               f' This action \'{actionId}\' is ignored.')
           return
+        # The image to find is decoded, resized and hashed once instead of at each search.
+        action.imageToFindImage = self.getImageToFindFromData(action.imageToFind)
+        action.imageToFindImage.load()
+        action.templatePyramid = TemplatePyramid(action.imageToFindImage, action.resizeInterval,
+            DEFAULT_RESIZE_STEP if action.resizeStep is None else action.resizeStep)
       case ActionType.COMPARE_PIXEL_COLOR | ActionType.IS_SAME_PIXEL_COLOR:
         if 'pixelColor' in data and self.isPixelColorDataValid(data['pixelColor']):
-          action['pixelColor'] = data['pixelColor']
+          action.pixelColor = data['pixelColor']
         else:
           logger.warning(f'Invalid pixel color value. This action \'{actionId}\' is ignored.')
           return
       case ActionType.COMPARE_IMAGE_HASH | ActionType.IS_SAME_IMAGE_HASH:
         if 'imageHash' in data and self.isImageHashDataValid(data['imageHash']):
-          action['imageHash'] = data['imageHash']
+          action.imageHash = data['imageHash']
+          action.rawImageHash = self._getRawImageHashFromStr(action.imageHash)
         else:
           logger.warning(f'Invalid image hash value. This action \'{actionId}\' is ignored.')
           return
 
-    self.actionById[action['id']] = action
+    assert self.borders is not None
+    self._getActionCoord(action, self.borders)
+    self.actionById[action.id] = action
+
+  def _getActionCoord(self, action: Action, borders: AreaCoord) -> Coord:
+    """
+    Return the absolute coordinates of the action, computed again only when the borders changed.
+
+    :param action:
+    :param borders:
+    """
+    resolvedCoord = action.resolvedCoord
+    if resolvedCoord is not None and resolvedCoord[0] is borders:
+      return resolvedCoord[1]
+    coord = self.getCoord(borders, action.ratios)
+    # Borders and coordinates are replaced together so that concurrent executions never mix them.
+    action.resolvedCoord = (borders, coord)
+    return coord
 
   def getBordersImage(self) -> Image.Image:
     """
     :raise RecognizerValueError: no borders data
     """
+    borders = self.borders
+    if borders is None:
+      raise RecognizerValueError('No borders data.')
+    start = time.perf_counter()
+    image = self.captureBackend.grabArea(borders, self.allScreens)
+    if self.instrumentation is not None:
+      self.instrumentation.record(Stage.CAPTURE, start)
+    return image
+
+  def captureFrame(self) -> Frame:
+    """
+    Capture the borders area.
+
+    :raise RecognizerValueError: no borders data
+    """
+    borders = self.borders
+    if borders is None:
+      raise RecognizerValueError('No borders data.')
+    timestamp = time.time()
+    monotonicTimestamp = time.monotonic()
+    start = time.perf_counter()
+    image = self.captureBackend.grabArea(borders, self.allScreens)
+    if self.instrumentation is not None:
+      self.instrumentation.record(Stage.CAPTURE, start)
+    return Frame(image, borders, timestamp, monotonicTimestamp, time.monotonic() - monotonicTimestamp)
+
+  @classmethod
+  def getCaptureRegions(cls, coords: list[Coord], grabOverhead: int=50000) -> list[AreaCoord]:
+    """
+    Return rectangles covering all the coordinates with the lowest estimated grab cost.
+
+    The cost of a grab is estimated as its number of pixels plus `grabOverhead`. Two rectangles are merged
+    into their bounding box while it's cheaper than grabbing them separately.
+
+    :param coords: absolute coordinates
+    :param grabOverhead: (optional) fixed cost of a grab expressed as a number of pixels - default: 50000
+    """
+    regions = [coord if isArea(coord) else (coord[0], coord[1], coord[0] + 1, coord[1] + 1) for coord in coords]
+    regions = [region for region in regions if region[0] < region[2] and region[1] < region[3]]
+    def getCost(region: AreaCoord) -> int:
+      return (region[2] - region[0]) * (region[3] - region[1]) + grabOverhead
+
+    isMerged = True
+    while isMerged:
+      isMerged = False
+      bestGain = None
+      for i in range(len(regions)):
+        for j in range(i + 1, len(regions)):
+          a, b = regions[i], regions[j]
+          union = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+          gain = getCost(a) + getCost(b) - getCost(union)
+          if gain >= 0 and (bestGain is None or gain > bestGain[0]):
+            bestGain = (gain, i, j, union)
+      if bestGain is not None:
+        _, i, j, union = bestGain
+        regions = [region for k, region in enumerate(regions) if k != i and k != j] + [union]
+        isMerged = True
+    return regions
+
+  def captureActions(self, *actionIds: str, grabOverhead: int=50000) -> Frame:
+    """
+    Capture only the areas of the given actions.
+
+    Close areas are grabbed together, see :meth:`getCaptureRegions`. Use the frame in a frame session: executions
+    of the given actions read their pixels from the frame and other coordinates are still grabbed from the screen.
+
+    .. code-block:: python
+
+      with recognizer.frame(recognizer.captureActions('life', 'mana', 'score')):
+        life = recognizer.executeNumber('life')
+        mana = recognizer.executeNumber('mana')
+
+    :param actionIds: ids of actions
+    :param grabOverhead: (optional) fixed cost of a grab expressed as a number of pixels - default: 50000
+    :raise RecognizerValueError: no borders data or an action id is unknown
+    """
+    borders = self.borders
+    if borders is None:
+      raise RecognizerValueError('No borders data.')
+    coords = []
+    for actionId in actionIds:
+      if not isinstance(actionId, str) or actionId not in self.actionById:
+        raise RecognizerValueError(f'Id \'{actionId}\' is not in the list of available actions.')
+      coords.append(self._getActionCoord(self.actionById[actionId], borders))
+    regions = self.getCaptureRegions(coords, grabOverhead)
+    if len(regions) == 0:
+      raise RecognizerValueError('At least one action id must be specified.')
+    return self._captureRegions(regions)
+
+  def _captureRegions(self, regions: list[AreaCoord]) -> Frame:
+    """
+    Grab the regions and return them in one frame. Several regions are kept as separate images.
+
+    :param regions: assume len(regions) > 0
+    """
+    timestamp = time.time()
+    monotonicTimestamp = time.monotonic()
+    start = time.perf_counter()
+    with self.captureBackend.grabBatch():
+      images = [self.captureBackend.grabArea(region, self.allScreens) for region in regions]
+    if self.instrumentation is not None:
+      self.instrumentation.record(Stage.CAPTURE, start)
+    captureDuration = time.monotonic() - monotonicTimestamp
+    bounds = (min(region[0] for region in regions), min(region[1] for region in regions),
+        max(region[2] for region in regions), max(region[3] for region in regions))
+    if len(regions) == 1:
+      return Frame(images[0], bounds, timestamp, monotonicTimestamp, captureDuration, regions)
+    return Frame(None, bounds, timestamp, monotonicTimestamp, captureDuration, regions, images)
+
+  @property
+  def currentFrame(self) -> Frame | None:
+    """
+    Frame of the frame session of the current thread, see :meth:`frame`.
+    """
+    return getattr(self._frameSession, 'frame', None)
+
+  @contextmanager
+  def frame(self, frame: Frame | None=None) -> Iterator[Frame]:
+    """
+    Capture the borders area once and use it for every execution of the current thread inside the with block.
+
+    Executions without any of the parameters **screenshot**, **screenshotFilepath**, **bordersImage** and **bordersImageFilepath**
+    take their pixels from the frame instead of the screen. Only coordinates outside of the borders are still grabbed from the screen.
+    Results of executions given only action ids or types, and optionally **reinterpret** and **preprocessing**, are memoized
+    for the duration of the frame. Clicks are never memoized.
+
+    .. code-block:: python
+
+      with recognizer.frame() as frame:
+        isMenuOpen = recognizer.executeIsSamePixelColor('menu')
+        score = recognizer.executeNumber('score')
+        print(f'Decision taken {frame.age:.3f}s after the capture.')
+
+    :param frame: (optional) frame to use instead of capturing a new one
+    :raise RecognizerValueError: no borders data
+    """
+    if frame is None:
+      frame = self.captureFrame()
+    previousFrame = self.currentFrame
+    self._frameSession.frame = frame
+    try:
+      yield frame
+    finally:
+      self._frameSession.frame = previousFrame
+
+  def _getExecutionFrame(self, frameNewerThan: float | None) -> Frame | None:
+    """
+    Return the frame of the current frame session or else the newest frame of the background capture if it's running.
+
+    :param frameNewerThan: monotonic timestamp the frame of the background capture must be newer than
+    :raise RecognizerValueError: `frameNewerThan` is given without running background capture
+    """
+    if self.currentFrame is not None:
+      return self.currentFrame
+    if self.backgroundCapturer is not None and self.backgroundCapturer.isRunning:
+      return self.backgroundCapturer.waitForFrame(frameNewerThan)
+    if frameNewerThan is not None:
+      raise RecognizerValueError('Parameter frameNewerThan requires a running background capture.')
+    return None
+
+  def startBackgroundCapture(self, rate: float=30, bufferSize: int=4, maxFrameAge: float | None=None,
+      maxUnreadFrames: int | None=None) -> BackgroundCapturer:
+    """
+    Capture the borders area in a background thread.
+
+    While it's running, executions without screenshot, borders image or frame session use the newest captured frame
+    instead of grabbing the screen. The option **frameNewerThan** waits for a frame captured after a given time.
+
+    .. code-block:: python
+
+      recognizer.startBackgroundCapture(rate=20, maxFrameAge=0.2)
+      clickTime = time.monotonic()
+      recognizer.executeClick('open')
+      isOpen = recognizer.executeIsSamePixelColor('isOpen', frameNewerThan=clickTime)
+      recognizer.stopBackgroundCapture()
+
+    :param rate: (optional) maximum number of captures per second - default: 30
+    :param bufferSize: (optional) maximum number of frames kept, the oldest frame is dropped first - default: 4
+    :param maxFrameAge: (optional) frames older than this duration in seconds are dropped - default: no limit
+    :param maxUnreadFrames: (optional) pause the capture when this number of frames has been captured
+      since the last read - default: never pause
+    :raise RecognizerValueError: no borders data or invalid parameter
+    """
     if self.borders is None:
       raise RecognizerValueError('No borders data.')
-    return self.getArea(self.borders, self.allScreens)
+    self.stopBackgroundCapture()
+    self.backgroundCapturer = BackgroundCapturer(self.captureBackend, self.borders, rate, bufferSize, maxFrameAge,
+        maxUnreadFrames, self.allScreens)
+    self.backgroundCapturer.start()
+    return self.backgroundCapturer
+
+  def stopBackgroundCapture(self) -> None:
+    """
+    Stop the background capture if it's running.
+    """
+    if self.backgroundCapturer is not None:
+      self.backgroundCapturer.stop()
+      self.backgroundCapturer = None
+
+  def enableDirtyRegionDetection(self, tileSize: int=32) -> DirtyRegionTracker:
+    """
+    Reuse the results of executions whose pixels did not change since a previous frame.
+
+    Each new frame, from a frame session or from the background capture, is compared tile by tile with the previous one.
+    An execution memoizable in a frame, see :meth:`frame`, returns its previous result when none of the tiles
+    under the coordinates of its actions changed since it was computed.
+
+    .. code-block:: python
+
+      tracker = recognizer.enableDirtyRegionDetection()
+      recognizer.startBackgroundCapture()
+      while isRunning:
+        score = recognizer.executeNumber('score')
+      print(f'{tracker.nbHits} hits, {tracker.nbMisses} misses.')
+
+    :param tileSize: (optional) width and height in pixels of the compared tiles - default: 32
+    :raise RecognizerValueError: invalid `tileSize`
+    """
+    self.dirtyRegionTracker = DirtyRegionTracker(tileSize)
+    return self.dirtyRegionTracker
+
+  def disableDirtyRegionDetection(self) -> None:
+    """
+    Stop reusing the results of previous frames.
+    """
+    self.dirtyRegionTracker = None
+
+  def enableInstrumentation(self, trace: bool=False, maxTraceEvents: int=100000) -> Instrumentation:
+    """
+    Measure the duration of each step of the pipelines and of their stages: capture, preprocessing, template matching,
+    hash verification of the found images, image hash and OCR.
+
+    The counters and latency histograms by stage and by action are returned by :meth:`stats`. Hooks can be called
+    after each measure and the measures can be exported as Chrome trace events. When disabled, the executions
+    only check that there is no instrumentation.
+
+    .. code-block:: python
+
+      instrumentation = recognizer.enableInstrumentation(trace=True)
+      instrumentation.addHook(lambda stage, actionId, start, duration: duration > 0.1 and print(stage, actionId, duration))
+      recognizer.executeFindImage('enemy')
+      print(recognizer.stats()['stages']['matchTemplate']['mean'])
+      instrumentation.exportChromeTrace('trace.json')
+
+    :param trace: (optional) whether to keep the measures as Chrome trace events - default: False
+    :param maxTraceEvents: (optional) number of kept trace events, the oldest ones are dropped - default: 100000
+    :raise RecognizerValueError: invalid `maxTraceEvents`
+    """
+    self.instrumentation = Instrumentation(trace, maxTraceEvents)
+    return self.instrumentation
+
+  def disableInstrumentation(self) -> None:
+    """
+    Stop measuring the executions.
+    """
+    self.instrumentation = None
+
+  def stats(self) -> InstrumentationStatsDict:
+    """
+    Return the counters and latency histograms by stage and by action, empty without instrumentation.
+
+    See :meth:`enableInstrumentation`.
+    """
+    if self.instrumentation is None:
+      return {'stages': {}, 'actions': {}}
+    return self.instrumentation.getStats()
+
+  def _getPipelineRegion(self, actionIdOrTypes: Sequence[str | ActionType], frame: Frame, borders: AreaCoord) -> AreaCoord | None:
+    """
+    Return the bounding box of the coordinates of the given actions or None if it's not inside the frame.
+
+    :param actionIdOrTypes:
+    :param frame:
+    :param borders:
+    """
+    region = None
+    for actionIdOrType in actionIdOrTypes:
+      if not isinstance(actionIdOrType, str):
+        continue
+      coord = self._getActionCoord(self.actionById[actionIdOrType], borders)
+      if not isArea(coord):
+        coord = (coord[0], coord[1], coord[0] + 1, coord[1] + 1)
+      if not frame.containsCoord(coord):
+        return None
+      if region is None:
+        region = coord
+      else:
+        region = (min(region[0], coord[0]), min(region[1], coord[1]), max(region[2], coord[2]), max(region[3], coord[3]))
+    return region
+
+  def _getFrameResultKey(self, actionIdOrTypes: list[str | ActionType], kwargs: ExecuteParams) -> tuple | None:
+    """
+    Return the key used to memoize the result of an execution inside a frame or None if it cannot be memoized.
+    The key includes the borders and the capture scale so that changing them in a frame session computes the result again.
+
+    :param actionIdOrTypes:
+    :param kwargs:
+    """
+    if any(name not in ('reinterpret', 'preprocessing', 'frame', 'frameNewerThan') for name in kwargs):
+      return None
+    if 'reinterpret' in kwargs:
+      lastActionType = kwargs['reinterpret']
+    elif isinstance(actionIdOrTypes[-1], str):
+      lastActionType = self.actionById[actionIdOrTypes[-1]].type
+    else:
+      lastActionType = actionIdOrTypes[-1]
+    if lastActionType == ActionType.CLICK:
+      return None
+    borders = self.borders
+    return (tuple(actionIdOrTypes), kwargs.get('reinterpret'), kwargs.get('preprocessing'),
+        None if borders is None else tuple(borders), self.captureScale)
+
+  def _getLivePoint(self, coord: Coord, frame: Frame | None) -> Point:
+    """
+    Return the point from the frame if it contains it, from the capture backend otherwise.
+
+    :param coord:
+    :param frame:
+    """
+    if frame is not None and frame.containsCoord(coord):
+      return frame.getPoint(coord)
+    start = time.perf_counter()
+    point = self.captureBackend.grabPoint(coord, self.allScreens)
+    if self.instrumentation is not None:
+      self.instrumentation.record(Stage.CAPTURE, start)
+    return point
+
+  def _getLiveArea(self, coord: AreaCoord, frame: Frame | None, captureScale: float=1) -> Image.Image | ArrayImage:
+    """
+    Return the area from the frame if it contains it, from the capture backend otherwise.
+
+    :param coord:
+    :param frame:
+    :param captureScale: (optional) scale factor of the area
+    """
+    if frame is not None and frame.containsCoord(coord):
+      return self._scaleArea(frame.getArea(coord), captureScale)
+    start = time.perf_counter()
+    if captureScale == 1:
+      area = self.captureBackend.grabArea(coord, self.allScreens)
+    else:
+      area = self.captureBackend.grabAreaScaled(coord, captureScale, self.allScreens)
+    if self.instrumentation is not None:
+      self.instrumentation.record(Stage.CAPTURE, start)
+    return area
+
+  def _scaleArea(self, area: Image.Image | ArrayImage, captureScale: float) -> Image.Image | ArrayImage:
+    """
+    :param area:
+    :param captureScale:
+    """
+    if captureScale == 1:
+      return area
+    return scaleImage(self._toImage(area), captureScale)
+
+  def _getCaptureScale(self, action: Action | None, pipeInfo: PipeInfoDict) -> float:
+    """
+    :param action:
+    :param pipeInfo:
+    :raise RecognizerValueError: invalid option captureScale
+    """
+    if 'captureScale' in pipeInfo:
+      if not self.isCaptureScaleDataValid(pipeInfo['captureScale']):
+        raise RecognizerValueError('Invalid captureScale value: expects a number in (0, 1].')
+      return pipeInfo['captureScale']
+    if action is not None and action.captureScale is not None:
+      return action.captureScale
+    return self.captureScale
+
+  def _setScaledSelectedArea(self, area: Image.Image | ArrayImage, coord: AreaCoord, captureScale: float, pipeInfo: PipeInfoDict) -> None:
+    """
+    Set the selected area captured with a scale factor and the matching size ratio.
+
+    :param area: area of `coord` already downsampled by `captureScale`
+    :param coord:
+    :param captureScale:
+    :param pipeInfo:
+    """
+    pipeInfo['selectedArea'] = area # type: ignore
+    if captureScale != 1:
+      pipeInfo['captureScale'] = captureScale
+      pipeInfo['sizeRatio'] = ((coord[2] - coord[0]) / area.width, (coord[3] - coord[1]) / area.height)
 
   def executeCoordinates(self, *args: str | ActionType, **kwargs: Unpack[ExecuteParams]) -> Coord:
     """
@@ -987,7 +1804,7 @@ class Recognizer():
     :return: The result of the last action in the pipeline.
 
     If none of the parameters **screenshot**, **screenshotFilepath**, **bordersImage** and **bordersImageFilepath** is given,
-    the screen is used when necessary.
+    the screen is used when necessary. Inside a frame session, see :meth:`frame`, the captured frame is used instead.
 
     With option **reinterpret**, the last action, if given by an id, is executed as if it was from the given type.
     An exception is raised if some parameters are missing.
@@ -1003,6 +1820,388 @@ class Recognizer():
       * A needed parameter is missing while using an action type
       * Last action type is not the expected one
     """
+    actionIdOrTypes = self._checkExecuteParams(args, expectedActionType, kwargs)
+    steps = self._getPipeSteps(actionIdOrTypes, kwargs.get('reinterpret'))
+    return self._executePipeSteps(steps, actionIdOrTypes, kwargs, self._getFrameResultKey(actionIdOrTypes, kwargs))
+
+  @overload
+  def executeMany(self, requests: Mapping[Any, ExecuteRequest], **kwargs: Unpack[ExecuteParams]) -> dict[Any, AnyActionReturnType]: ...
+  @overload
+  def executeMany(self, requests: Sequence[ExecuteRequest], **kwargs: Unpack[ExecuteParams]) -> list[AnyActionReturnType]: ...
+  def executeMany(self, requests: Mapping[Any, ExecuteRequest] | Sequence[ExecuteRequest],
+      **kwargs: Unpack[ExecuteParams]) -> dict[Any, AnyActionReturnType] | list[AnyActionReturnType]:
+    """
+    Execute many pipelines on the same pixels and compute what they have in common once.
+
+    A request is an action id or type, or a tuple of action ids or types optionally ending with a dict of parameters
+    added to the parameters given to every request. Pipelines starting on the same coordinates with the same capture scale
+    and preprocessing share their selection, pixel color and image hash: they are computed by the first of these pipelines
+    and the others only execute their remaining steps. Identical requests are executed once.
+
+    Without screenshot, borders image or frame, the frame of the frame session or of the background capture is used.
+    Otherwise the areas of the requests are captured once, see :meth:`captureActions`, and every request reads them.
+    A request given its own screenshot, borders image or frame reads it instead.
+
+    Requests are executed in order and read the same pixels even after a click. With parallel execution, see :meth:`enableParallelExecution`, requests which don't share
+    their first steps are executed concurrently between two clicks and the results are still returned in order.
+
+    .. code-block:: python
+
+      results = recognizer.executeMany({
+        'available': ('buildingAvailableDiff', {'coord': buildingCoord}),
+        'unavailable': ('buildingUnavailableDiff', {'coord': buildingCoord})})
+      if results['available'] < results['unavailable']:
+        recognizer.executeClick(ActionType.CLICK, coord=buildingCoord)
+
+    :param requests: requests in a list or by key in a dict
+    :param kwargs: Extra parameters given to every request, see :class:`.ExecuteParams`
+    :return: The result of each request, in the same order or by the same key.
+    :raises RecognizerValueError: a request is invalid, see :meth:`execute`. Nothing is executed.
+    """
+    if isinstance(requests, Mapping):
+      keys = list(requests.keys())
+      requests = list(requests.values())
+    else:
+      keys = None
+    self._checkExecuteKwargs(kwargs)
+    borders = kwargs.get('borders', self.borders)
+    hasSource = 'frame' in kwargs or 'screenshot' in kwargs or 'bordersImage' in kwargs
+
+    batch = []
+    for request in requests:
+      args, requestKwargs = self._getRequestArgs(request)
+      if any(name in requestKwargs for name in self._SOURCE_NAMES):
+        # The pixels of the request replace the shared ones.
+        pipeInfo = cast(ExecuteParams, {name: value for name, value in kwargs.items() if name not in self._SOURCE_NAMES})
+        pipeInfo.update(requestKwargs)
+      else:
+        pipeInfo = cast(ExecuteParams, {**kwargs, **requestKwargs})
+      actionIdOrTypes = self._checkExecuteParams(args, None, pipeInfo)
+      steps = self._getPipeSteps(actionIdOrTypes, pipeInfo.get('reinterpret'))
+      frameResultKey = self._getFrameResultKey(actionIdOrTypes, pipeInfo)
+      isIndependent = 'borders' in requestKwargs or any(name in requestKwargs for name in self._SOURCE_NAMES)
+      batchKey = None
+      prefixKey = None
+      if not isIndependent:
+        batchKey = self._getFrameResultKey(actionIdOrTypes, cast(ExecuteParams, {name: value for name, value in pipeInfo.items()
+            if name in requestKwargs or name in ('reinterpret', 'preprocessing')}))
+        prefixKey = self._getPrefixKey(steps, pipeInfo, borders)
+      isClick = steps[-1][0] == self._pipeExecuteActionClick
+      batch.append((actionIdOrTypes, steps, pipeInfo, frameResultKey, isIndependent, isClick, batchKey, prefixKey))
+
+    frame = None
+    if not hasSource:
+      frame = self._getExecutionFrame(kwargs.get('frameNewerThan'))
+      if frame is None:
+        regions = self.getCaptureRegions([prefixKey[0] for *_, prefixKey in batch if prefixKey is not None])
+        if len(regions) > 0:
+          frame = self._captureRegions(regions)
+
+    results: list[AnyActionReturnType] = [None] * len(batch)
+    resultByBatchKey = {}
+    valuesByPrefixKey = {}
+    def executeRequests(indexes: list[int]) -> None:
+      for index in indexes:
+        actionIdOrTypes, steps, pipeInfo, frameResultKey, isIndependent, _, batchKey, prefixKey = batch[index]
+        if batchKey is not None and batchKey in resultByBatchKey:
+          results[index] = resultByBatchKey[batchKey]
+          continue
+        if not isIndependent:
+          pipeInfo.pop('frameNewerThan', None)
+          if frame is not None:
+            pipeInfo['frame'] = frame
+          if borders is not None:
+            pipeInfo['borders'] = borders
+        if prefixKey is not None and prefixKey in valuesByPrefixKey:
+          pipeInfo.update(valuesByPrefixKey[prefixKey])
+          # The shared area is already preprocessed.
+          pipeInfo.pop('preprocessing', None)
+        result = self._executePipeSteps(steps, actionIdOrTypes, pipeInfo, frameResultKey)
+        if prefixKey is not None and (prefixKey in valuesByPrefixKey or 'selectedPoint' in pipeInfo or 'selectedArea' in pipeInfo):
+          # Later steps of the pipeline may have computed more shared values.
+          valuesByPrefixKey.setdefault(prefixKey, {}).update({name: pipeInfo[name] for name in self._PREFIX_NAMES if name in pipeInfo})
+        if batchKey is not None:
+          resultByBatchKey[batchKey] = result
+        results[index] = result
+
+    executor = self.executor
+    if executor is None:
+      executeRequests(list(range(len(batch))))
+    else:
+      # Requests sharing their first steps or identical are executed one after another by the same task.
+      indexesByGroup: dict[Any, list[int]] = {}
+      for index, (*_, isClick, batchKey, prefixKey) in enumerate(batch):
+        if isClick:
+          self._executeGroups(executor, list(indexesByGroup.values()), executeRequests)
+          indexesByGroup = {}
+          executeRequests([index])
+          continue
+        group = prefixKey if prefixKey is not None else batchKey if batchKey is not None else index
+        indexesByGroup.setdefault(group, []).append(index)
+      self._executeGroups(executor, list(indexesByGroup.values()), executeRequests)
+    if keys is not None:
+      return dict(zip(keys, results))
+    return results
+
+  def _executeGroups(self, executor: ThreadPoolExecutor, groups: list[list[int]],
+      executeRequests: Callable[[list[int]], None]) -> None:
+    """
+    Execute the groups of requests concurrently and wait for all of them.
+
+    :param executor:
+    :param groups: indexes of the requests of each group
+    :param executeRequests: function executing the requests of a group one after another
+    :raise RecognizerValueError: the first error of the groups in order
+    """
+    if len(groups) <= 1:
+      for indexes in groups:
+        executeRequests(indexes)
+      return
+    futures = [executor.submit(executeRequests, indexes) for indexes in groups]
+    for future in futures:
+      future.result()
+
+  def enableParallelExecution(self, maxWorkers: int | None=None) -> ThreadPoolExecutor:
+    """
+    Execute the independent requests of :meth:`executeMany` concurrently on a thread pool.
+
+    Image search, preprocessing, hashing and OCR release the GIL for most of their work so independent requests
+    against the same frame run in parallel on several cores.
+
+    .. code-block:: python
+
+      recognizer.enableParallelExecution(maxWorkers=4)
+      coordsByAction = recognizer.executeMany({actionId: actionId for actionId in findImageActionIds})
+
+    :param maxWorkers: (optional) number of threads - default: the default of ThreadPoolExecutor
+    :raise RecognizerValueError: invalid `maxWorkers`
+    """
+    if maxWorkers is not None and (not isinstance(maxWorkers, int) or maxWorkers <= 0):
+      raise RecognizerValueError('Invalid maxWorkers value: expects a positive integer.')
+    self.disableParallelExecution()
+    self.executor = ThreadPoolExecutor(maxWorkers, thread_name_prefix='guirecognizer')
+    return self.executor
+
+  def disableParallelExecution(self) -> None:
+    """
+    Execute the requests of :meth:`executeMany` one after another and stop the threads of the pool.
+    """
+    if self.executor is not None:
+      self.executor.shutdown()
+      self.executor = None
+
+  def enableParallelScales(self, maxWorkers: int | None=None) -> ThreadPoolExecutor:
+    """
+    Match the sizes of the resize interval of an image search concurrently on a thread pool.
+
+    The threads share the grayscale pixels of the area and the template matching releases the GIL, so an image search
+    with a large resize interval runs on several cores. The pool is not the one of :meth:`enableParallelExecution`:
+    both can be enabled.
+
+    .. code-block:: python
+
+      recognizer.enableParallelScales(maxWorkers=4)
+      coords = recognizer.executeFindImage('coin')
+
+    :param maxWorkers: (optional) number of threads - default: the default of ThreadPoolExecutor
+    :raise RecognizerValueError: invalid `maxWorkers`
+    """
+    if maxWorkers is not None and (not isinstance(maxWorkers, int) or maxWorkers <= 0):
+      raise RecognizerValueError('Invalid maxWorkers value: expects a positive integer.')
+    self.disableParallelScales()
+    self.scaleExecutor = ThreadPoolExecutor(maxWorkers, thread_name_prefix='guirecognizer-scales')
+    return self.scaleExecutor
+
+  def disableParallelScales(self) -> None:
+    """
+    Match the sizes of an image search one after another and stop the threads of the pool.
+    """
+    if self.scaleExecutor is not None:
+      self.scaleExecutor.shutdown()
+      self.scaleExecutor = None
+
+  def _getRequestArgs(self, request: ExecuteRequest) -> tuple[tuple[str | ActionType, ...], ExecuteParams]:
+    """
+    Return the action ids or types and a copy of the parameters of a request of :meth:`executeMany`.
+
+    :param request:
+    :raise RecognizerValueError: invalid request
+    """
+    if isinstance(request, (str, ActionType)):
+      return (request,), {}
+    if isinstance(request, (tuple, list)) and len(request) > 0:
+      if isinstance(request[-1], dict):
+        return tuple(request[:-1]), cast(ExecuteParams, dict(request[-1]))
+      return tuple(request), {}
+    raise RecognizerValueError(f'Invalid request \'{request}\': expects an action id or type'
+        ' or a tuple of action ids or types optionally ending with a dict of parameters.')
+
+  def _getPrefixKey(self, steps: list[PipeStep], pipeInfo: ExecuteParams, borders: AreaCoord | None) -> tuple | None:
+    """
+    Return the key of the values computed by the first steps of a pipeline or None if they cannot be shared.
+
+    :param steps:
+    :param pipeInfo: checked parameters of the pipeline
+    :param borders:
+    :raise RecognizerValueError: invalid option captureScale
+    """
+    if any(name in pipeInfo for name in self._VALUE_NAMES) or steps[-1][0] == self._pipeExecuteActionClick:
+      return None
+    firstAction = steps[0][1]
+    if 'coord' in pipeInfo:
+      if not self.isCoordDataValid(pipeInfo['coord']):
+        return None
+      coord = tuple(pipeInfo['coord'])
+    elif firstAction is not None and borders is not None:
+      coord = self._getActionCoord(firstAction, borders)
+    else:
+      return None
+    captureScales = tuple(self._getCaptureScale(action, pipeInfo) for _, action, _ in steps)
+    return (coord, captureScales, pipeInfo.get('preprocessing'))
+
+  def compile(self, *args: str | ActionType, expectedActionType: ActionType | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> CompiledPlan:
+    """
+    Check and resolve a pipeline once and return a plan executing it each time it's called.
+
+    The actions, their handlers, the absolute coordinates and the references of the comparisons are resolved here
+    so a call only runs the steps of the pipeline. The coordinates are resolved again when the borders change.
+    Like :meth:`execute`, a call uses the frame of a frame session or of the background capture
+    and memoizes its result in the frame.
+
+    .. code-block:: python
+
+      isMenuOpen = recognizer.compile('menu', ActionType.IS_SAME_PIXEL_COLOR)
+      while not isMenuOpen():
+        time.sleep(0.1)
+
+    :param args: Action ids or types. At least one must be given.
+    :param expectedActionType: Expected last action type or through reinterpret option. Raises an exception if wrong type.
+    :param kwargs: Extra parameters given to every execution, see :class:`.ExecuteParams`.
+      Parameters given to a call, see :class:`.PlanParams`, are added to them.
+    :raises RecognizerValueError: same as :meth:`execute` for the given parameters
+    """
+    actionIdOrTypes = self._checkExecuteParams(args, expectedActionType, kwargs)
+    steps = self._getPipeSteps(actionIdOrTypes, kwargs.get('reinterpret'))
+    frameResultKey = self._getFrameResultKey(actionIdOrTypes, kwargs)
+    referenceNamesByHandler = {
+      self._pipeExecuteActionComparePixelColor: ('pixelColorReference', 'pixelColor'),
+      self._pipeExecuteActionIsSamePixelColor: ('pixelColorReference', 'pixelColor'),
+      self._pipeExecuteActionCompareImageHash: ('imageHashReference', 'imageHash'),
+      self._pipeExecuteActionIsSameImageHash: ('imageHashReference', 'imageHash')}
+    resolvedNames = set()
+    for handler, action, _ in steps:
+      if handler not in referenceNamesByHandler:
+        continue
+      referenceName, actionName = referenceNamesByHandler[handler]
+      # Like in the pipeline, the first comparison sets the reference.
+      if referenceName not in resolvedNames and referenceName not in kwargs and action is not None \
+          and getattr(action, actionName) is not None:
+        kwargs[referenceName] = getattr(action, actionName)
+      resolvedNames.add(referenceName)
+    return CompiledPlan(self, actionIdOrTypes, steps, kwargs, frameResultKey)
+
+  def watch(self, requests: Mapping[Any, ExecuteRequest] | Sequence[ExecuteRequest], rate: float=10,
+      **kwargs: Unpack[ExecuteParams]) -> Watcher:
+    """
+    Return an iterator and async iterator yielding an event each time the result of a request changes.
+
+    Requests are the same as in :meth:`executeMany`. At each poll, at the given rate, the areas of all the requests
+    are captured once, or the newest frame of the background capture is taken, and only the requests whose pixels changed
+    since the previous poll are executed. The first poll yields the first result of every request.
+
+    .. code-block:: python
+
+      for event in recognizer.watch(['score', 'isGameOver'], rate=20):
+        print(event.key, event.previousResult, '->', event.result, 'at', event.timestamp)
+
+      async for event in recognizer.watch({'life': ('lifeBar', ActionType.PIXEL_COLOR)}):
+        ...
+
+    :param requests: requests in a list or by key in a dict
+    :param rate: (optional) number of polls per second - default: 10
+    :param kwargs: Extra parameters given to every request, see :class:`.ExecuteParams`
+    :return: Watcher yielding :class:`guirecognizer.WatchEvent`, stopped by :meth:`guirecognizer.Watcher.close`.
+    :raises RecognizerValueError: invalid rate, a request is invalid or clicks, or a screenshot, borders image
+      or frame is given
+    """
+    return Watcher(self, requests, rate, kwargs)
+
+  def waitUntil(self, *args: str | ActionType, predicate: Callable[[Any], bool] | None=None, timeout: float | None=None,
+      interval: float=0.01, maxInterval: float=0.5, backoff: float=1.5, expectedActionType: ActionType | None=None,
+      **kwargs: Unpack[ExecuteParams]) -> AnyActionReturnType:
+    """
+    Execute the pipeline until its result satisfies the predicate and return this result.
+
+    The pipeline is compiled once, see :meth:`compile`, and each poll only grabs the area of its first action.
+    The first polls are close to each other to react quickly, then the interval grows by the factor **backoff**
+    up to **maxInterval** to spare the CPU during long waits. A frame session is ignored during the wait
+    since its frame never changes. With a running background capture, each poll uses the newest frame.
+
+    .. code-block:: python
+
+      recognizer.waitUntil('isStartMenu')
+      score = recognizer.waitUntil('score', ActionType.NUMBER, predicate=lambda number: number is not None, timeout=10)
+
+    :param args: Action ids or types. At least one must be given.
+    :param predicate: (optional) condition on the result - default: the result is truthy
+    :param timeout: (optional) maximum duration of the wait in seconds - default: no limit
+    :param interval: (optional) first interval between two polls in seconds - default: 0.01
+    :param maxInterval: (optional) maximum interval between two polls in seconds - default: 0.5
+    :param backoff: (optional) factor applied to the interval after each poll - default: 1.5
+    :param expectedActionType: Expected last action type or through reinterpret option. Raises an exception if wrong type.
+    :param kwargs: Extra parameters given to every execution, see :class:`.ExecuteParams`
+    :return: The first result satisfying the predicate.
+    :raises RecognizerValueError: same as :meth:`execute` or invalid wait parameter
+    :raises TimeoutError: the predicate is still not satisfied after the timeout
+    """
+    self._checkWaitParams(timeout, interval, maxInterval, backoff)
+    plan = self.compile(*args, expectedActionType=expectedActionType, **kwargs)
+    if predicate is None:
+      predicate = bool
+    deadline = None if timeout is None else time.monotonic() + timeout
+    previousFrame = self.currentFrame
+    self._frameSession.frame = None
+    try:
+      while True:
+        result = plan()
+        if predicate(result):
+          return result
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+          raise TimeoutError(f'{plan!r} did not satisfy the predicate after {timeout} seconds.')
+        time.sleep(interval if remaining is None else min(interval, remaining))
+        interval = min(interval * backoff, maxInterval)
+    finally:
+      self._frameSession.frame = previousFrame
+
+  @classmethod
+  def _checkWaitParams(cls, timeout: float | None, interval: float, maxInterval: float, backoff: float) -> None:
+    """
+    Check the parameters of a wait, see :meth:`waitUntil`.
+
+    :raise RecognizerValueError: invalid parameter
+    """
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout < 0):
+      raise RecognizerValueError('Invalid timeout. It must be a positive number of seconds or None.')
+    if not isinstance(interval, (int, float)) or interval <= 0:
+      raise RecognizerValueError('Invalid interval. It must be a strictly positive number of seconds.')
+    if not isinstance(maxInterval, (int, float)) or maxInterval < interval:
+      raise RecognizerValueError('Invalid maxInterval. It must be a number of seconds greater than or equal to interval.')
+    if not isinstance(backoff, (int, float)) or backoff < 1:
+      raise RecognizerValueError('Invalid backoff. It must be a number greater than or equal to 1.')
+
+  def _checkExecuteParams(self, args: tuple[str | ActionType, ...], expectedActionType: ActionType | None,
+      kwargs: ExecuteParams) -> list[str | ActionType]:
+    """
+    Check the action ids or types and the parameters of an execution.
+
+    :param args:
+    :param expectedActionType:
+    :param kwargs: modified in place, see :meth:`_checkExecuteKwargs`
+    :return: the action ids or types
+    :raise RecognizerValueError: invalid parameter, see :meth:`execute`
+    """
     actionIdOrTypes = []
     for actionIdOrType in args:
       if not isinstance(actionIdOrType, (str, ActionType)):
@@ -1012,13 +2211,33 @@ class Recognizer():
             ' Maybe it\'s a typo or the action was ignored during the data loading because of an import issue.'
             ' You can check the logs for warnings about import issues.')
       actionIdOrTypes.append(actionIdOrType)
+    if len(actionIdOrTypes) == 0:
+      raise RecognizerValueError('At least one action id must be specified.')
+    self._checkExecuteKwargs(kwargs)
+
+    if expectedActionType is not None:
+      if 'reinterpret' in kwargs:
+        lastAction = kwargs['reinterpret']
+      elif isinstance(actionIdOrTypes[-1], str):
+        lastAction = self.actionById[actionIdOrTypes[-1]].type
+      else:
+        lastAction = actionIdOrTypes[-1]
+      if lastAction != expectedActionType:
+        raise RecognizerValueError('Last action type is not the expected one.')
+    return actionIdOrTypes
+
+  def _checkExecuteKwargs(self, kwargs: ExecuteParams) -> None:
+    """
+    Check the parameters of an execution, open the images of the filepath parameters and wrap the numpy arrays.
+
+    :param kwargs: modified in place
+    :raise RecognizerValueError: invalid parameter, see :meth:`execute`
+    """
     if 'preprocessing' in kwargs:
       try:
         self.preprocessing.checkProcessInput(kwargs['preprocessing'])
       except RecognizerValueError as e:
         raise RecognizerValueError(f'Invalid parameter preprocessing. {str(e)}')
-    if len(actionIdOrTypes) == 0:
-      raise RecognizerValueError('At least one action id must be specified.')
     if 'reinterpret' in kwargs and not isinstance(kwargs['reinterpret'], ActionType):
       raise RecognizerValueError('Invalid parameter reinterpret: expects an action type.')
 
@@ -1042,6 +2261,13 @@ class Recognizer():
             .format(filepath=kwargs['bordersImageFilepath']))
     if 'screenshot' in kwargs and 'bordersImage' in kwargs:
       raise RecognizerValueError('Cannot specify both a screenshot and a borders image.')
+    for name in ('screenshot', 'bordersImage'):
+      if name in kwargs and isinstance(kwargs[name], np.ndarray):
+        if not ArrayImage.isArrayDataValid(kwargs[name]):
+          raise RecognizerValueError(f'Invalid {name} value: expects a uint8 array of shape (height, width),'
+              ' (height, width, 3) or (height, width, 4).')
+        # The array is wrapped without any copy.
+        kwargs[name] = ArrayImage(kwargs[name]) # type: ignore
     if 'selectedAreaFilepath' in kwargs:
       if 'selectedArea' in kwargs:
         raise RecognizerValueError('Cannot specify both parameters selectedArea and selectedAreaFilepath.')
@@ -1052,88 +2278,151 @@ class Recognizer():
         raise RecognizerValueError('Could not open selected area filepath \'{filepath}\''
             .format(filepath=kwargs['selectedAreaFilepath']))
 
-    if expectedActionType is not None:
-      if 'reinterpret' in kwargs:
-        lastAction = kwargs['reinterpret']
-      elif isinstance(actionIdOrTypes[-1], str):
-        action = self.actionById[actionIdOrTypes[-1]]
-        lastAction = action['type']
-      else:
-        lastAction = actionIdOrTypes[-1]
-      if lastAction != expectedActionType:
-        raise RecognizerValueError('Last action type is not the expected one.')
+    if 'frame' in kwargs:
+      if not isinstance(kwargs['frame'], Frame):
+        raise RecognizerValueError('Invalid parameter frame: expects a frame.')
+      if 'screenshot' in kwargs or 'bordersImage' in kwargs:
+        raise RecognizerValueError('Cannot specify both a frame and a screenshot or a borders image.')
+    if 'borders' in kwargs and not self.isBordersDataValid(kwargs['borders']):
+      raise RecognizerValueError('Invalid parameter borders: expects 4 integers (left, top, right, bottom).')
+    if 'frameNewerThan' in kwargs and not isinstance(kwargs['frameNewerThan'], (int, float)):
+      raise RecognizerValueError('Invalid parameter frameNewerThan: expects a monotonic timestamp.')
+    if 'sizeRatio' in kwargs and not self.isSizeRatioDataValid(kwargs['sizeRatio']):
+      raise RecognizerValueError('Invalid parameter sizeRatio: expects 2 positive numbers.')
+
+  def _executePipeSteps(self, steps: list[PipeStep], actionIdOrTypes: Sequence[str | ActionType], pipeInfo: ExecuteParams,
+      frameResultKey: tuple | None) -> AnyActionReturnType:
+    """
+    Take the frame of the execution if there is one, return the result memoized in the frame or run the steps.
+
+    :param steps:
+    :param actionIdOrTypes: action ids or types of the steps
+    :param pipeInfo: modified in place
+    :param frameResultKey: key of the result in the frame, None if it cannot be memoized
+    """
+    frameNewerThan = pipeInfo.pop('frameNewerThan', None)
+    borders = self.borders
+    if 'borders' not in pipeInfo and borders is not None:
+      # The borders can be changed by another thread during the execution.
+      pipeInfo['borders'] = borders
+    if 'frame' not in pipeInfo and 'screenshot' not in pipeInfo and 'bordersImage' not in pipeInfo:
+      frame = self._getExecutionFrame(frameNewerThan)
+      if frame is not None:
+        pipeInfo['frame'] = frame
+
+    frame = pipeInfo.get('frame')
+    if frame is None:
+      frameResultKey = None
+    if frame is not None and frameResultKey is not None and frameResultKey in frame.results:
+      # Each execution of the frame gets its own copy of a list or an image.
+      return copyResult(frame.results[frameResultKey])
+
+    dirtyRegionTracker = self.dirtyRegionTracker
+    region = None
+    if frame is not None and frameResultKey is not None and dirtyRegionTracker is not None:
+      region = self._getPipelineRegion(actionIdOrTypes, frame, pipeInfo['borders'])
+      if region is not None:
+        isHit, result = dirtyRegionTracker.getResult(frame, frameResultKey, region)
+        if isHit:
+          frame.results[frameResultKey] = copyResult(result)
+          return result
+
+    instrumentation = self.instrumentation
+    result = None
+    if instrumentation is None:
+      for handler, action, isLast in steps:
+        result = handler(action, isLast, pipeInfo)
+    else:
+      for (handler, action, isLast), actionIdOrType in zip(steps, actionIdOrTypes):
+        actionId = actionIdOrType if isinstance(actionIdOrType, str) else actionIdOrType.value
+        start = time.perf_counter()
+        with instrumentation.actionScope(actionId):
+          result = handler(action, isLast, pipeInfo)
+        instrumentation.record(Stage.ACTION, start, actionId)
+    if frame is not None and frameResultKey is not None:
+      frame.results[frameResultKey] = copyResult(result)
+      if region is not None and dirtyRegionTracker is not None:
+        dirtyRegionTracker.setResult(frame, frameResultKey, result)
+    return result
+
+  def _getPipeSteps(self, actionIdOrTypes: list[str | ActionType], reinterpret: ActionType | None) -> list[PipeStep]:
+    """
+    Resolve the action and the handler of each step of a pipeline.
 
-    self.sizeRatio = (1, 1)
-    return self._pipeExecute(actionIdOrTypes, kwargs)
+    Each handler reuses what the previous steps stored in the pipe info and stores its own values.
+    Only the last one computes the result of the pipeline.
 
-  def _pipeExecute(self, actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+    :param actionIdOrTypes: assume len(actionIdOrTypes) > 0 and the action ids are known
+    :param reinterpret: type of the last action if it's given by an id
     """
-    :param actionIdOrTypes: assume len(actionIdOrTypes) > 0
-    :param pipeInfo:
+    steps = []
+    for index, actionIdOrType in enumerate(actionIdOrTypes):
+      isLast = index == len(actionIdOrTypes) - 1
+      if isinstance(actionIdOrType, str):
+        action = self.actionById[actionIdOrType]
+        actionType = action.type
+        if isLast and reinterpret is not None:
+          actionType = reinterpret
+      else:
+        action = None
+        actionType = actionIdOrType
+      steps.append((self._getPipeStepHandler(actionType), action, isLast))
+    return steps
+
+  def _getPipeStepHandler(self, actionType: ActionType) -> PipeStepHandler:
+    """
+    :param actionType:
     """
-    actionIdOrType = actionIdOrTypes.pop(0)
-    if isinstance(actionIdOrType, str):
-      action = self.actionById[actionIdOrType]
-      actionType = action['type']
-      if len(actionIdOrTypes) == 0 and 'reinterpret' in pipeInfo:
-        actionType = pipeInfo['reinterpret']
-    else:
-      action = None
-      actionType = actionIdOrType
     match actionType:
       case ActionType.COORDINATES:
-        return self._pipeExecuteActionCoordinates(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionCoordinates
       case ActionType.SELECTION:
-        return self._pipeExecuteActionSelection(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionSelection
       case ActionType.FIND_IMAGE:
-        return self._pipeExecuteActionFindImage(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionFindImage
       case ActionType.CLICK:
-        return self._pipeExecuteActionClick(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionClick
       case ActionType.PIXEL_COLOR:
-        return self._pipeExecuteActionPixelColor(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionPixelColor
       case ActionType.COMPARE_PIXEL_COLOR:
-        return self._pipeExecuteActionComparePixelColor(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionComparePixelColor
       case ActionType.IS_SAME_PIXEL_COLOR:
-        return self._pipeExecuteActionIsSamePixelColor(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionIsSamePixelColor
       case ActionType.IMAGE_HASH:
-        return self._pipeExecuteActionImageHash(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionImageHash
       case ActionType.COMPARE_IMAGE_HASH:
-        return self._pipeExecuteActionCompareImageHash(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionCompareImageHash
       case ActionType.IS_SAME_IMAGE_HASH:
-        return self._pipeExecuteActionIsSameImageHash(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionIsSameImageHash
       case ActionType.TEXT:
-        return self._pipeExecuteActionText(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionText
       case ActionType.NUMBER:
-        return self._pipeExecuteActionNumber(action, actionIdOrTypes, pipeInfo)
+        return self._pipeExecuteActionNumber
       case _ as unreachable:
         assert_never(actionType)
 
-  def _pipeExecuteActionCoordinates(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionCoordinates(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
     if 'coord' in pipeInfo:
       if not self.isCoordDataValid(pipeInfo['coord']):
         raise RecognizerValueError('Invalid coord value: \'{coord}\'.'.format(coord=pipeInfo['coord']))
-      else:
-        if len(actionIdOrTypes) == 0:
-          return pipeInfo['coord']
-        else:
-          return self._pipeExecute(actionIdOrTypes, pipeInfo)
+      return pipeInfo['coord']
     if action is None:
       raise RecognizerValueError('With given action types, option coord is required.')
-    assert self.borders is not None
-    pipeInfo['coord'] = self.getCoord(self.borders, action['ratios'])
-    return self._pipeExecuteActionCoordinates(action, actionIdOrTypes, pipeInfo)
+    assert 'borders' in pipeInfo
+    pipeInfo['coord'] = self._getActionCoord(action, pipeInfo['borders'])
+    return self._pipeExecuteActionCoordinates(action, isLast, pipeInfo)
 
-  def _pipeExecuteActionSelection(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionSelection(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
     if action is None and ('selectedPoint' in pipeInfo or 'selectedArea' in pipeInfo):
@@ -1142,36 +2431,32 @@ class Recognizer():
       else:
         selectionType = SelectionType.AREA
     else:
-      self._pipeExecuteActionCoordinates(action, [], pipeInfo)
+      self._pipeExecuteActionCoordinates(action, False, pipeInfo)
       assert 'coord' in pipeInfo
       selectionType = SelectionType.fromSelection(pipeInfo['coord'])
     if selectionType == SelectionType.POINT:
       if 'selectedPoint' in pipeInfo:
         if not self.isPointDataValid(pipeInfo['selectedPoint']):
           raise RecognizerValueError('Invalid point value: \'{point}\'.'.format(point=pipeInfo['selectedPoint']))
-        else:
-          if len(actionIdOrTypes) == 0:
-            return pipeInfo['selectedPoint']
-          else:
-            return self._pipeExecute(actionIdOrTypes, pipeInfo)
+        return pipeInfo['selectedPoint']
       if 'screenshot' in pipeInfo:
         if not self.isImageDataValid(pipeInfo['screenshot']):
           raise RecognizerValueError('Invalid screenshot value.')
         else:
           assert 'coord' in pipeInfo
           pipeInfo['selectedPoint'] = self.getPointFromScreenshot(pipeInfo['screenshot'], pipeInfo['coord'])
-          return self._pipeExecuteActionSelection(action, actionIdOrTypes, pipeInfo)
+          return self._pipeExecuteActionSelection(action, isLast, pipeInfo)
       if 'bordersImage' in pipeInfo:
         if not self.isImageDataValid(pipeInfo['bordersImage']):
           raise RecognizerValueError('Invalid bordersImage value.')
         else:
-          assert self.borders is not None
+          assert 'borders' in pipeInfo
           assert 'coord' in pipeInfo
-          pipeInfo['selectedPoint'] = self.getPointFromBordersImage(pipeInfo['bordersImage'], pipeInfo['coord'], self.borders)
-          return self._pipeExecuteActionSelection(action, actionIdOrTypes, pipeInfo)
+          pipeInfo['selectedPoint'] = self.getPointFromBordersImage(pipeInfo['bordersImage'], pipeInfo['coord'], pipeInfo['borders'])
+          return self._pipeExecuteActionSelection(action, isLast, pipeInfo)
       assert 'coord' in pipeInfo
-      pipeInfo['selectedPoint'] = self.getPoint(pipeInfo['coord'], self.allScreens)
-      return self._pipeExecuteActionSelection(action, actionIdOrTypes, pipeInfo)
+      pipeInfo['selectedPoint'] = self._getLivePoint(pipeInfo['coord'], pipeInfo.get('frame'))
+      return self._pipeExecuteActionSelection(action, isLast, pipeInfo)
     else:
       if 'selectedArea' in pipeInfo:
         if not self.isAreaDataValid(pipeInfo['selectedArea']):
@@ -1179,63 +2464,180 @@ class Recognizer():
         else:
           if 'preprocessing' in pipeInfo:
             originalSize = pipeInfo['selectedArea'].size
-            pipeInfo['selectedArea'] = self.preprocessing.process(pipeInfo['selectedArea'], pipeInfo['preprocessing'])
-            self.sizeRatio = (originalSize[0] / pipeInfo['selectedArea'].width, originalSize[1] / pipeInfo['selectedArea'].height)
-          if len(actionIdOrTypes) == 0:
-            return pipeInfo['selectedArea']
-          else:
-            return self._pipeExecute(actionIdOrTypes, pipeInfo)
+            start = time.perf_counter()
+            pipeInfo['selectedArea'] = self.preprocessing.processArray(self._toArrayImage(pipeInfo['selectedArea']), # type: ignore
+                pipeInfo['preprocessing'])
+            if self.instrumentation is not None:
+              self.instrumentation.record(Stage.PREPROCESSING, start)
+            sizeRatio = pipeInfo.get('sizeRatio', (1, 1))
+            pipeInfo['sizeRatio'] = (sizeRatio[0] * originalSize[0] / pipeInfo['selectedArea'].width,
+                sizeRatio[1] * originalSize[1] / pipeInfo['selectedArea'].height)
+          if not isLast:
+            return None
+          return self._toImage(pipeInfo['selectedArea'])
       if 'screenshot' in pipeInfo:
         if not self.isImageDataValid(pipeInfo['screenshot']):
           raise RecognizerValueError('Invalid screenshot value.')
         else:
           assert 'coord' in pipeInfo
-          pipeInfo['selectedArea'] = self.getAreaFromScreenshot(pipeInfo['screenshot'], cast(AreaCoord, pipeInfo['coord']))
-          return self._pipeExecuteActionSelection(action, actionIdOrTypes, pipeInfo)
+          coord = cast(AreaCoord, pipeInfo['coord'])
+          captureScale = self._getCaptureScale(action, pipeInfo)
+          area = self._scaleArea(self.getAreaFromScreenshot(pipeInfo['screenshot'], coord), captureScale)
+          self._setScaledSelectedArea(area, coord, captureScale, pipeInfo)
+          return self._pipeExecuteActionSelection(action, isLast, pipeInfo)
       if 'bordersImage' in pipeInfo:
         if not self.isImageDataValid(pipeInfo['bordersImage']):
           raise RecognizerValueError('Invalid bordersImage value.')
         else:
-          assert self.borders is not None
+          assert 'borders' in pipeInfo
           assert 'coord' in pipeInfo
-          pipeInfo['selectedArea'] = self.getAreaFromBordersImage(pipeInfo['bordersImage'], cast(AreaCoord, pipeInfo['coord']), self.borders)
-          return self._pipeExecuteActionSelection(action, actionIdOrTypes, pipeInfo)
+          coord = cast(AreaCoord, pipeInfo['coord'])
+          captureScale = self._getCaptureScale(action, pipeInfo)
+          area = self._scaleArea(self.getAreaFromBordersImage(pipeInfo['bordersImage'], coord, pipeInfo['borders']), captureScale)
+          self._setScaledSelectedArea(area, coord, captureScale, pipeInfo)
+          return self._pipeExecuteActionSelection(action, isLast, pipeInfo)
       assert 'coord' in pipeInfo
-      pipeInfo['selectedArea'] = self.getArea(cast(AreaCoord, pipeInfo['coord']), self.allScreens)
-      return self._pipeExecuteActionSelection(action, actionIdOrTypes, pipeInfo)
+      coord = cast(AreaCoord, pipeInfo['coord'])
+      captureScale = self._getCaptureScale(action, pipeInfo)
+      self._setScaledSelectedArea(self._getLiveArea(coord, pipeInfo.get('frame'), captureScale), coord, captureScale, pipeInfo)
+      return self._pipeExecuteActionSelection(action, isLast, pipeInfo)
 
-  def _pipeExecuteActionFindImage(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionFindImage(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
-    self._pipeExecuteActionSelection(action, [], pipeInfo)
-    if len(actionIdOrTypes) == 0:
-      if action is None:
-        raise RecognizerValueError('ActionType.FIND_IMAGE cannot be used by itself even with some options.'
-            ' To load an action of this type, add it with its parameters in a config file or load it directly with loadData.')
-      if any([paramName not in action for paramName in ['imageToFind', 'threshold', 'maxResults', 'resizeInterval']]):
-        raise RecognizerValueError('Cannot reinterpret as ActionType.FIND_IMAGE.'
-            ' To load an action of this type, add it with its parameters in a config file or load it directly with loadData.')
-      self._checkSelectedAreaAndNotJustSelectedPoint(pipeInfo)
-      assert 'imageToFind' in action
-      assert 'resizeInterval' in action
-      assert 'selectedArea' in pipeInfo
-      if not self.isImageToFindCompatibleWithAreaSize(action['imageToFind'], pipeInfo['selectedArea'].size, action['resizeInterval']):
-        if self.isImageToFindCompatibleWithAreaSize(action['imageToFind'], pipeInfo['selectedArea'].size):
-          raise RecognizerValueError('Incompatible area value with image to find.'
-              ' The image to find must be smaller than the area also considering the max size ratio.')
-        else:
-          raise RecognizerValueError('Incompatible area value with image to find. The image to find must be smaller than the area.')
-      assert 'threshold' in action
-      assert 'maxResults' in action
-      assert 'coord' in pipeInfo
-      return self.findImageCoordinates(cast(AreaCoord, pipeInfo['coord']), pipeInfo['selectedArea'], action['imageToFind'],
-          action['threshold'], action['maxResults'], action['resizeInterval'], self.sizeRatio)
-    else:
-      return self._pipeExecute(actionIdOrTypes, pipeInfo)
+    self._pipeExecuteActionSelection(action, False, pipeInfo)
+    if not isLast:
+      return None
+    if action is None:
+      raise RecognizerValueError('ActionType.FIND_IMAGE cannot be used by itself even with some options.'
+          ' To load an action of this type, add it with its parameters in a config file or load it directly with loadData.')
+    if action.imageToFindImage is None:
+      raise RecognizerValueError('Cannot reinterpret as ActionType.FIND_IMAGE.'
+          ' To load an action of this type, add it with its parameters in a config file or load it directly with loadData.')
+    self._checkSelectedAreaAndNotJustSelectedPoint(pipeInfo)
+    assert action.threshold is not None and action.maxResults is not None
+    assert 'selectedArea' in pipeInfo
+    captureScale = pipeInfo.get('captureScale', 1)
+    # The image to find is downsampled like the area, its size is compared at full resolution.
+    areaSize = (math.floor(pipeInfo['selectedArea'].width / captureScale), math.floor(pipeInfo['selectedArea'].height / captureScale))
+    if not self._isImageSizeCompatibleWithAreaSize(action.imageToFindImage.size, areaSize, action.resizeInterval):
+      if self._isImageSizeCompatibleWithAreaSize(action.imageToFindImage.size, areaSize):
+        raise RecognizerValueError('Incompatible area value with image to find.'
+            ' The image to find must be smaller than the area also considering the max size ratio.')
+      else:
+        raise RecognizerValueError('Incompatible area value with image to find. The image to find must be smaller than the area.')
+    assert 'coord' in pipeInfo
+    areaCoord = cast(AreaCoord, pipeInfo['coord'])
+    pyramid = self._getTemplatePyramid(action, captureScale)
+    sizeRatio = pipeInfo.get('sizeRatio', (1, 1))
+    refineMargin = DEFAULT_REFINE_MARGIN if action.refineMargin is None else action.refineMargin
+    if action.recentLocations is not None:
+      return self._findImageCoordinatesNearRecentLocations(action, areaCoord, pipeInfo['selectedArea'], pyramid, sizeRatio, refineMargin)
+    return self._findImageCoordinates(areaCoord, pipeInfo['selectedArea'], pyramid, action.threshold, action.maxResults, sizeRatio,
+        action.searchLevels, refineMargin, self.scaleExecutor)
+
+  def _findImageCoordinatesNearRecentLocations(self, action: Action, areaCoord: AreaCoord, area: Image.Image | ArrayImage,
+      pyramid: TemplatePyramid, sizeRatio: tuple[float, float], refineMargin: int) -> list[AreaCoord]:
+    """
+    Search the image in a window around each recent location of the action, the most recent first, and search the whole
+    area only if none of the windows has a match passing the threshold. The found coords become the most recent locations.
+
+    :param action: findImage action with recent locations
+    :param areaCoord:
+    :param area:
+    :param pyramid:
+    :param sizeRatio:
+    :param refineMargin:
+    """
+    recentLocations = action.recentLocations
+    assert recentLocations is not None and action.recentMargin is not None
+    assert action.threshold is not None and action.maxResults is not None
+    templateSize = (max(grayscale.shape[1] for grayscale in pyramid.grayscales), max(grayscale.shape[0] for grayscale in pyramid.grayscales))
+    start = time.perf_counter()
+    locations = recentLocations.getLocations()
+    coords = []
+    for location in locations:
+      window = self._getRecentLocationWindow(location, (area.width, area.height), action.recentMargin, templateSize)
+      windowSize = (window[2] - window[0], window[3] - window[1])
+      # The window coords are relative to the area without size ratio and converted like the coords of the whole area.
+      for relativeCoord in self._findImageCoordinates((0, 0, *windowSize), area.crop(window), pyramid, action.threshold,
+          action.maxResults, (1, 1), action.searchLevels, refineMargin, self.scaleExecutor):
+        coord = (areaCoord[0] + math.floor((window[0] + relativeCoord[0]) * sizeRatio[0]),
+            math.ceil(areaCoord[1] + (window[1] + relativeCoord[1]) * sizeRatio[1]),
+            math.floor(areaCoord[0] + (window[0] + relativeCoord[2]) * sizeRatio[0]),
+            math.ceil(areaCoord[1] + (window[1] + relativeCoord[3]) * sizeRatio[1]))
+        if not self._doesOverlay(coord, coords):
+          coords.append(coord)
+      if len(coords) >= action.maxResults:
+        break
+    coords = coords[:action.maxResults]
+    if len(locations) > 0:
+      if len(coords) > 0:
+        recentLocations.recordHit(time.perf_counter() - start)
+      else:
+        recentLocations.recordMiss(time.perf_counter() - start)
+    if len(coords) == 0:
+      start = time.perf_counter()
+      coords = self._findImageCoordinates(areaCoord, area, pyramid, action.threshold, action.maxResults, sizeRatio,
+          action.searchLevels, refineMargin, self.scaleExecutor)
+      recentLocations.recordFullSearch(time.perf_counter() - start)
+    areaWidth = areaCoord[2] - areaCoord[0]
+    areaHeight = areaCoord[3] - areaCoord[1]
+    recentLocations.add([((coord[0] - areaCoord[0]) / areaWidth, (coord[1] - areaCoord[1]) / areaHeight,
+        (coord[2] - areaCoord[0]) / areaWidth, (coord[3] - areaCoord[1]) / areaHeight) for coord in coords])
+    return coords
+
+  @classmethod
+  def _getRecentLocationWindow(cls, location: LocationRatios, areaSize: tuple[int, int], margin: int,
+      templateSize: tuple[int, int]) -> AreaCoord:
+    """
+    Return the window of the area searched around a recent location, in pixels of the area.
+
+    The window is enlarged to fit the largest image to find and moved inside the area.
+
+    :param location: ratios of the area
+    :param areaSize: width and height of the area
+    :param margin: distance in pixels of the area around the location
+    :param templateSize: width and height of the largest image to find
+    """
+    window = [math.floor(location[0] * areaSize[0]) - margin, math.floor(location[1] * areaSize[1]) - margin,
+        math.ceil(location[2] * areaSize[0]) + margin, math.ceil(location[3] * areaSize[1]) + margin]
+    for axis in range(2):
+      size = max(window[axis + 2] - window[axis], templateSize[axis])
+      start = window[axis] - (size - (window[axis + 2] - window[axis])) // 2
+      start = max(min(start, areaSize[axis] - size), 0)
+      window[axis] = start
+      window[axis + 2] = min(start + size, areaSize[axis])
+    return (window[0], window[1], window[2], window[3])
+
+  def getRecentLocationsStats(self) -> dict[str, RecentLocationsStatsDict]:
+    """
+    Return the hit rate and the estimated time saved of each image search with a recent margin by action id.
+
+    See :ref:`performance-recent-locations`.
+    """
+    return {actionId: action.recentLocations.getStats() for actionId, action in self.actionById.items()
+        if action.recentLocations is not None}
+
+  def _getTemplatePyramid(self, action: Action, captureScale: float) -> TemplatePyramid:
+    """
+    Return the template pyramid of a findImage action, downsampled like the area for a capture scale other than 1.
+
+    :param action:
+    :param captureScale:
+    """
+    assert action.templatePyramid is not None and action.imageToFindImage is not None
+    if captureScale == 1:
+      return action.templatePyramid
+    imageToFind = action.imageToFindImage
+    resizeStep = DEFAULT_RESIZE_STEP if action.resizeStep is None else action.resizeStep
+    # The action is the key so that pyramids of replaced actions are never returned.
+    return self.templatePyramidCache.get((action, captureScale),
+        lambda: TemplatePyramid(scaleImage(imageToFind, captureScale), action.resizeInterval, resizeStep))
 
   def _checkSelectedAreaAndNotJustSelectedPoint(self, pipeInfo: PipeInfoDict) -> None:
     """
@@ -1244,14 +2646,14 @@ class Recognizer():
     if 'selectedArea' not in pipeInfo:
       raise RecognizerValueError('Expected an area selection instead of a point.')
 
-  def _pipeExecuteActionClick(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionClick(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
-    self._pipeExecuteActionCoordinates(action, [], pipeInfo)
+    self._pipeExecuteActionCoordinates(action, False, pipeInfo)
     options = {}
     if 'clickPauseDuration' in pipeInfo:
       if not isinstance(pipeInfo['clickPauseDuration'], float | int) or pipeInfo['clickPauseDuration'] < 0:
@@ -1263,34 +2665,29 @@ class Recognizer():
         raise RecognizerValueError('Invalid nbClicks value: \'{nbClicks}\'.'
             .format(nbClicks=pipeInfo['nbClicks']))
       options['nbClicks'] = pipeInfo['nbClicks']
-    if len(actionIdOrTypes) == 0:
-      assert 'coord' in pipeInfo
-      coord = pipeInfo['coord']
-      if isArea(coord):
-        coord = (round((coord[0] + coord[2]) / 2), round((coord[1] + coord[3]) / 2))
-      MouseHelper.clickOnPosition((coord[0], coord[1]), **options)
+    if not isLast:
       return None
-    else:
-      return self._pipeExecute(actionIdOrTypes, pipeInfo)
+    assert 'coord' in pipeInfo
+    coord = pipeInfo['coord']
+    if isArea(coord):
+      coord = (round((coord[0] + coord[2]) / 2), round((coord[1] + coord[3]) / 2))
+    MouseHelper.clickOnPosition((coord[0], coord[1]), **options)
+    return None
 
-  def _pipeExecuteActionPixelColor(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionPixelColor(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
     if 'pixelColor' in pipeInfo:
       if not self.isPixelColorDataValid(pipeInfo['pixelColor']):
         raise RecognizerValueError('Invalid pixel color value: \'{pixelColor}\'.'.format(pixelColor=pipeInfo['pixelColor']))
-      else:
-        if len(actionIdOrTypes) == 0:
-          return pipeInfo['pixelColor']
-        else:
-          return self._pipeExecute(actionIdOrTypes, pipeInfo)
-    self._pipeExecuteActionSelection(action, [], pipeInfo)
+      return pipeInfo['pixelColor']
+    self._pipeExecuteActionSelection(action, False, pipeInfo)
     if 'selectedPoint' in pipeInfo and 'selectedArea' in pipeInfo and action is not None:
-      selectionType = SelectionType.fromSelection(action['ratios'])
+      selectionType = SelectionType.fromSelection(action.ratios)
     elif 'selectedPoint' in pipeInfo:
       selectionType = SelectionType.POINT
     else:
@@ -1301,139 +2698,138 @@ class Recognizer():
     else:
       assert 'selectedArea' in pipeInfo
       pipeInfo['pixelColor'] = self.getAveragePixelColor(pipeInfo['selectedArea'])
-    return self._pipeExecuteActionPixelColor(action, actionIdOrTypes, pipeInfo)
+    return self._pipeExecuteActionPixelColor(action, isLast, pipeInfo)
 
-  def _pipeExecuteActionComparePixelColor(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionComparePixelColor(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
     if 'pixelColorDifference' in pipeInfo:
       if not self.isPixelColorDifferenceDataValid(pipeInfo['pixelColorDifference']):
         raise RecognizerValueError('Invalid pixel color difference value: \'{difference}\'.'
             .format(difference=pipeInfo['pixelColorDifference']))
-      else:
-        if len(actionIdOrTypes) == 0:
-          return pipeInfo['pixelColorDifference']
-        else:
-          return self._pipeExecute(actionIdOrTypes, pipeInfo)
-    self._pipeExecuteActionPixelColor(action, [], pipeInfo)
+      return pipeInfo['pixelColorDifference']
+    self._pipeExecuteActionPixelColor(action, False, pipeInfo)
 
-    if 'pixelColorReference' not in pipeInfo and action is not None and 'pixelColor' in action:
-      pipeInfo['pixelColorReference'] = action['pixelColor']
+    if 'pixelColorReference' not in pipeInfo and action is not None and action.pixelColor is not None:
+      pipeInfo['pixelColorReference'] = action.pixelColor
     if 'pixelColorReference' not in pipeInfo:
       raise RecognizerValueError('With given action types, option pixelColorReference is required.')
     if not self.isPixelColorDataValid(pipeInfo['pixelColorReference']):
       raise RecognizerValueError('Invalid pixel color reference value: \'{pixelColor}\'.'.format(pixelColor=pipeInfo['pixelColorReference']))
     assert 'pixelColor' in pipeInfo
     pipeInfo['pixelColorDifference'] = self.getPixelColorDifference(pipeInfo['pixelColor'], pipeInfo['pixelColorReference'])
-    return self._pipeExecuteActionComparePixelColor(action, actionIdOrTypes, pipeInfo)
+    return self._pipeExecuteActionComparePixelColor(action, isLast, pipeInfo)
 
-  def _pipeExecuteActionIsSamePixelColor(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionIsSamePixelColor(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
-    self._pipeExecuteActionComparePixelColor(action, [], pipeInfo)
-    if len(actionIdOrTypes) == 0:
-      assert 'pixelColorDifference' in pipeInfo
-      return pipeInfo['pixelColorDifference'] == 0
-    else:
-      return self._pipeExecute(actionIdOrTypes, pipeInfo)
+    self._pipeExecuteActionComparePixelColor(action, False, pipeInfo)
+    if not isLast:
+      return None
+    assert 'pixelColorDifference' in pipeInfo
+    return pipeInfo['pixelColorDifference'] == 0
 
-  def _pipeExecuteActionImageHash(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionImageHash(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
     if 'imageHash' in pipeInfo:
       if not self.isImageHashDataValid(pipeInfo['imageHash']):
         raise RecognizerValueError('Invalid image hash value: \'{imageHash}\'.'.format(imageHash=pipeInfo['imageHash']))
-      else:
-        if len(actionIdOrTypes) == 0:
-          return pipeInfo['imageHash']
-        else:
-          return self._pipeExecute(actionIdOrTypes, pipeInfo)
-    self._pipeExecuteActionSelection(action, [], pipeInfo)
+      return pipeInfo['imageHash']
+    self._pipeExecuteActionSelection(action, False, pipeInfo)
     self._checkSelectedAreaAndNotJustSelectedPoint(pipeInfo)
     assert 'selectedArea' in pipeInfo
-    pipeInfo['imageHash'] = self.getImageHash(pipeInfo['selectedArea'])
-    return self._pipeExecuteActionImageHash(action, actionIdOrTypes, pipeInfo)
+    start = time.perf_counter()
+    pipeInfo['imageHash'] = self.getImageHash(self._toImage(pipeInfo['selectedArea']))
+    if self.instrumentation is not None:
+      self.instrumentation.record(Stage.IMAGE_HASH, start)
+    return self._pipeExecuteActionImageHash(action, isLast, pipeInfo)
 
-  def _pipeExecuteActionCompareImageHash(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionCompareImageHash(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
     if 'imageHashDifference' in pipeInfo:
       if not self.isImageHashDifferenceDataValid(pipeInfo['imageHashDifference']):
         raise RecognizerValueError('Invalid image hash difference value: \'{difference}\'.'
             .format(difference=pipeInfo['imageHashDifference']))
-      else:
-        if len(actionIdOrTypes) == 0:
-          return pipeInfo['imageHashDifference']
-        else:
-          return self._pipeExecute(actionIdOrTypes, pipeInfo)
-    self._pipeExecuteActionImageHash(action, [], pipeInfo)
+      return pipeInfo['imageHashDifference']
+    self._pipeExecuteActionImageHash(action, False, pipeInfo)
 
-    if 'imageHashReference' not in pipeInfo and action is not None and 'imageHash' in action:
-      pipeInfo['imageHashReference'] = action['imageHash']
+    referenceHash = None
+    if 'imageHashReference' not in pipeInfo and action is not None and action.imageHash is not None:
+      pipeInfo['imageHashReference'] = action.imageHash
+      referenceHash = action.rawImageHash
     if 'imageHashReference' not in pipeInfo:
       raise RecognizerValueError('With given action types, option imageHashReference is required.')
-    if not self.isImageHashDataValid(pipeInfo['imageHashReference']):
-      raise RecognizerValueError('Invalid image hash reference value: \'{imageHash}\'.'.format(imageHash=pipeInfo['imageHashReference']))
+    if referenceHash is None:
+      if not self.isImageHashDataValid(pipeInfo['imageHashReference']):
+        raise RecognizerValueError('Invalid image hash reference value: \'{imageHash}\'.'.format(imageHash=pipeInfo['imageHashReference']))
+      referenceHash = self._getRawImageHashFromStr(pipeInfo['imageHashReference'])
     assert 'imageHash' in pipeInfo
-    pipeInfo['imageHashDifference'] = self.getImageHashDifference(pipeInfo['imageHash'], pipeInfo['imageHashReference'])
-    return self._pipeExecuteActionCompareImageHash(action, actionIdOrTypes, pipeInfo)
+    pipeInfo['imageHashDifference'] = self._getRawImageHashDifference(self._getRawImageHashFromStr(pipeInfo['imageHash']), referenceHash)
+    return self._pipeExecuteActionCompareImageHash(action, isLast, pipeInfo)
 
-  def _pipeExecuteActionIsSameImageHash(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionIsSameImageHash(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
-    self._pipeExecuteActionCompareImageHash(action, [], pipeInfo)
-    if len(actionIdOrTypes) == 0:
-      assert 'imageHashDifference' in pipeInfo
-      return pipeInfo['imageHashDifference'] == 0
-    else:
-      return self._pipeExecute(actionIdOrTypes, pipeInfo)
+    self._pipeExecuteActionCompareImageHash(action, False, pipeInfo)
+    if not isLast:
+      return None
+    assert 'imageHashDifference' in pipeInfo
+    return pipeInfo['imageHashDifference'] == 0
 
-  def _pipeExecuteActionText(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionText(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
-    self._pipeExecuteActionSelection(action, [], pipeInfo)
-    if len(actionIdOrTypes) == 0:
-      self._checkSelectedAreaAndNotJustSelectedPoint(pipeInfo)
-      assert 'selectedArea' in pipeInfo
-      return self.getText(pipeInfo['selectedArea'])
-    else:
-      return self._pipeExecute(actionIdOrTypes, pipeInfo)
+    self._pipeExecuteActionSelection(action, False, pipeInfo)
+    if not isLast:
+      return None
+    self._checkSelectedAreaAndNotJustSelectedPoint(pipeInfo)
+    assert 'selectedArea' in pipeInfo
+    start = time.perf_counter()
+    text = self.getText(self._toImage(pipeInfo['selectedArea']))
+    if self.instrumentation is not None:
+      self.instrumentation.record(Stage.OCR, start)
+    return text
 
-  def _pipeExecuteActionNumber(self, action: ActionDict | None,
-      actionIdOrTypes: list[str | ActionType], pipeInfo: PipeInfoDict) -> AnyActionReturnType:
+  def _pipeExecuteActionNumber(self, action: Action | None, isLast: bool,
+      pipeInfo: PipeInfoDict) -> AnyActionReturnType:
     """
     :param action:
-    :param actionIdOrTypes:
+    :param isLast: whether the result of the action is the result of the pipeline
     :param pipeInfo:
     """
-    self._pipeExecuteActionSelection(action, [], pipeInfo)
-    if len(actionIdOrTypes) == 0:
-      self._checkSelectedAreaAndNotJustSelectedPoint(pipeInfo)
-      assert 'selectedArea' in pipeInfo
-      return self.getNumber(pipeInfo['selectedArea'])
-    else:
-      return self._pipeExecute(actionIdOrTypes, pipeInfo)
+    self._pipeExecuteActionSelection(action, False, pipeInfo)
+    if not isLast:
+      return None
+    self._checkSelectedAreaAndNotJustSelectedPoint(pipeInfo)
+    assert 'selectedArea' in pipeInfo
+    start = time.perf_counter()
+    number = self.getNumber(self._toImage(pipeInfo['selectedArea']))
+    if self.instrumentation is not None:
+      self.instrumentation.record(Stage.OCR, start)
+    return number
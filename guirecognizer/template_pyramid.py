@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from math import ceil
+from typing import TYPE_CHECKING
+
+import numpy as np
+from imagehash import ImageHash, colorhash, phash
+from PIL import Image, ImageOps
+
+from guirecognizer.common import RecognizerValueError
+
+if TYPE_CHECKING:
+  from guirecognizer.recognizer import ResizeInterval
+
+#: Difference between two consecutive ratios of the resize interval of an image search.
+DEFAULT_RESIZE_STEP = 0.05
+
+
+class TemplatePyramid:
+  """
+  Grayscale pixels of an image to find at every ratio of a resize interval and its image hash, computed once.
+
+  Without resize interval, the pyramid has the image to find at its size only.
+  """
+  __slots__ = ('grayscales', 'hash')
+  #: Grayscale pixels matched against the area by increasing ratio, sizes are unique.
+  grayscales: list[np.ndarray]
+  #: Image hash of the image to find, compared to the hash of the matches of every size. The hash of a resized image
+  #: is not used since the hash of a tiny resized image matches too many areas.
+  hash: tuple[ImageHash, ImageHash]
+
+  def __init__(self, imageToFind: Image.Image, resizeInterval: 'ResizeInterval | None'=None,
+      resizeStep: float=DEFAULT_RESIZE_STEP) -> None:
+    """
+    :param imageToFind:
+    :param resizeInterval: (optional) min and max ratios of the size of the image to find - default: no resize
+    :param resizeStep: (optional) difference between two consecutive ratios - default: 0.05
+    """
+    self.hash = (phash(imageToFind), colorhash(imageToFind))
+    if resizeInterval is None:
+      self.grayscales = [np.array(ImageOps.grayscale(imageToFind))]
+    else:
+      self.grayscales = []
+      nbScales = 1 + ceil((resizeInterval[1] - resizeInterval[0]) / resizeStep)
+      precedentSize = None
+      for ratio in np.linspace(resizeInterval[0], resizeInterval[1], num=nbScales):
+        size = (max(int(imageToFind.size[0] * ratio), 1), max(int(imageToFind.size[1] * ratio), 1))
+        if size == precedentSize:
+          continue
+        precedentSize = size
+        self.grayscales.append(np.array(ImageOps.grayscale(imageToFind.resize(size, Image.LANCZOS)))) # type: ignore
+
+
+class TemplatePyramidCache:
+  """
+  Bounded cache of template pyramids, the least recently used pyramids are dropped first.
+
+  See :meth:`guirecognizer.Recognizer.setTemplatePyramidCacheSize`.
+  """
+  maxSize: int
+  nbHits: int
+  nbMisses: int
+
+  def __init__(self, maxSize: int=128) -> None:
+    """
+    :param maxSize: (optional) number of kept pyramids - default: 128
+    :raise RecognizerValueError: invalid `maxSize`
+    """
+    if not isinstance(maxSize, int) or maxSize <= 0:
+      raise RecognizerValueError('Invalid maxSize value: expects a positive integer.')
+    self.maxSize = maxSize
+    self.nbHits = 0
+    self.nbMisses = 0
+    self._lock = threading.Lock()
+    self._pyramidByKey: OrderedDict[Hashable, TemplatePyramid] = OrderedDict()
+
+  def __len__(self) -> int:
+    return len(self._pyramidByKey)
+
+  def get(self, key: Hashable, createPyramid: Callable[[], TemplatePyramid]) -> TemplatePyramid:
+    """
+    Return the pyramid of the key, created and kept if it's not in the cache.
+
+    :param key:
+    :param createPyramid: called without lock, threads missing the same key may both create the pyramid
+    """
+    with self._lock:
+      pyramid = self._pyramidByKey.get(key)
+      if pyramid is not None:
+        self._pyramidByKey.move_to_end(key)
+        self.nbHits += 1
+        return pyramid
+      self.nbMisses += 1
+    pyramid = createPyramid()
+    with self._lock:
+      self._pyramidByKey[key] = pyramid
+      self._pyramidByKey.move_to_end(key)
+      while len(self._pyramidByKey) > self.maxSize:
+        self._pyramidByKey.popitem(last=False)
+    return pyramid
+
+  def setMaxSize(self, maxSize: int) -> None:
+    """
+    :param maxSize: number of kept pyramids, the least recently used ones are dropped
+    :raise RecognizerValueError: invalid `maxSize`
+    """
+    if not isinstance(maxSize, int) or maxSize <= 0:
+      raise RecognizerValueError('Invalid maxSize value: expects a positive integer.')
+    with self._lock:
+      self.maxSize = maxSize
+      while len(self._pyramidByKey) > self.maxSize:
+        self._pyramidByKey.popitem(last=False)
+
+  def clear(self) -> None:
+    """
+    Drop every pyramid. Counters are kept.
+    """
+    with self._lock:
+      self._pyramidByKey.clear()
@@ -7,3 +7,4 @@ PointRatios = tuple[float | int, float | int] | Annotated[list[float | int], 2]
 AreaRatios = tuple[float | int, float | int, float | int, float | int] | Annotated[list[float | int], 4]
 Ratios = PointRatios | AreaRatios
 PixelColor = tuple[int, int, int] | Annotated[list[int], 3]
+Point = PixelColor | int | tuple[int, int, int, int]
@@ -0,0 +1,207 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, cast
+
+from guirecognizer.action_type import ActionType
+from guirecognizer.common import RecognizerValueError
+from guirecognizer.dirty_regions import DirtyRegionTracker
+from guirecognizer.frame import Frame
+
+if TYPE_CHECKING:
+  from guirecognizer.recognizer import (AnyActionReturnType, ExecuteParams,
+                                        ExecuteRequest, PipeStep, Recognizer)
+
+_NO_RESULT = object()
+
+
+class WatchEvent:
+  """
+  Change of the result of a watched request, see :meth:`guirecognizer.Recognizer.watch`.
+  """
+  __slots__ = ('key', 'result', 'previousResult', 'timestamp', 'monotonicTimestamp')
+  #: Request in a list or its key in a dict.
+  key: Any
+  result: 'AnyActionReturnType'
+  #: None for the first result of the request.
+  previousResult: 'AnyActionReturnType'
+  #: Time of the capture of the frame as returned by time.time().
+  timestamp: float
+  #: Time of the capture of the frame as returned by time.monotonic().
+  monotonicTimestamp: float
+
+  def __init__(self, key: Any, result: 'AnyActionReturnType', previousResult: 'AnyActionReturnType', timestamp: float,
+      monotonicTimestamp: float) -> None:
+    self.key = key
+    self.result = result
+    self.previousResult = previousResult
+    self.timestamp = timestamp
+    self.monotonicTimestamp = monotonicTimestamp
+
+  def __repr__(self) -> str:
+    return f'WatchEvent({self.key!r}, {self.result!r}, previousResult={self.previousResult!r}, timestamp={self.timestamp})'
+
+
+class Watcher:
+  """
+  Iterator and async iterator over the changes of the results of requests, see :meth:`guirecognizer.Recognizer.watch`.
+
+  A watcher must not be iterated by several threads or tasks at the same time.
+  """
+  rate: float
+  #: Executor running the polls of the async iteration, None for the default executor of the event loop.
+  executor: Executor | None
+  #: Tracker of the tiles changed between the frames of the polls. Its hits are the skipped executions.
+  dirtyRegionTracker: DirtyRegionTracker
+
+  def __init__(self, recognizer: 'Recognizer', requests: 'Mapping[Any, ExecuteRequest] | Sequence[ExecuteRequest]',
+      rate: float, kwargs: 'ExecuteParams') -> None:
+    """
+    :param recognizer:
+    :param requests: requests in a list or by key in a dict, see :meth:`guirecognizer.Recognizer.executeMany`
+    :param rate: number of polls per second
+    :param kwargs: Extra parameters given to every request, see :class:`guirecognizer.recognizer.ExecuteParams`
+    :raise RecognizerValueError: invalid rate, parameter or request
+    """
+    if not isinstance(rate, (int, float)) or rate <= 0:
+      raise RecognizerValueError('Invalid rate. It must be a strictly positive number of polls per second.')
+    if any(name in kwargs for name in recognizer._SOURCE_NAMES):
+      raise RecognizerValueError('Watched requests cannot be given a screenshot, borders image or frame.')
+    if isinstance(requests, Mapping):
+      self._keys = list(requests.keys())
+      self._requests = list(requests.values())
+    else:
+      self._keys = list(requests)
+      self._requests = list(requests)
+    if len(self._requests) == 0:
+      raise RecognizerValueError('At least one request must be specified.')
+    recognizer._checkExecuteKwargs(kwargs)
+    self._pipelines: list[tuple[list[str | ActionType], list['PipeStep'], 'ExecuteParams', bool]] = []
+    for request in self._requests:
+      args, requestKwargs = recognizer._getRequestArgs(request)
+      if any(name in requestKwargs for name in recognizer._SOURCE_NAMES):
+        raise RecognizerValueError('Watched requests cannot be given a screenshot, borders image or frame.')
+      pipeInfo = cast('ExecuteParams', {**kwargs, **requestKwargs})
+      actionIdOrTypes = recognizer._checkExecuteParams(args, None, pipeInfo)
+      steps = recognizer._getPipeSteps(actionIdOrTypes, pipeInfo.get('reinterpret'))
+      if steps[-1][0] == recognizer._pipeExecuteActionClick:
+        raise RecognizerValueError(f'Request \'{request}\' clicks, it cannot be watched.')
+      # Only pipelines reading the pixels of their actions can be skipped when these pixels did not change.
+      isTracked = 'borders' not in pipeInfo and recognizer._getFrameResultKey(actionIdOrTypes, pipeInfo) is not None
+      self._pipelines.append((actionIdOrTypes, steps, pipeInfo, isTracked))
+    self.rate = rate
+    self.executor = None
+    self.dirtyRegionTracker = DirtyRegionTracker()
+    self._recognizer = recognizer
+    self._kwargs = kwargs
+    self._results: list[Any] = [_NO_RESULT] * len(self._requests)
+    self._events: deque[WatchEvent] = deque()
+    self._nextPollTime = None
+    self._lastFrame = None
+    self._isClosed = False
+
+  @property
+  def isClosed(self) -> bool:
+    """
+    Whether :meth:`close` was called.
+    """
+    return self._isClosed
+
+  def close(self) -> None:
+    """
+    Stop the iteration. Pending events are dropped.
+    """
+    self._isClosed = True
+    self._events.clear()
+
+  def poll(self) -> list[WatchEvent]:
+    """
+    Capture one frame, execute the requests whose pixels changed and return the events of the changed results.
+
+    The iteration calls it at the rate of the watcher. The first poll returns an event for every request.
+
+    :raise RecognizerValueError: no borders data or an execution failed
+    """
+    recognizer = self._recognizer
+    borders = recognizer.borders
+    frame = self._captureFrame(borders)
+    self._lastFrame = frame
+    indexes = []
+    for index, (actionIdOrTypes, _, _, isTracked) in enumerate(self._pipelines):
+      if isTracked and borders is not None:
+        region = recognizer._getPipelineRegion(actionIdOrTypes, frame, borders)
+        if region is not None and self.dirtyRegionTracker.getResult(frame, index, region)[0]:
+          continue
+      indexes.append(index)
+    if len(indexes) == 0:
+      return []
+    results = recognizer.executeMany([self._requests[index] for index in indexes], frame=frame, **self._kwargs)
+
+    events = []
+    for index, result in zip(indexes, results):
+      self.dirtyRegionTracker.setResult(frame, index, result)
+      previousResult = self._results[index]
+      if previousResult is not _NO_RESULT and previousResult == result:
+        continue
+      self._results[index] = result
+      events.append(WatchEvent(self._keys[index], result, None if previousResult is _NO_RESULT else previousResult,
+          frame.timestamp, frame.monotonicTimestamp))
+    return events
+
+  def _captureFrame(self, borders: Any) -> Frame:
+    """
+    Return the newest frame of the background capture if it's running, capture the areas of the requests otherwise.
+
+    :param borders: borders of the recognizer
+    :raise RecognizerValueError: no borders data
+    """
+    recognizer = self._recognizer
+    backgroundCapturer = recognizer.backgroundCapturer
+    if backgroundCapturer is not None and backgroundCapturer.isRunning:
+      return backgroundCapturer.waitForFrame(None if self._lastFrame is None else self._lastFrame.monotonicTimestamp)
+    if borders is None:
+      raise RecognizerValueError('No borders data.')
+    coords = []
+    for _, steps, pipeInfo, _ in self._pipelines:
+      prefixKey = recognizer._getPrefixKey(steps, pipeInfo, borders)
+      if prefixKey is not None:
+        coords.append(prefixKey[0])
+    regions = recognizer.getCaptureRegions(coords)
+    if len(regions) == 0:
+      return recognizer.captureFrame()
+    return recognizer._captureRegions(regions)
+
+  def _getDelay(self) -> float:
+    """
+    Return the duration until the next poll and schedule the following one. Missed polls are skipped.
+    """
+    now = time.monotonic()
+    if self._nextPollTime is None or self._nextPollTime < now:
+      self._nextPollTime = now
+    delay = self._nextPollTime - now
+    self._nextPollTime += 1 / self.rate
+    return delay
+
+  def __iter__(self) -> 'Watcher':
+    return self
+
+  def __next__(self) -> WatchEvent:
+    while len(self._events) == 0:
+      if self._isClosed:
+        raise StopIteration
+      time.sleep(self._getDelay())
+      self._events.extend(self.poll())
+    return self._events.popleft()
+
+  def __aiter__(self) -> 'Watcher':
+    return self
+
+  async def __anext__(self) -> WatchEvent:
+    while len(self._events) == 0:
+      if self._isClosed:
+        raise StopAsyncIteration
+      await asyncio.sleep(self._getDelay())
+      self._events.extend(await asyncio.get_running_loop().run_in_executor(self.executor, self.poll))
+    return self._events.popleft()
@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer import ActionType, Recognizer
+from guirecognizer.action import Action
+from tests.test_utility import LoggedTestCase
+
+
+class TestAction(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    with Image.open('tests/data/img/img1.png') as image:
+      self.screenshot = image.copy()
+
+  def test_slots(self):
+    action = self.recognizer.actionById['pixelColor1']
+    self.assertIsInstance(action, Action)
+    self.assertEqual(action.type, ActionType.PIXEL_COLOR)
+    with self.assertRaises(AttributeError):
+      action.unknownField = 0 # type: ignore
+
+  def test_derivedData(self):
+    action = self.recognizer.actionById['findImage1']
+    assert action.imageToFind is not None and action.imageToFindImage is not None and action.templatePyramid is not None
+    imageToFind = Recognizer.getImageToFindFromData(action.imageToFind)
+    self.assertEqual(action.imageToFindImage.size, imageToFind.size)
+    grayscale, = action.templatePyramid.grayscales
+    self.assertEqual(grayscale.shape, (imageToFind.height, imageToFind.width))
+    self.assertEqual(grayscale.dtype, np.uint8)
+    self.assertEqual(action.templatePyramid.hash, Recognizer._getRawImageHash(imageToFind))
+    self.assertIsNone(action.rawImageHash)
+
+    action = self.recognizer.actionById['compareImageHash1']
+    assert action.imageHash is not None
+    self.assertEqual(action.rawImageHash, Recognizer._getRawImageHashFromStr(action.imageHash))
+    self.assertIsNone(action.imageToFindImage)
+
+  def test_parsedImageHashNotShared(self):
+    hashValue = self.recognizer.actionById['compareImageHash1'].imageHash
+    assert hashValue is not None
+    imageHash, _ = Recognizer._getRawImageHashFromStr(hashValue)
+    self.assertIsNot(imageHash, Recognizer._getRawImageHashFromStr(hashValue)[0])
+    # The cached bits are read-only: an in-place change cannot reach the other callers.
+    with self.assertRaises(ValueError):
+      imageHash.hash[0, 0] = not imageHash.hash[0, 0]
+    imageHash.hash = np.zeros((8, 8), dtype=bool)
+    self.assertEqual(Recognizer._getRawImageHashFromStr(hashValue), self.recognizer.actionById['compareImageHash1'].rawImageHash)
+
+  def test_noDecodingAtExecution(self):
+    with patch.object(Recognizer, 'getImageToFindFromData') as getImageToFindFromData:
+      self.assertEqual(self.recognizer.executeFindImage('findImage2', screenshot=self.screenshot), [(7, 28, 13, 29), (6, 27, 15, 28)])
+      self.assertEqual(self.recognizer.executeFindImage('findImage1', screenshot=self.screenshot), [(12, 12, 19, 18)])
+    getImageToFindFromData.assert_not_called()
+
+  def test_coord(self):
+    action = self.recognizer.actionById['coordinates2']
+    with patch.object(Recognizer, 'getCoord', wraps=Recognizer.getCoord) as getCoord:
+      self.assertEqual(self.recognizer.executeCoordinates('coordinates2'), (21, 8, 34, 22))
+      self.assertEqual(self.recognizer.executeCoordinates('coordinates2'), (21, 8, 34, 22))
+      getCoord.assert_not_called()
+      self.recognizer.borders = (10, 10, 49, 49)
+      self.assertEqual(self.recognizer.executeCoordinates('coordinates2'), (31, 18, 44, 32))
+      self.assertEqual(self.recognizer.executeCoordinates('coordinates2'), (31, 18, 44, 32))
+      self.assertEqual(getCoord.call_count, 1)
+    self.assertEqual(action.resolvedCoord, ((10, 10, 49, 49), (31, 18, 44, 32)))
+
+  def test_reinterpret(self):
+    self.assertEqual(self.recognizer.execute('selection1', screenshot=self.screenshot, reinterpret=ActionType.COMPARE_IMAGE_HASH,
+        imageHashReference='8e1b79e1a1a5a783,07000000000', imageHash='8e1b79e1a1a5a783,07000000000'), 0)
+    self.assertEqual(self.recognizer.execute('compareImageHash1', screenshot=self.screenshot),
+        Recognizer.getImageHashDifference(self.recognizer.executeImageHash('compareImageHash1', screenshot=self.screenshot,
+            reinterpret=ActionType.IMAGE_HASH), '8e1b79e1a1a5a783,07000000000'))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+from PIL import Image, ImageOps, ImageStat
+
+from guirecognizer.array_image import ArrayImage
+from tests.test_utility import LoggedTestCase
+
+
+class TestArrayImage(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.image = Image.open('tests/data/img/img1.png')
+    self.arrayImage = ArrayImage.fromImage(self.image)
+
+  def test_error_invalidArray(self):
+    with self.assertRaises(ValueError):
+      ArrayImage(np.zeros((2, 2, 3), dtype=np.float32))
+    with self.assertRaises(ValueError):
+      ArrayImage(np.zeros((2, 2, 2), dtype=np.uint8))
+    self.assertFalse(ArrayImage.isArrayDataValid(np.zeros((0, 2, 3), dtype=np.uint8)))
+    self.assertFalse(ArrayImage.isArrayDataValid([[0]]))
+    self.assertTrue(ArrayImage.isArrayDataValid(np.zeros((2, 2), dtype=np.uint8)))
+
+  def test_fromImage(self):
+    self.assertEqual(self.arrayImage.mode, 'RGBA')
+    self.assertEqual(self.arrayImage.size, self.image.size)
+    self.assertIs(self.arrayImage.toImage(), self.image)
+    paletteImage = self.image.convert('RGB').convert('P')
+    self.assertEqual(ArrayImage.fromImage(paletteImage).mode, 'RGB')
+
+  def test_crop(self):
+    area = self.arrayImage.crop((5, 6, 15, 12))
+    self.assertEqual(area.size, (10, 6))
+    self.assertTrue(np.shares_memory(area.array, self.arrayImage.array))
+    self.assertEqual(area.toImage().tobytes(), self.image.crop((5, 6, 15, 12)).tobytes())
+    area = self.arrayImage.crop((-5, -6, 15, 12))
+    self.assertFalse(np.shares_memory(area.array, self.arrayImage.array))
+    self.assertEqual(area.toImage().tobytes(), self.image.crop((-5, -6, 15, 12)).tobytes())
+
+  def test_getpixel(self):
+    self.assertEqual(self.arrayImage.getpixel((9, 7)), self.image.getpixel((9, 7)))
+    grayscaleImage = ImageOps.grayscale(self.image)
+    self.assertEqual(ArrayImage.fromImage(grayscaleImage).getpixel((9, 7)), grayscaleImage.getpixel((9, 7)))
+
+  def test_conversions(self):
+    self.assertEqual(self.arrayImage.getGrayscaleArray().tolist(), np.asarray(ImageOps.grayscale(self.image)).tolist())
+    self.assertEqual(self.arrayImage.getRgbArray().tolist(), np.asarray(self.image.convert('RGB')).tolist())
+    self.assertEqual(list(self.arrayImage.getMeanColor()), ImageStat.Stat(self.image).mean)
+    grayscaleImage = ArrayImage(self.arrayImage.getGrayscaleArray())
+    self.assertEqual(grayscaleImage.getRgbArray().tolist(), np.asarray(grayscaleImage.toImage().convert('RGB')).tolist())
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from PIL import Image
+
+from guirecognizer import ActionType, AsyncRecognizer, Frame, Recognizer
+from tests.test_utility import LoggedTestCase
+
+
+class TestAsyncRecognizer(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    self.asyncRecognizer = AsyncRecognizer(self.recognizer)
+    with Image.open('tests/data/img/img1.png') as image:
+      self.screenshot = image.convert('RGB')
+    self.frame = Frame(self.screenshot.crop((0, 0, 39, 39)), (0, 0, 39, 39))
+
+  def test_execute(self):
+    async def run():
+      return await asyncio.gather(
+        self.asyncRecognizer.executePixelColor('pixelColor1', screenshot=self.screenshot),
+        self.asyncRecognizer.executeFindImage('findImage2', screenshot=self.screenshot),
+        self.asyncRecognizer.execute('selection1', ActionType.PIXEL_COLOR, screenshot=self.screenshot))
+    self.assertEqual(asyncio.run(run()), [(114, 114, 114), [(7, 28, 13, 29), (6, 27, 15, 28)], (178, 178, 178)])
+
+  def test_executeMany(self):
+    async def run():
+      return await self.asyncRecognizer.executeMany({'pixel': 'pixelColor1', 'find': 'findImage1'}, screenshot=self.screenshot)
+    self.assertEqual(asyncio.run(run()), {'pixel': (114, 114, 114), 'find': [(12, 12, 19, 18)]})
+
+  def test_executePlan(self):
+    plan = self.recognizer.compile('pixelColor1')
+    async def run():
+      async with self.asyncRecognizer.frame(self.frame):
+        return await self.asyncRecognizer.executePlan(plan)
+    self.assertEqual(asyncio.run(run()), (114, 114, 114))
+
+  def test_error(self):
+    async def run():
+      await self.asyncRecognizer.executePixelColor('findImage1', screenshot=self.screenshot)
+    with self.assertRaises(ValueError):
+      asyncio.run(run())
+
+  def test_frame_shared(self):
+    async def run():
+      async with self.asyncRecognizer.frame() as frame:
+        self.assertIs(self.asyncRecognizer.currentFrame, frame)
+        results = await asyncio.gather(self.asyncRecognizer.executePixelColor('pixelColor1'),
+            self.asyncRecognizer.executeFindImage('findImage2'), self.asyncRecognizer.executeSelection('selection1'))
+      self.assertIsNone(self.asyncRecognizer.currentFrame)
+      return results
+    with patch.object(Recognizer, 'captureFrame', return_value=self.frame) as captureFrame, \
+        patch.object(self.recognizer.captureBackend, 'grabArea') as grabArea:
+      results = asyncio.run(run())
+    captureFrame.assert_called_once()
+    grabArea.assert_not_called()
+    self.assertEqual(results, [(114, 114, 114), [(7, 28, 13, 29), (6, 27, 15, 28)], (178, 178, 178)])
+
+  def test_frame_perTask(self):
+    otherFrame = Frame(self.screenshot.crop((0, 0, 39, 39)).transpose(Image.Transpose.FLIP_LEFT_RIGHT), (0, 0, 39, 39))
+    async def read(frame: Frame) -> Frame | None:
+      async with self.asyncRecognizer.frame(frame):
+        await asyncio.sleep(0.01)
+        return self.asyncRecognizer.currentFrame
+    async def run():
+      return await asyncio.gather(read(self.frame), read(otherFrame))
+    self.assertEqual(asyncio.run(run()), [self.frame, otherFrame])
+    self.assertIsNone(self.recognizer.currentFrame)
+
+  def test_frame_ownSource(self):
+    async def run():
+      async with self.asyncRecognizer.frame(self.frame):
+        return await self.asyncRecognizer.executePixelColor('pixelColor1',
+            screenshot=self.screenshot.transpose(Image.Transpose.FLIP_LEFT_RIGHT))
+    self.assertNotEqual(asyncio.run(run()), (114, 114, 114))
+
+  def slowExecute(self, release: threading.Event):
+    execute = Recognizer.execute
+    def wrapper(*args, **kwargs):
+      release.wait(2)
+      return execute(*args, **kwargs)
+    return wrapper
+
+  def test_timeout(self):
+    release = threading.Event()
+    async def run():
+      try:
+        with self.assertRaises(TimeoutError):
+          await self.asyncRecognizer.executePixelColor('pixelColor1', screenshot=self.screenshot, timeout=0.05)
+      finally:
+        release.set()
+    with patch.object(Recognizer, 'execute', self.slowExecute(release)):
+      asyncio.run(run())
+
+  def test_cancel(self):
+    release = threading.Event()
+    async def run():
+      task = asyncio.create_task(self.asyncRecognizer.executePixelColor('pixelColor1', screenshot=self.screenshot))
+      await asyncio.sleep(0.05)
+      task.cancel()
+      try:
+        with self.assertRaises(asyncio.CancelledError):
+          await task
+      finally:
+        release.set()
+    with patch.object(Recognizer, 'execute', self.slowExecute(release)):
+      asyncio.run(run())
+
+  def test_loopNotBlocked(self):
+    release = threading.Event()
+    ticks = []
+    async def tick():
+      for _ in range(5):
+        ticks.append(time.monotonic())
+        await asyncio.sleep(0.01)
+      release.set()
+    async def run():
+      return await asyncio.gather(self.asyncRecognizer.executePixelColor('pixelColor1', screenshot=self.screenshot), tick())
+    with patch.object(Recognizer, 'execute', self.slowExecute(release)):
+      results = asyncio.run(run())
+    self.assertEqual(results[0], (114, 114, 114))
+    self.assertEqual(len(ticks), 5)
+
+  def test_waitUntil(self):
+    colors = [(0, 0, 0), (0, 0, 0), (224, 224, 224)]
+    async def run():
+      return await self.asyncRecognizer.waitUntil('isSamePixelColor1', interval=0.001)
+    with patch.object(self.recognizer.captureBackend, 'grabPoint', side_effect=colors) as grabPoint:
+      self.assertTrue(asyncio.run(run()))
+    self.assertEqual(grabPoint.call_count, 3)
+
+  def test_waitUntil_timeout(self):
+    async def run():
+      await self.asyncRecognizer.waitUntil('isSamePixelColor1', timeout=0.05, interval=0.001)
+    with patch.object(self.recognizer.captureBackend, 'grabPoint', return_value=(0, 0, 0)):
+      with self.assertRaises(TimeoutError):
+        asyncio.run(run())
+
+  def test_watch(self):
+    executor = ThreadPoolExecutor(1)
+    self.addCleanup(executor.shutdown)
+    asyncRecognizer = AsyncRecognizer(self.recognizer, executor)
+    async def run():
+      watcher = asyncRecognizer.watch(['pixelColor1'])
+      self.assertIs(watcher.executor, executor)
+      async for event in watcher:
+        watcher.close()
+        return event
+    with patch.object(self.recognizer.captureBackend, 'grabArea', side_effect=lambda region, allScreens: self.screenshot.crop(region)):
+      event = asyncio.run(run())
+    self.assertEqual((event.key, event.result), ('pixelColor1', (114, 114, 114)))
@@ -0,0 +1,143 @@
+import time
+import unittest
+
+from PIL import Image
+
+from guirecognizer import (BackgroundCapturer, CaptureBackend, Recognizer,
+                           RecognizerValueError)
+from tests.test_utility import LoggedTestCase
+
+
+class ImageCaptureBackend(CaptureBackend):
+  def __init__(self, image, failing=False):
+    self.image = image
+    self.failing = failing
+    self.nbGrabs = 0
+
+  def grabArea(self, coord, allScreens=False):
+    if self.failing:
+      raise OSError('Capture failed.')
+    self.nbGrabs += 1
+    return self.image.crop(coord)
+
+class TestBackgroundCapturer(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.backend = ImageCaptureBackend(Image.open('tests/data/img/img1.png'))
+    self.capturer = None
+
+  def tearDown(self):
+    if self.capturer is not None:
+      self.capturer.stop()
+    super().tearDown()
+
+  def waitUntil(self, condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+      if time.monotonic() > deadline:
+        self.fail('Condition not reached in time.')
+      time.sleep(0.005)
+
+  def test_error_invalidParameters(self):
+    with self.assertRaises(RecognizerValueError):
+      BackgroundCapturer(self.backend, (0, 0, 39, 39), rate=0)
+    with self.assertRaises(RecognizerValueError):
+      BackgroundCapturer(self.backend, (0, 0, 39, 39), bufferSize=0)
+    with self.assertRaises(RecognizerValueError):
+      BackgroundCapturer(self.backend, (0, 0, 39, 39), maxFrameAge=-1)
+    with self.assertRaises(RecognizerValueError):
+      BackgroundCapturer(self.backend, (0, 0, 39, 39), maxUnreadFrames=0)
+
+  def test_error_notRunning(self):
+    self.capturer = BackgroundCapturer(self.backend, (0, 0, 39, 39))
+    with self.assertRaises(RecognizerValueError):
+      self.capturer.waitForFrame()
+
+  def test_error_captureFailed(self):
+    self.capturer = BackgroundCapturer(ImageCaptureBackend(None, failing=True), (0, 0, 39, 39))
+    self.capturer.start()
+    with self.assertRaises(RecognizerValueError):
+      self.capturer.waitForFrame(timeout=2)
+
+  def test_boundedBuffer(self):
+    self.capturer = BackgroundCapturer(self.backend, (0, 0, 39, 39), rate=500, bufferSize=2)
+    self.capturer.start()
+    self.waitUntil(lambda: self.capturer.nbCapturedFrames >= 5)
+    self.capturer.stop()
+    frames = self.capturer.getFrames()
+    self.assertEqual(len(frames), 2)
+    self.assertLess(frames[0].monotonicTimestamp, frames[1].monotonicTimestamp)
+    self.assertEqual(self.capturer.nbDroppedFrames, self.capturer.nbCapturedFrames - 2)
+    self.assertEqual(frames[1].image.size, (39, 39))
+
+  def test_maxFrameAge(self):
+    self.capturer = BackgroundCapturer(self.backend, (0, 0, 39, 39), rate=500, maxFrameAge=0.05)
+    self.capturer.start()
+    self.capturer.waitForFrame(timeout=2)
+    self.capturer.stop()
+    time.sleep(0.1)
+    self.assertIsNone(self.capturer.getLatestFrame())
+    self.assertEqual(len(self.capturer.getFrames()), 0)
+
+  def test_maxUnreadFrames(self):
+    self.capturer = BackgroundCapturer(self.backend, (0, 0, 39, 39), rate=500, maxUnreadFrames=2)
+    self.capturer.start()
+    self.waitUntil(lambda: self.capturer.nbCapturedFrames == 2)
+    time.sleep(0.05)
+    self.assertEqual(self.capturer.nbCapturedFrames, 2)
+    self.assertIsNotNone(self.capturer.getLatestFrame())
+    self.waitUntil(lambda: self.capturer.nbCapturedFrames == 4)
+
+  def test_waitForFrame_newerThan(self):
+    self.capturer = BackgroundCapturer(self.backend, (0, 0, 39, 39), rate=100, maxUnreadFrames=1)
+    self.capturer.start()
+    frame = self.capturer.waitForFrame(timeout=2)
+    newerThan = time.monotonic()
+    newFrame = self.capturer.waitForFrame(newerThan, timeout=2)
+    self.assertGreater(newFrame.monotonicTimestamp, newerThan)
+    self.assertIsNot(frame, newFrame)
+
+  def test_waitForFrame_timeout(self):
+    self.capturer = BackgroundCapturer(self.backend, (0, 0, 39, 39), rate=1)
+    self.capturer.start()
+    self.capturer.waitForFrame(timeout=2)
+    with self.assertRaises(TimeoutError):
+      self.capturer.waitForFrame(time.monotonic(), timeout=0.01)
+
+class TestRecognizerBackgroundCapture(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.backend = ImageCaptureBackend(Image.open('tests/data/img/img1.png'))
+    self.recognizer = Recognizer('tests/data/json/config1.json', captureBackend=self.backend)
+
+  def tearDown(self):
+    self.recognizer.stopBackgroundCapture()
+    super().tearDown()
+
+  def test_error_frameNewerThan(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.executeSelection('selection1', frameNewerThan=time.monotonic())
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.executeSelection('selection1', frameNewerThan='now') # type: ignore
+
+  def test_error_noBorders(self):
+    with self.assertRaises(RecognizerValueError):
+      Recognizer().startBackgroundCapture()
+
+  def test_execute(self):
+    capturer = self.recognizer.startBackgroundCapture(rate=100, maxUnreadFrames=1)
+    self.assertTrue(capturer.isRunning)
+    self.assertEqual(self.recognizer.executeSelection('selection1'), (178, 178, 178, 255))
+    self.assertEqual(self.recognizer.executePixelColor('pixelColor3'), (95, 95, 95))
+    newerThan = time.monotonic()
+    self.assertEqual(self.recognizer.executeSelection('selection1', frameNewerThan=newerThan), (178, 178, 178, 255))
+    self.recognizer.stopBackgroundCapture()
+    self.assertFalse(capturer.isRunning)
+    self.assertIsNone(self.recognizer.backgroundCapturer)
+    nbGrabs = self.backend.nbGrabs
+    self.recognizer.executeSelection('selection1')
+    self.assertEqual(self.backend.nbGrabs, nbGrabs + 1)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,79 @@
+import contextlib
+import io
+import json
+from unittest.mock import patch
+
+from PIL import Image
+
+from guirecognizer import Recognizer, RecognizerValueError
+from guirecognizer.bench import benchmarkActions, getPercentile, main
+from tests.test_utility import LoggedTestCase
+
+
+class TestBench(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    with Image.open('tests/data/img/img1.png') as image:
+      self.screenshot = image.convert('RGB')
+
+  def test_benchmarkActions(self):
+    with patch.object(Recognizer, 'getText', return_value='text'), patch.object(Recognizer, 'getNumber', return_value=4):
+      results = benchmarkActions(self.recognizer, 5, screenshot=self.screenshot)
+    self.assertEqual([result['actionId'] for result in results], list(self.recognizer.actionById))
+    resultById = {result['actionId']: result for result in results}
+    self.assertEqual(resultById['click1']['error'], 'click actions are not executed')
+    self.assertEqual(resultById['click1']['count'], 0)
+    findImage = resultById['findImage2']
+    self.assertIsNone(findImage['error'])
+    self.assertEqual(findImage['count'], 5)
+    self.assertLessEqual(findImage['p50'], findImage['p95'])
+    self.assertLessEqual(findImage['p95'], findImage['p99'])
+    self.assertEqual(set(findImage['stages']), {'matchTemplate', 'hashVerification'})
+    self.assertLessEqual(findImage['stages']['matchTemplate'], findImage['mean'])
+    self.assertEqual(set(resultById['text1']['stages']), {'ocr'})
+    self.assertEqual(resultById['pixelColor1']['stages'], {})
+    self.assertIsNone(self.recognizer.instrumentation)
+
+  def test_benchmarkActions_error(self):
+    instrumentation = self.recognizer.enableInstrumentation()
+    with patch.object(Recognizer, 'getText', side_effect=ModuleNotFoundError('No module named \'easyocr\'')):
+      result, = benchmarkActions(self.recognizer, 2, actionIds=['text1'], screenshot=self.screenshot)
+    self.assertEqual(result['error'], 'ModuleNotFoundError: No module named \'easyocr\'')
+    self.assertIs(self.recognizer.instrumentation, instrumentation)
+    with self.assertRaises(RecognizerValueError):
+      benchmarkActions(self.recognizer, 0)
+    with self.assertRaises(RecognizerValueError):
+      benchmarkActions(self.recognizer, nbWarmups=-1)
+    with self.assertRaises(RecognizerValueError):
+      benchmarkActions(self.recognizer, actionIds=['unknown'])
+
+  def test_getPercentile(self):
+    durations = [float(value) for value in range(1, 101)]
+    self.assertEqual(getPercentile(durations, 50), 50)
+    self.assertEqual(getPercentile(durations, 99), 99)
+    self.assertEqual(getPercentile([3.], 95), 3)
+    self.assertEqual(getPercentile([], 50), 0)
+
+  def test_main(self):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+      main(['bench', 'tests/data/json/config1.json', '--screenshot', 'tests/data/img/img1.png', '--iterations', '3',
+          '--actions', 'pixelColor1', 'findImage2', 'click1'])
+    lines = output.getvalue().splitlines()
+    self.assertEqual(lines[0].split()[:5], ['action', 'type', 'p50', 'p95', 'p99'])
+    self.assertEqual([line.split()[0] for line in lines[1:4]], ['pixelColor1', 'findImage2', 'click1'])
+    self.assertIn('click actions are not executed', lines[3])
+
+  def test_main_json(self):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+      main(['bench', 'tests/data/json/config1.json', '--screenshot', 'tests/data/img/img1.png', '--iterations', '3',
+          '--actions', 'pixelColor1', 'findImage2', '--sort', 'p95', '--json'])
+    results = json.loads(output.getvalue())
+    self.assertEqual([result['actionId'] for result in results], ['findImage2', 'pixelColor1'])
+
+  def test_main_error(self):
+    with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as context:
+      main(['bench', 'tests/data/json/config1.json', '--actions', 'unknown'])
+    self.assertEqual(context.exception.code, 2)
@@ -0,0 +1,358 @@
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer import (CaptureBackend, PilCaptureBackend, Recognizer,
+                           RecognizerValueError, ReplayCaptureBackend,
+                           XShmCaptureBackend)
+from tests.test_utility import LoggedTestCase
+
+
+class ImageCaptureBackend(CaptureBackend):
+  def __init__(self, image):
+    self.image = image
+    self.nbGrabs = 0
+
+  def grabArea(self, coord, allScreens=False):
+    self.nbGrabs += 1
+    return self.image.crop(coord)
+
+class TestPilCaptureBackend(LoggedTestCase):
+  def test_grabArea(self):
+    image = Image.new('RGB', (3, 2), (1, 2, 3))
+    with patch('guirecognizer.capture.ImageGrab.grab', return_value=image) as mock:
+      backend = PilCaptureBackend()
+      self.assertIs(backend.grabArea((0, 0, 3, 2)), image)
+      mock.assert_called_once_with((0, 0, 3, 2), all_screens=False)
+
+  def test_grabPoint(self):
+    with patch('guirecognizer.capture.ImageGrab.grab', return_value=Image.new('RGB', (1, 1), (1, 2, 3))) as mock:
+      backend = PilCaptureBackend()
+      self.assertEqual(backend.grabPoint((5, 6), allScreens=True), (1, 2, 3))
+      mock.assert_called_once_with((5, 6, 6, 7), all_screens=True)
+
+  def test_grabAreaScaled(self):
+    image = Image.new('RGB', (30, 20), (1, 2, 3))
+    with patch('guirecognizer.capture.ImageGrab.grab', return_value=image) as mock:
+      backend = PilCaptureBackend()
+      self.assertEqual(backend.grabAreaScaled((0, 0, 30, 20), 0.5).size, (15, 10))
+      self.assertEqual(backend.grabAreaScaled((0, 0, 30, 20), 0.4).size, (12, 8))
+      self.assertEqual(backend.grabAreaScaled((0, 0, 30, 20), 1), image)
+      self.assertEqual(mock.call_count, 3)
+
+class TestRecognizerCaptureBackend(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.backend = ImageCaptureBackend(Image.open('tests/data/img/img1.png'))
+    self.recognizer = Recognizer('tests/data/json/config1.json', captureBackend=self.backend)
+
+  def test_error_setCaptureBackend(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.setCaptureBackend(42) # type: ignore
+
+  def test_execute(self):
+    self.assertEqual(self.recognizer.executeSelection('selection1'), (178, 178, 178, 255))
+    self.assertEqual(self.recognizer.executePixelColor('pixelColor1'), (114, 114, 114))
+    self.assertEqual(self.recognizer.executeFindImage('findImage1'), [(12, 12, 19, 18)])
+    self.assertEqual(self.backend.nbGrabs, 3)
+
+  def test_bordersImage(self):
+    self.assertEqual(self.recognizer.getBordersImage().size, (39, 39))
+    with self.recognizer.frame():
+      self.recognizer.executeSelection('selection1')
+      self.recognizer.executePixelColor('pixelColor1')
+    self.assertEqual(self.backend.nbGrabs, 2)
+
+  def test_setCaptureBackend(self):
+    backend = ImageCaptureBackend(Image.new('RGB', (40, 40), (1, 2, 3)))
+    self.recognizer.setCaptureBackend(backend)
+    self.assertEqual(self.recognizer.executeSelection('selection1'), (1, 2, 3))
+    self.assertEqual(self.backend.nbGrabs, 0)
+
+class TestCaptureActions(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.image = Image.open('tests/data/img/img1.png')
+    self.backend = ImageCaptureBackend(self.image)
+    self.recognizer = Recognizer('tests/data/json/config1.json', captureBackend=self.backend)
+
+  def test_getCaptureRegions(self):
+    self.assertEqual(Recognizer.getCaptureRegions([]), [])
+    self.assertEqual(Recognizer.getCaptureRegions([(0, 0), (10, 10, 20, 20)]), [(0, 0, 20, 20)])
+    self.assertEqual(Recognizer.getCaptureRegions([(0, 0), (10, 10, 20, 20)], grabOverhead=0), [(0, 0, 1, 1), (10, 10, 20, 20)])
+    self.assertEqual(Recognizer.getCaptureRegions([(10, 10, 20, 20), (12, 12, 15, 15)], grabOverhead=0), [(10, 10, 20, 20)])
+    self.assertEqual(Recognizer.getCaptureRegions([(0, 0, 10, 10), (10, 0, 20, 10), (1000, 1000, 1010, 1010)], grabOverhead=1000),
+        [(1000, 1000, 1010, 1010), (0, 0, 20, 10)])
+
+  def test_error(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.captureActions()
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.captureActions('unknown')
+
+  def test_captureActions_oneGrab(self):
+    frame = self.recognizer.captureActions('selection2', 'pixelColor3', 'imageHash1')
+    self.assertEqual(self.backend.nbGrabs, 1)
+    self.assertEqual(frame.borders, (7, 8, 31, 19))
+    self.assertEqual(frame.image.size, (24, 11))
+
+  def test_captureActions_manyGrabs(self):
+    frame = self.recognizer.captureActions('selection2', 'pixelColor3', 'imageHash1', grabOverhead=0)
+    self.assertEqual(self.backend.nbGrabs, 2)
+    self.assertEqual(frame.regions, [(7, 11, 12, 18), (20, 8, 31, 19)])
+    self.assertFalse(frame.containsCoord((15, 12)))
+    with self.recognizer.frame(frame):
+      self.assertEqual(self.recognizer.executePixelColor('pixelColor3'),
+          self.recognizer.executePixelColor('pixelColor3', screenshot=self.image))
+      self.assertEqual(self.recognizer.executeImageHash('imageHash1'),
+          self.recognizer.executeImageHash('imageHash1', screenshot=self.image))
+      self.assertEqual(self.recognizer.executeSelection('selection2').tobytes(), # type: ignore
+          self.recognizer.executeSelection('selection2', screenshot=self.image).tobytes()) # type: ignore
+      self.assertEqual(self.backend.nbGrabs, 2)
+      self.recognizer.executeSelection('selection1')
+      self.assertEqual(self.backend.nbGrabs, 3)
+
+  def test_captureActions_distantRegions(self):
+    image = Image.new('RGB', (2000, 1000), (1, 2, 3))
+    image.paste((4, 5, 6), (1900, 900, 2000, 1000))
+    backend = ImageCaptureBackend(image)
+    recognizer = Recognizer({'borders': (0, 0, 2000, 1000), 'actions': [
+        {'id': 'topLeft', 'type': 'pixelColor', 'ratios': (0, 0, 0.05, 0.1)},
+        {'id': 'bottomRight', 'type': 'pixelColor', 'ratios': (0.95, 0.9, 1, 1)}]}, captureBackend=backend)
+    with patch.object(Image, 'new', wraps=Image.new) as new:
+      frame = recognizer.captureActions('topLeft', 'bottomRight')
+      with recognizer.frame(frame):
+        self.assertEqual(recognizer.executePixelColor('topLeft'), (1, 2, 3))
+        self.assertEqual(recognizer.executePixelColor('bottomRight'), (4, 5, 6))
+    self.assertEqual(backend.nbGrabs, 2)
+    # The regions are kept apart: no buffer of the size of their bounds.
+    new.assert_not_called()
+    self.assertIsNone(frame.image)
+    self.assertEqual(frame.borders, (0, 0, 2000, 1000))
+    self.assertEqual(sorted(regionImage.size for regionImage in frame.regionImages), [(100, 100), (100, 100)])
+    self.assertEqual(sorted(frame.getRegionArrayImage(index).array.shape for index in range(2)), [(100, 100, 3), (100, 100, 3)])
+    with self.assertRaises(RecognizerValueError):
+      frame.arrayImage
+    with self.assertRaises(RecognizerValueError):
+      frame.getArea((500, 500, 510, 510))
+
+class TestReplayCaptureBackend(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.tmpdir = tempfile.TemporaryDirectory()
+    self.frames = np.zeros((3, 4, 5, 3), dtype=np.uint8)
+    for i in range(3):
+      self.frames[i, :, :] = (i * 10, i * 20, i * 30)
+
+  def tearDown(self):
+    self.tmpdir.cleanup()
+    super().tearDown()
+
+  def assertReplayFrames(self, backend, nbFrames=3):
+    for i in range(nbFrames):
+      self.assertEqual(backend.grabPoint((1, 1)), (i * 10, i * 20, i * 30))
+    with self.assertRaises(EOFError):
+      backend.grabArea((0, 0, 5, 4))
+
+  def test_error(self):
+    with self.assertRaises(OSError):
+      ReplayCaptureBackend(self.tmpdir.name)
+    with self.assertRaises(OSError):
+      ReplayCaptureBackend(os.path.join(self.tmpdir.name, 'unknown.mp4'))
+    np.save(os.path.join(self.tmpdir.name, 'frames.npy'), self.frames)
+    with self.assertRaises(RecognizerValueError):
+      ReplayCaptureBackend(os.path.join(self.tmpdir.name, 'frames.npy'), fps=0)
+
+  def test_directory(self):
+    for i in range(3):
+      Image.fromarray(self.frames[i]).save(os.path.join(self.tmpdir.name, f'frame{i}.png'))
+    backend = ReplayCaptureBackend(self.tmpdir.name)
+    self.assertEqual(backend.nbFrames, 3)
+    self.assertReplayFrames(backend)
+
+  def test_npy(self):
+    filepath = os.path.join(self.tmpdir.name, 'frames.npy')
+    np.save(filepath, self.frames)
+    self.assertReplayFrames(ReplayCaptureBackend(filepath))
+
+  def test_npz(self):
+    filepath = os.path.join(self.tmpdir.name, 'frames.npz')
+    np.savez(filepath, frames=self.frames)
+    self.assertReplayFrames(ReplayCaptureBackend(filepath))
+    filepath = os.path.join(self.tmpdir.name, 'frameList.npz')
+    np.savez(filepath, *self.frames)
+    self.assertReplayFrames(ReplayCaptureBackend(filepath))
+
+  def test_video(self):
+    import cv2 as cv
+    filepath = os.path.join(self.tmpdir.name, 'frames.avi')
+    writer = cv.VideoWriter(filepath, cv.VideoWriter_fourcc(*'MJPG'), 10, (16, 16))
+    for i in range(3):
+      writer.write(np.full((16, 16, 3), i * 100, dtype=np.uint8))
+    writer.release()
+    backend = ReplayCaptureBackend(filepath)
+    self.assertEqual(backend.nbFrames, 3)
+    self.assertEqual(backend.fps, 10)
+    for i in range(3):
+      self.assertAlmostEqual(backend.grabPoint((8, 8))[0], i * 100, delta=5) # type: ignore
+    with self.assertRaises(EOFError):
+      backend.grabPoint((8, 8))
+    backend.close()
+
+  def test_loopAndOrigin(self):
+    filepath = os.path.join(self.tmpdir.name, 'frames.npy')
+    np.save(filepath, self.frames)
+    backend = ReplayCaptureBackend(filepath, loop=True, origin=(100, 200))
+    for i in range(5):
+      self.assertEqual(backend.grabPoint((101, 201)), ((i % 3) * 10, (i % 3) * 20, (i % 3) * 30))
+    self.assertEqual(backend.grabArea((98, 200, 103, 204)).getpixel((0, 0)), (0, 0, 0))
+    backend.rewind()
+    self.assertEqual(backend.grabPoint((101, 201)), (0, 0, 0))
+    self.assertEqual(backend.frameIndex, 0)
+
+  def test_realTime(self):
+    filepath = os.path.join(self.tmpdir.name, 'frames.npy')
+    np.save(filepath, self.frames)
+    backend = ReplayCaptureBackend(filepath, realTime=True, fps=10)
+    with patch('guirecognizer.capture.time.monotonic', side_effect=[5, 5.05, 5.15, 5.29, 5.35]):
+      self.assertEqual([backend.grabPoint((1, 1))[0] for _ in range(4)], [0, 0, 10, 20]) # type: ignore
+      with self.assertRaises(EOFError):
+        backend.grabPoint((1, 1))
+
+  def test_recognizer(self):
+    filepath = os.path.join(self.tmpdir.name, 'frames.npy')
+    np.save(filepath, np.array(Image.open('tests/data/img/img1.png').convert('RGB'))[np.newaxis])
+    recognizer = Recognizer('tests/data/json/config1.json', captureBackend=ReplayCaptureBackend(filepath, loop=True))
+    self.assertEqual(recognizer.executePixelColor('pixelColor1'), (114, 114, 114))
+    self.assertEqual(recognizer.executeFindImage('findImage1'), [(12, 12, 19, 18)])
+
+  def test_grabBatch(self):
+    filepath = os.path.join(self.tmpdir.name, 'frames.npy')
+    np.save(filepath, self.frames)
+    backend = ReplayCaptureBackend(filepath)
+    with backend.grabBatch():
+      self.assertEqual(backend.grabPoint((0, 0)), (0, 0, 0))
+      with backend.grabBatch():
+        self.assertEqual(backend.grabPoint((4, 3)), (0, 0, 0))
+      self.assertEqual(backend.frameIndex, 0)
+    self.assertEqual(backend.grabPoint((0, 0)), (10, 20, 30))
+    with backend.grabBatch():
+      self.assertEqual(backend.grabArea((0, 0, 5, 4)).getpixel((2, 2)), (20, 40, 60))
+    with self.assertRaises(EOFError):
+      with backend.grabBatch():
+        pass
+
+  def test_recognizer_captureActions(self):
+    filepath = os.path.join(self.tmpdir.name, 'frames.npy')
+    frames = np.zeros((3, 100, 200, 3), dtype=np.uint8)
+    for i in range(3):
+      frames[i, :, :] = (i * 10, i * 20, i * 30)
+    np.save(filepath, frames)
+    backend = ReplayCaptureBackend(filepath)
+    recognizer = Recognizer({'borders': (0, 0, 200, 100), 'actions': [
+        {'id': 'topLeft', 'type': 'pixelColor', 'ratios': (0, 0, 0.05, 0.1)},
+        {'id': 'bottomRight', 'type': 'pixelColor', 'ratios': (0.95, 0.9, 1, 1)}]}, captureBackend=backend)
+    for i in range(3):
+      frame = recognizer.captureActions('topLeft', 'bottomRight', grabOverhead=0)
+      self.assertEqual(len(frame.regions), 2)
+      self.assertEqual(backend.frameIndex, i)
+      with recognizer.frame(frame):
+        self.assertEqual(recognizer.executePixelColor('topLeft'), (i * 10, i * 20, i * 30))
+        self.assertEqual(recognizer.executePixelColor('bottomRight'), (i * 10, i * 20, i * 30))
+    with self.assertRaises(EOFError):
+      recognizer.captureActions('topLeft', 'bottomRight', grabOverhead=0)
+
+@unittest.skipUnless(os.environ.get('DISPLAY'), 'requires an X11 display, for instance: xvfb-run python -m unittest')
+class TestXShmCaptureBackend(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    try:
+      self.backend = XShmCaptureBackend()
+    except OSError as e:
+      self.skipTest(str(e))
+
+  def tearDown(self):
+    self.backend.close()
+    super().tearDown()
+
+  def test_grabArea(self):
+    coord = (10, 20, 110, 70)
+    image = self.backend.grabArea(coord)
+    self.assertEqual(image.mode, 'RGB')
+    self.assertEqual(image.size, (100, 50))
+    self.assertEqual(np.asarray(image).tolist(), np.asarray(PilCaptureBackend().grabArea(coord).convert('RGB')).tolist())
+
+  def test_grabPoint(self):
+    self.assertEqual(self.backend.grabPoint((5, 5)), PilCaptureBackend().grabArea((5, 5, 6, 6)).convert('RGB').getpixel((0, 0)))
+    self.assertEqual(self.backend.grabPoint((-5000000, -5000000)), (0, 0, 0))
+
+  def test_grabAreaScaled(self):
+    coord = (10, 20, 110, 70)
+    fullImage = self.backend.grabArea(coord)
+    image = self.backend.grabAreaScaled(coord, 0.5)
+    self.assertEqual(image.size, (50, 25))
+    self.assertEqual(image.getpixel((3, 2)), fullImage.getpixel((6, 4)))
+    self.assertEqual(self.backend.grabAreaScaled(coord, 0.3).size, (30, 15))
+
+  def test_grabAreaArray_reusedBuffer(self):
+    array1 = self.backend.grabAreaArray((0, 0, 20, 10))
+    array2 = self.backend.grabAreaArray((5, 5, 15, 25))
+    self.assertEqual(array1.shape, (10, 20, 4))
+    self.assertEqual(array2.shape, (20, 10, 4))
+    self.assertTrue(np.shares_memory(array1, array2))
+
+  def test_grabAreaArray_outsideScreen(self):
+    array = self.backend.grabAreaArray((-10, -10, 10, 10))
+    self.assertEqual(array.shape, (20, 20, 4))
+    self.assertFalse(array[:10, :10].any())
+
+  def test_grabArea_copied(self):
+    image = self.backend.grabArea((0, 0, 20, 10))
+    expected = np.asarray(image).tolist()
+    self.backend.grabAreaArray((0, 0, 20, 10))[:] = 255
+    self.assertEqual(np.asarray(image).tolist(), expected)
+
+  def test_threads(self):
+    coords = [(0, 0, 64, 32), (10, 20, 110, 70), (-10, -10, 30, 30), (3, 7, 4, 8)]
+    expected = [(np.asarray(self.backend.grabArea(coord)).tolist(), np.asarray(self.backend.grabAreaScaled(coord, 0.5)).tolist(),
+        self.backend.grabPoint(coord[:2])) for coord in coords]
+
+    def grab(index):
+      coord = coords[index % len(coords)]
+      return (np.asarray(self.backend.grabArea(coord)).tolist(), np.asarray(self.backend.grabAreaScaled(coord, 0.5)).tolist(),
+          self.backend.grabPoint(coord[:2]))
+
+    with ThreadPoolExecutor(8) as executor:
+      results = list(executor.map(grab, range(200)))
+    for index, result in enumerate(results):
+      self.assertEqual(result, expected[index % len(coords)])
+
+  def test_close(self):
+    self.backend.close()
+    with self.assertRaises(OSError):
+      self.backend.grabArea((0, 0, 1, 1))
+
+  def test_close_threads(self):
+    def grab():
+      try:
+        while True:
+          self.backend.grabArea((0, 0, 100, 100))
+      except OSError:
+        pass
+
+    threads = [threading.Thread(target=grab) for _ in range(4)]
+    for thread in threads:
+      thread.start()
+    self.backend.close()
+    for thread in threads:
+      thread.join()
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from guirecognizer import (DirtyRegionTracker, Frame, Recognizer,
+                           RecognizerValueError)
+from tests.test_utility import LoggedTestCase
+
+
+class TestDirtyRegionTracker(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.image = Image.open('tests/data/img/img1.png').convert('RGB').crop((0, 0, 39, 39))
+
+  def getChangedImage(self, coord):
+    image = self.image.copy()
+    image.putpixel(coord, (1, 2, 3))
+    return image
+
+  def test_error_invalidTileSize(self):
+    with self.assertRaises(RecognizerValueError):
+      DirtyRegionTracker(0)
+    with self.assertRaises(RecognizerValueError):
+      DirtyRegionTracker(1.5) # type: ignore
+
+  def test_getResult(self):
+    tracker = DirtyRegionTracker(8)
+    frame1 = Frame(self.image, (0, 0, 39, 39))
+    self.assertEqual(tracker.getResult(frame1, 'key', (20, 8, 31, 19)), (False, None))
+    tracker.setResult(frame1, 'key', 42)
+    frame2 = Frame(self.getChangedImage((2, 30)), (0, 0, 39, 39))
+    self.assertEqual(tracker.getResult(frame2, 'key', (20, 8, 31, 19)), (True, 42))
+    self.assertEqual(tracker.getResult(frame2, 'otherKey', (20, 8, 31, 19)), (False, None))
+    self.assertEqual(tracker.getResult(frame2, 'key', (0, 24, 8, 32)), (False, None))
+    frame3 = Frame(self.getChangedImage((38, 38)), (0, 0, 39, 39))
+    self.assertEqual(tracker.getResult(frame3, 'key', (20, 8, 31, 19)), (True, 42))
+    self.assertEqual(tracker.getResult(frame3, 'key', (32, 32, 39, 39)), (False, None))
+    self.assertEqual(tracker.nbHits, 2)
+    self.assertEqual(tracker.nbMisses, 4)
+    self.assertAlmostEqual(tracker.hitRate, 2 / 6)
+    tracker.resetCounters()
+    self.assertEqual(tracker.hitRate, 0)
+
+  def test_differentBorders(self):
+    tracker = DirtyRegionTracker(8)
+    frame1 = Frame(self.image, (0, 0, 39, 39))
+    tracker.getResult(frame1, 'key', (20, 8, 31, 19))
+    tracker.setResult(frame1, 'key', 42)
+    frame2 = Frame(self.image, (1, 0, 40, 39))
+    self.assertEqual(tracker.getResult(frame2, 'key', (20, 8, 31, 19)), (False, None))
+
+  def test_resultCopied(self):
+    tracker = DirtyRegionTracker(8)
+    frame1 = Frame(self.image, (0, 0, 39, 39))
+    tracker.getResult(frame1, 'key', (20, 8, 31, 19))
+    result = [(1, 2, 3, 4)]
+    tracker.setResult(frame1, 'key', result)
+    result.append((5, 6, 7, 8))
+    frame2 = Frame(self.getChangedImage((2, 30)), (0, 0, 39, 39))
+    isHit, hitResult = tracker.getResult(frame2, 'key', (20, 8, 31, 19))
+    self.assertTrue(isHit)
+    self.assertEqual(hitResult, [(1, 2, 3, 4)])
+    hitResult.clear()
+    frame3 = Frame(self.getChangedImage((2, 31)), (0, 0, 39, 39))
+    self.assertEqual(tracker.getResult(frame3, 'key', (20, 8, 31, 19)), (True, [(1, 2, 3, 4)]))
+
+  def test_regions(self):
+    tracker = DirtyRegionTracker(8)
+    regions = [(2, 3, 12, 13), (20, 21, 39, 39)]
+    def getFrame(image):
+      return Frame(None, (2, 3, 39, 39), regions=regions, regionImages=[image.crop(region) for region in regions])
+    frame1 = getFrame(self.image)
+    tracker.getResult(frame1, 'first', (2, 3, 12, 13))
+    tracker.setResult(frame1, 'first', 1)
+    tracker.getResult(frame1, 'second', (20, 21, 39, 39))
+    tracker.setResult(frame1, 'second', 2)
+    frame2 = getFrame(self.getChangedImage((25, 30)))
+    self.assertEqual(tracker.getResult(frame2, 'first', (2, 3, 12, 13)), (True, 1))
+    self.assertEqual(tracker.getResult(frame2, 'second', (20, 21, 39, 39)), (False, None))
+
+  def test_clear(self):
+    tracker = DirtyRegionTracker(8)
+    frame1 = Frame(self.image, (0, 0, 39, 39))
+    tracker.getResult(frame1, 'key', (20, 8, 31, 19))
+    tracker.setResult(frame1, 'key', 42)
+    tracker.clear()
+    self.assertEqual(tracker.getResult(frame1, 'key', (20, 8, 31, 19)), (False, None))
+
+class TestRecognizerDirtyRegions(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    self.tracker = self.recognizer.enableDirtyRegionDetection(tileSize=8)
+    self.image = Image.open('tests/data/img/img1.png').crop((0, 0, 39, 39))
+
+  def getFrame(self, changedCoord=None):
+    image = self.image.copy()
+    if changedCoord is not None:
+      image.putpixel(changedCoord, (1, 2, 3, 255))
+    return Frame(image, self.recognizer.borders)
+
+  def test_execute(self):
+    with patch.object(Recognizer, 'getImageHash', wraps=Recognizer.getImageHash) as getImageHash:
+      with self.recognizer.frame(self.getFrame()):
+        imageHash = self.recognizer.executeImageHash('imageHash1')
+      with self.recognizer.frame(self.getFrame((2, 30))):
+        self.assertEqual(self.recognizer.executeImageHash('imageHash1'), imageHash)
+        self.assertEqual(self.recognizer.executeImageHash('imageHash1'), imageHash)
+      self.assertEqual(getImageHash.call_count, 1)
+      with self.recognizer.frame(self.getFrame((25, 10))):
+        self.assertNotEqual(self.recognizer.executeImageHash('imageHash1'), imageHash)
+      self.assertEqual(getImageHash.call_count, 2)
+    self.assertEqual(self.tracker.nbHits, 1)
+    self.assertEqual(self.tracker.nbMisses, 2)
+
+  def test_notTracked(self):
+    with self.recognizer.frame(self.getFrame()):
+      self.recognizer.executePixelColor('pixelColor3', selectedPoint=(1, 2, 3))
+    self.recognizer.executePixelColor('pixelColor3', screenshot=self.image)
+    self.assertEqual(self.tracker.nbHits + self.tracker.nbMisses, 0)
+
+  def test_loadDataClears(self):
+    with self.recognizer.frame(self.getFrame()):
+      self.recognizer.executePixelColor('pixelColor3')
+    self.recognizer.clearAllData()
+    self.recognizer.loadFilepath('tests/data/json/config1.json')
+    with self.recognizer.frame(self.getFrame()):
+      self.recognizer.executePixelColor('pixelColor3')
+    self.assertEqual(self.tracker.nbHits, 0)
+    self.assertEqual(self.tracker.nbMisses, 2)
+
+  def test_disable(self):
+    self.recognizer.disableDirtyRegionDetection()
+    self.assertIsNone(self.recognizer.dirtyRegionTracker)
+    with self.recognizer.frame(self.getFrame()):
+      self.recognizer.executePixelColor('pixelColor3')
+    self.assertEqual(self.tracker.nbMisses, 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
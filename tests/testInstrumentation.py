@@ -0,0 +1,140 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from PIL import Image
+
+from guirecognizer import (ActionType, Instrumentation, Recognizer,
+                           RecognizerValueError, Stage)
+from guirecognizer.instrumentation import getActiveInstrumentation
+from tests.test_utility import LoggedTestCase
+
+
+class TestInstrumentation(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    with Image.open('tests/data/img/img1.png') as image:
+      self.screenshot = image.convert('RGB')
+
+  def test_disabled(self):
+    self.recognizer.executeFindImage('findImage2', screenshot=self.screenshot)
+    self.assertEqual(self.recognizer.stats(), {'stages': {}, 'actions': {}})
+    self.assertIsNone(getActiveInstrumentation())
+
+  def test_stages(self):
+    self.recognizer.enableInstrumentation()
+    self.assertEqual(self.recognizer.executeFindImage('findImage2', screenshot=self.screenshot), [(7, 28, 13, 29), (6, 27, 15, 28)])
+    self.recognizer.executeImageHash('imageHash1', screenshot=self.screenshot)
+    self.recognizer.execute('selection1', ActionType.PIXEL_COLOR, screenshot=self.screenshot)
+    stats = self.recognizer.stats()
+    self.assertEqual(set(stats['stages']), {'action', 'matchTemplate', 'hashVerification', 'imageHash'})
+    self.assertEqual(stats['stages']['action']['count'], 4)
+    self.assertEqual(set(stats['actions']), {'findImage2', 'imageHash1', 'selection1', 'pixelColor'})
+    self.assertEqual(set(stats['actions']['findImage2']), {'action', 'matchTemplate', 'hashVerification'})
+    self.assertEqual(set(stats['actions']['imageHash1']), {'action', 'imageHash'})
+    findImageStats = stats['actions']['findImage2']['matchTemplate']
+    self.assertEqual(findImageStats['count'], 1)
+    self.assertLessEqual(findImageStats['min'], findImageStats['mean'])
+    self.assertLessEqual(findImageStats['mean'], findImageStats['max'])
+    self.assertLessEqual(findImageStats['max'], stats['actions']['findImage2']['action']['max'])
+    self.assertIsNone(getActiveInstrumentation())
+
+  def test_captureAndPreprocessing(self):
+    recognizer = Recognizer('tests/data/json/config4.json')
+    recognizer.enableInstrumentation()
+    with patch.object(recognizer.captureBackend, 'grabArea', side_effect=lambda region, allScreens: self.screenshot.crop(region)):
+      recognizer.executeFindImage('findImage1', preprocessing='grayscale1')
+      recognizer.captureFrame()
+    stats = recognizer.stats()
+    self.assertEqual(stats['stages']['capture']['count'], 2)
+    self.assertEqual(stats['actions']['findImage1']['capture']['count'], 1)
+    self.assertEqual(stats['actions']['findImage1']['preprocessing']['count'], 1)
+
+  def test_ocr(self):
+    self.recognizer.enableInstrumentation()
+    with patch.object(Recognizer, 'getText', return_value='text'), patch.object(Recognizer, 'getNumber', return_value=4):
+      self.recognizer.executeText('text1', screenshot=self.screenshot)
+      self.recognizer.executeNumber('number1', screenshot=self.screenshot)
+    stats = self.recognizer.stats()
+    self.assertEqual(stats['stages']['ocr']['count'], 2)
+    self.assertEqual(stats['actions']['number1']['ocr']['count'], 1)
+
+  def test_hooks(self):
+    instrumentation = self.recognizer.enableInstrumentation()
+    measures = []
+    def hook(stage: Stage, actionId: str | None, start: float, duration: float) -> None:
+      measures.append((stage, actionId))
+    instrumentation.addHook(hook)
+    self.recognizer.executeImageHash('imageHash1', screenshot=self.screenshot)
+    self.assertEqual(measures, [(Stage.IMAGE_HASH, 'imageHash1'), (Stage.ACTION, 'imageHash1')])
+    instrumentation.removeHook(hook)
+    self.recognizer.executeImageHash('imageHash1', screenshot=self.screenshot)
+    self.assertEqual(len(measures), 2)
+
+  def test_actionScope(self):
+    instrumentation = Instrumentation()
+    with instrumentation.actionScope('outer'):
+      self.assertIs(getActiveInstrumentation(), instrumentation)
+      with instrumentation.actionScope('inner'):
+        instrumentation.record(Stage.OCR, 0)
+      instrumentation.record(Stage.OCR, 0)
+    self.assertIsNone(getActiveInstrumentation())
+    instrumentation.record(Stage.OCR, 0)
+    stats = instrumentation.getStats()
+    self.assertEqual(set(stats['actions']), {'outer', 'inner'})
+    self.assertEqual(stats['stages']['ocr']['count'], 3)
+
+  def test_histogram(self):
+    instrumentation = Instrumentation()
+    with patch('guirecognizer.instrumentation.time.perf_counter', return_value=10.):
+      instrumentation.record(Stage.OCR, 10. - 0.003, 'text1')
+      instrumentation.record(Stage.OCR, 10. - 2, 'text1')
+    stats = instrumentation.getStats()['stages']['ocr']
+    self.assertEqual(stats['count'], 2)
+    self.assertAlmostEqual(stats['total'], 2.003)
+    self.assertAlmostEqual(stats['min'], 0.003)
+    self.assertAlmostEqual(stats['max'], 2)
+    histogram = dict(stats['histogram'])
+    self.assertEqual(histogram[0.005], 1)
+    self.assertEqual(histogram[float('inf')], 1)
+    self.assertEqual(sum(histogram.values()), 2)
+    instrumentation.clear()
+    self.assertEqual(instrumentation.getStats(), {'stages': {}, 'actions': {}})
+
+  def test_chromeTrace(self):
+    instrumentation = self.recognizer.enableInstrumentation(trace=True, maxTraceEvents=3)
+    self.recognizer.executeFindImage('findImage2', screenshot=self.screenshot)
+    self.recognizer.executePixelColor('pixelColor1', screenshot=self.screenshot)
+    with tempfile.TemporaryDirectory() as directory:
+      filepath = os.path.join(directory, 'trace.json')
+      instrumentation.exportChromeTrace(filepath)
+      with open(filepath) as file:
+        trace = json.load(file)
+    events = trace['traceEvents']
+    self.assertEqual([(event['name'], event['cat']) for event in events],
+        [('hashVerification', 'hashVerification'), ('findImage2', 'action'), ('pixelColor1', 'action')])
+    self.assertTrue(all(event['ph'] == 'X' and event['dur'] >= 0 and event['pid'] == os.getpid() for event in events))
+    self.assertEqual(events[0]['args'], {'actionId': 'findImage2'})
+    self.assertLessEqual(events[1]['ts'], events[2]['ts'])
+
+  def test_noTraceByDefault(self):
+    instrumentation = self.recognizer.enableInstrumentation()
+    self.recognizer.executePixelColor('pixelColor1', screenshot=self.screenshot)
+    self.assertEqual(instrumentation.getChromeTrace()['traceEvents'], [])
+
+  def test_error(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.enableInstrumentation(maxTraceEvents=0)
+    self.recognizer.enableInstrumentation()
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.executeText('pixelColor1', reinterpret=ActionType.TEXT, selectedPoint=(1, 2, 3))
+    self.assertIsNone(getActiveInstrumentation())
+
+  def test_disable(self):
+    self.recognizer.enableInstrumentation()
+    self.recognizer.executePixelColor('pixelColor1', screenshot=self.screenshot)
+    self.recognizer.disableInstrumentation()
+    self.assertIsNone(self.recognizer.instrumentation)
+    self.assertEqual(self.recognizer.stats(), {'stages': {}, 'actions': {}})
@@ -1,5 +1,9 @@
+import threading
+import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import call, patch
+
+import pyautogui
 
 from guirecognizer import MouseHelper
 from tests.test_utility import LoggedTestCase
@@ -24,6 +28,32 @@ class TestMouseManager(LoggedTestCase):
       moveToMock.assert_called_once()
       self.assertEqual(clickMock.call_count, 10)
 
+  def test_click_pauseNotShared(self):
+    previousPause = pyautogui.PAUSE
+    with patch('pyautogui.click') as clickMock, patch('pyautogui.moveTo'), \
+        patch('guirecognizer.mouse_helper.time.sleep') as sleepMock:
+      MouseHelper.clickOnPosition((0, 0), pauseDuration=0.5, nbClicks=2)
+      clickMock.assert_called_with(_pause=False)
+      self.assertEqual(sleepMock.call_args_list, [call(0.5), call(0.5)])
+    self.assertEqual(pyautogui.PAUSE, previousPause)
+
+  def test_click_threads(self):
+    positions = []
+    sleep = time.sleep
+    def click(*args, **kwargs):
+      positions.append(moveToMock.call_args.args[0])
+    with patch('pyautogui.click', side_effect=click), patch('pyautogui.moveTo') as moveToMock, \
+        patch('guirecognizer.mouse_helper.time.sleep', side_effect=lambda duration: sleep(0.001)):
+      threads = [threading.Thread(target=MouseHelper.clickOnPosition, args=((i, i),), kwargs={'nbClicks': 3}) for i in range(4)]
+      for thread in threads:
+        thread.start()
+      for thread in threads:
+        thread.join()
+    # Clicks of a thread are not moved by the other threads.
+    self.assertEqual(len(positions), 12)
+    for i in range(0, 12, 3):
+      self.assertEqual(len(set(positions[i:i + 3])), 1)
+
   def test_dragCoords_noCoord(self):
     with patch('pyautogui.mouseDown') as mousDownMock, patch('pyautogui.mouseUp') as mousUpMock, patch('pyautogui.moveTo') as moveToMock:
       MouseHelper.dragCoords([])
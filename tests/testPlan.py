@@ -0,0 +1,107 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer import (ActionType, CompiledPlan, Frame, OcrType,
+                           Recognizer, RecognizerValueError)
+from tests.test_utility import LoggedTestCase
+
+
+class TestCompiledPlan(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    self.recognizer.setOcrOrder([OcrType.EASY_OCR])
+    with Image.open('tests/data/img/img1.png') as image:
+      self.screenshot = image.copy()
+
+  def test_error(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.compile()
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.compile('unknownId')
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.compile('selection1', 42) # type: ignore
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.compile('pixelColor1', expectedActionType=ActionType.NUMBER)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.compile('pixelColor1', screenshotFilepath='tests/data/img/unknown.png')
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.compile('pixelColor1', preprocessing='unknownPreprocessing')
+    plan = self.recognizer.compile(ActionType.PIXEL_COLOR)
+    with self.assertRaises(RecognizerValueError):
+      plan(screenshot=self.screenshot)
+
+  def test_sameResults(self):
+    pipelines = [
+      ('coordinates1',),
+      ('coordinates2',),
+      ('selection1',),
+      ('pixelColor1',),
+      ('pixelColor3',),
+      ('comparePixelColor1',),
+      ('isSamePixelColor1',),
+      ('selection1', 'pixelColor1'),
+      ('selection1', 'comparePixelColor1'),
+      ('selection1', 'isSamePixelColor1', 'pixelColor1'),
+      ('imageHash1',),
+      ('compareImageHash1',),
+      ('isSameImageHash1',),
+      ('selection2', 'imageHash1'),
+      ('selection2', 'compareImageHash1'),
+      ('findImage1',),
+      ('findImage2',),
+      ('pixelColor1', ActionType.COMPARE_PIXEL_COLOR)
+    ]
+    for pipeline in pipelines:
+      with self.subTest(pipeline=pipeline):
+        kwargs = {'pixelColorReference': (167, 167, 167)} if pipeline[-1] == ActionType.COMPARE_PIXEL_COLOR else {}
+        plan = self.recognizer.compile(*pipeline, **kwargs) # type: ignore
+        expected = self.recognizer.execute(*pipeline, screenshot=self.screenshot, **kwargs) # type: ignore
+        self.assertEqual(plan(screenshot=self.screenshot), expected)
+        self.assertEqual(plan(screenshot=self.screenshot), expected)
+
+  def test_options(self):
+    plan = self.recognizer.compile('selection1', 'pixelColor1', 'comparePixelColor1', pixelColor=(167, 167, 167))
+    self.assertEqual(plan(screenshot=self.screenshot), 0)
+    plan = self.recognizer.compile('comparePixelColor1', pixelColorReference=(178, 178, 178))
+    self.assertEqual(plan(screenshot=self.screenshot),
+        self.recognizer.execute('comparePixelColor1', screenshot=self.screenshot, pixelColorReference=(178, 178, 178)))
+    plan = self.recognizer.compile('selection1', reinterpret=ActionType.COORDINATES)
+    self.assertEqual(plan(), (9, 7))
+    plan = self.recognizer.compile('pixelColor1', screenshotFilepath='tests/data/img/img1.png',
+        expectedActionType=ActionType.PIXEL_COLOR)
+    self.assertEqual(plan(), (114, 114, 114))
+
+  def test_numpyScreenshot(self):
+    plan = self.recognizer.compile('selection1')
+    self.assertEqual(plan(screenshot=np.asarray(self.screenshot)), (178, 178, 178, 255))
+
+  def test_borders(self):
+    plan = self.recognizer.compile('coordinates1')
+    self.assertEqual(plan(), (20, 33))
+    self.recognizer.borders = (10, 10, 49, 49)
+    self.assertEqual(plan(), self.recognizer.execute('coordinates1'))
+    self.assertEqual(plan(), (30, 43))
+
+  def test_frame(self):
+    frame = Frame(self.screenshot, (0, 0, 40, 40))
+    plan = self.recognizer.compile('pixelColor3')
+    self.assertEqual(plan(frame=frame), (95, 95, 95))
+    self.assertIn(('pixelColor3',), [key[0] for key in frame.results])
+    frame.results[next(iter(frame.results))] = 'memoized'
+    self.assertEqual(plan(frame=frame), 'memoized')
+    with self.recognizer.frame(frame):
+      self.assertEqual(plan(), 'memoized')
+      self.assertEqual(self.recognizer.execute('pixelColor3'), 'memoized')
+
+  def test_repr(self):
+    plan = self.recognizer.compile('pixelColor1', ActionType.COMPARE_PIXEL_COLOR, pixelColorReference=(0, 0, 0))
+    self.assertIsInstance(plan, CompiledPlan)
+    self.assertEqual(plan.actionIdOrTypes, ('pixelColor1', ActionType.COMPARE_PIXEL_COLOR))
+    self.assertEqual(repr(plan), 'CompiledPlan(\'pixelColor1\', <ActionType.COMPARE_PIXEL_COLOR: \'comparePixelColor\'>)')
+
+
+if __name__ == '__main__':
+  unittest.main()
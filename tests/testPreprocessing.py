@@ -1,6 +1,7 @@
 import unittest
 from typing import cast
 
+import numpy as np
 from PIL import Image, ImageOps
 
 from guirecognizer import (ColorMapMethod, ColorMapPreprocessor,
@@ -8,6 +9,7 @@ from guirecognizer import (ColorMapMethod, ColorMapPreprocessor,
                            PreprocessingType, RecognizerValueError,
                            ResizeMethod, ResizePreprocessor, ThresholdMethod,
                            ThresholdPreprocessor, ThresholdType)
+from guirecognizer.array_image import ArrayImage
 from tests.test_utility import LoggedTestCase
 
 
@@ -58,6 +60,20 @@ class TestPreprocessing(LoggedTestCase):
     preprocessing = Preprocessing({'operations': []})
     self.assertEqual(len(preprocessing.operationById), 0)
 
+  def test_processArray(self):
+    preprocessing = Preprocessing({'operations': [{'id': 'operation1', 'suboperations': [
+      {'type': PreprocessingType.COLOR_MAP, 'colorMap': {'method': ColorMapMethod.RANGE_TO_RANGE, 'inputColor1': (0, 0, 0),
+          'inputColor2': (120, 120, 120), 'outputColor1': (255, 0, 0), 'outputColor2': (0, 0, 255), 'difference': 0.1}},
+      {'type': PreprocessingType.RESIZE, 'resize': {'width': 20, 'height': 30}},
+      {'type': PreprocessingType.THRESHOLD, 'threshold': {'method': ThresholdMethod.SIMPLE, 'threshold': 100}},
+      {'type': PreprocessingType.GRAYSCALE}]}]}) # type: ignore
+    image = Image.open('tests/data/img/img1.png')
+    arrayImage = preprocessing.processArray(ArrayImage.fromImage(image), 'operation1')
+    self.assertIsInstance(arrayImage, ArrayImage)
+    self.assertEqual(np.asarray(arrayImage.toImage()).tolist(), np.asarray(preprocessing.process(image, 'operation1')).tolist())
+    with self.assertRaises(RecognizerValueError):
+      preprocessing.processArray(image, 'operation1') # type: ignore
+
   def test_oneOperation(self):
     preprocessing = Preprocessing({'operations': [
         {'id': 'operationId', 'suboperations': [{'type': PreprocessingType.COLOR_MAP, 'colorMap': {}}]}]})
@@ -471,6 +487,13 @@ class TestResize(LoggedTestCase):
     self.assertEqual(newWidth, width)
     self.assertEqual(newHeight, height)
 
+  def test_resize_notModified(self):
+    preprocessor = ResizePreprocessor(width=20, method=ResizeMethod.FIXED_RATIO_WIDTH)
+    self.assertEqual(preprocessor.process(Image.new('RGB', (40, 10))).size, (20, 5))
+    self.assertEqual(preprocessor.process(Image.new('RGB', (10, 40))).size, (20, 80))
+    self.assertEqual(preprocessor.width, 20)
+    self.assertFalse(hasattr(preprocessor, 'height'))
+
   def test_preprocessing_error(self):
     preprocessing = Preprocessing({'operations': [{'id': 'operation1', 'suboperations': [{'type': PreprocessingType.RESIZE,
         'resize': {'width': 'invalid', 'height': 200, 'method': ResizeMethod.UNFIXED_RATIO.value}}]}]}) # type: ignore
@@ -0,0 +1,84 @@
+import base64
+import io
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+from guirecognizer import (ActionType, Recognizer, RecentLocations,
+                           RecognizerValueError)
+from tests.test_utility import LoggedTestCase
+
+
+class TestRecentLocations(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    rng = np.random.default_rng(0)
+    self.background = Image.fromarray(rng.integers(0, 256, (30, 40, 3), dtype=np.uint8)).resize((400, 300), Image.Resampling.BILINEAR)
+    self.imageToFind = Image.fromarray(rng.integers(0, 256, (4, 4, 3), dtype=np.uint8)).resize((32, 32), Image.Resampling.BILINEAR)
+    buffer = io.BytesIO()
+    self.imageToFind.save(buffer, 'PNG')
+    action = {'type': ActionType.FIND_IMAGE, 'ratios': (0, 0, 1, 1), 'imageToFind': base64.b64encode(buffer.getvalue()).decode(),
+        'threshold': 10, 'maxResults': 1}
+    self.recognizer = Recognizer({'borders': (0, 0, 400, 300), 'actions': [{**action, 'id': 'find', 'recentMargin': 8},
+        {**action, 'id': 'full'}, {**action, 'id': 'negative', 'recentMargin': -1}]}) # type: ignore
+
+  def getScreenshot(self, x: int, y: int) -> Image.Image:
+    screenshot = self.background.copy()
+    screenshot.paste(self.imageToFind, (x, y))
+    return screenshot
+
+  def test_history(self):
+    locations = RecentLocations(3)
+    locations.add([(0, 0, 0.1, 0.1)])
+    locations.add([(0.5, 0.5, 0.6, 0.6), (0.2, 0.2, 0.3, 0.3)])
+    locations.add([(0.05, 0.05, 0.15, 0.15)])
+    # The intersecting location is replaced.
+    self.assertEqual(locations.getLocations(), [(0.05, 0.05, 0.15, 0.15), (0.5, 0.5, 0.6, 0.6), (0.2, 0.2, 0.3, 0.3)])
+    locations.add([(0.7, 0.7, 0.8, 0.8)])
+    self.assertEqual(len(locations), 3)
+    self.assertEqual(locations.getLocations()[-1], (0.5, 0.5, 0.6, 0.6))
+    locations.clear()
+    self.assertEqual(len(locations), 0)
+    with self.assertRaises(RecognizerValueError):
+      RecentLocations(0)
+
+  def test_stats(self):
+    locations = RecentLocations()
+    self.assertEqual(locations.getStats(), {'nbHits': 0, 'nbMisses': 0, 'nbFullSearches': 0, 'hitRate': 0, 'savedTime': 0})
+    locations.recordFullSearch(1)
+    locations.recordFullSearch(0.5)
+    locations.recordHit(0.25)
+    locations.recordHit(0.25)
+    locations.recordHit(0.25)
+    locations.recordMiss(0.5)
+    stats = locations.getStats()
+    self.assertEqual(stats['hitRate'], 0.75)
+    self.assertAlmostEqual(stats['savedTime'], 3 * 0.75 - 0.75 - 0.5)
+
+  def test_searchNearRecentLocations(self):
+    self.assertEqual(set(self.recognizer.actionById), {'find', 'full'})
+    self.assertIsNone(self.recognizer.actionById['full'].recentLocations)
+    _findImageCoordinates = Recognizer._findImageCoordinates
+    searchedSizes = []
+    def findImageCoordinates(areaCoord, area, *args):
+      searchedSizes.append(area.size)
+      return _findImageCoordinates(areaCoord, area, *args)
+    with patch.object(Recognizer, '_findImageCoordinates', side_effect=findImageCoordinates):
+      self.assertEqual(self.recognizer.executeFindImage('find', screenshot=self.getScreenshot(100, 80)), [(100, 80, 132, 112)])
+      # The image moved a little: only the window around its last location is searched.
+      self.assertEqual(self.recognizer.executeFindImage('find', screenshot=self.getScreenshot(105, 77)), [(105, 77, 137, 109)])
+      # The image jumped away: the window has no match and the whole area is searched.
+      self.assertEqual(self.recognizer.executeFindImage('find', screenshot=self.getScreenshot(300, 200)), [(300, 200, 332, 232)])
+    self.assertEqual(searchedSizes, [(400, 300), (48, 48), (48, 48), (400, 300)])
+    stats = self.recognizer.getRecentLocationsStats()
+    self.assertEqual(set(stats), {'find'})
+    self.assertEqual((stats['find']['nbHits'], stats['find']['nbMisses'], stats['find']['nbFullSearches']), (1, 1, 2))
+    # The location of the small move replaced the first one.
+    self.assertEqual(len(self.recognizer.actionById['find'].recentLocations), 2) # type: ignore
+
+  def test_getRecentLocationWindow(self):
+    self.assertEqual(Recognizer._getRecentLocationWindow((0.25, 0.5, 0.5, 0.75), (100, 100), 5, (10, 10)), (20, 45, 55, 80))
+    # The window fits the largest image to find and stays inside the area.
+    self.assertEqual(Recognizer._getRecentLocationWindow((0.5, 0.5, 0.6, 0.6), (100, 100), 0, (20, 30)), (45, 40, 65, 70))
+    self.assertEqual(Recognizer._getRecentLocationWindow((0.9, 0, 1, 0.1), (100, 100), 4, (10, 10)), (82, 0, 100, 18))
@@ -1,12 +1,17 @@
+import base64
+import io
+import sys
+import threading
 import unittest
 from typing import cast
 from unittest.mock import patch
 
+import numpy as np
 from PIL import Image, ImageGrab, ImageOps
 
-from guirecognizer import (ActionType, OcrType, Recognizer,
-                           RecognizerValueError, SelectionType)
-from guirecognizer.recognizer import RecognizerData
+from guirecognizer import (ActionType, BackgroundCapturer, Frame, OcrType,
+                           Recognizer, RecognizerValueError, SelectionType)
+from guirecognizer.recognizer import ExecuteParams, RecognizerData
 from tests.test_utility import LoggedTestCase
 
 
@@ -1224,5 +1229,568 @@ class TestPreprocessing(LoggedTestCase):
     self.assertEqual(result, [(4, 4, 24, 28)])
 
 
+class TestFrame(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    self.bordersImage = Image.open('tests/data/img/img1.png').convert('RGB').crop((0, 0, 39, 39))
+
+  def test_error_noBorders(self):
+    recognizer = Recognizer()
+    with self.assertRaises(RecognizerValueError):
+      with recognizer.frame():
+        pass
+
+  def test_frame_oneCapture(self):
+    with patch('guirecognizer.recognizer.ImageGrab.grab', return_value=self.bordersImage) as mock:
+      with self.recognizer.frame() as frame:
+        self.assertEqual(self.recognizer.executeSelection('selection1'), (178, 178, 178))
+        self.assertEqual(self.recognizer.executePixelColor('pixelColor1'), (114, 114, 114))
+        self.assertEqual(self.recognizer.executeFindImage('findImage2'), [(7, 28, 13, 29), (6, 27, 15, 28)])
+        self.assertEqual(cast(Image.Image, self.recognizer.execute('selection2')).size, (5, 7))
+      mock.assert_called_once_with([0, 0, 39, 39], all_screens=False)
+    self.assertIsNone(self.recognizer.currentFrame)
+    self.assertGreater(frame.timestamp, 0)
+    self.assertGreaterEqual(frame.age, 0)
+
+  def test_frame_memoizedResults(self):
+    with patch('guirecognizer.recognizer.ImageGrab.grab', return_value=self.bordersImage):
+      with self.recognizer.frame() as frame:
+        with patch.object(Recognizer, 'getAveragePixelColor', wraps=Recognizer.getAveragePixelColor) as mock:
+          self.recognizer.executePixelColor('pixelColor3')
+          self.recognizer.executePixelColor('pixelColor3')
+          mock.assert_called_once()
+          self.recognizer.executePixelColor('pixelColor3', selectedArea=self.bordersImage)
+          self.assertEqual(mock.call_count, 2)
+        self.assertEqual(len(frame.results), 1)
+
+  def test_frame_memoizedResultsCopied(self):
+    with self.recognizer.frame(Frame(self.bordersImage, (0, 0, 39, 39))):
+      coords = self.recognizer.executeFindImage('findImage2')
+      coords.sort()
+      coords.append((0, 0, 1, 1))
+      self.assertEqual(self.recognizer.executeFindImage('findImage2'), [(7, 28, 13, 29), (6, 27, 15, 28)])
+      image = cast(Image.Image, self.recognizer.execute('selection2'))
+      image.paste((1, 2, 3), (0, 0, 5, 7))
+      self.assertNotEqual(cast(Image.Image, self.recognizer.execute('selection2')).getpixel((0, 0)), (1, 2, 3))
+
+  def test_frame_bordersAndCaptureScale(self):
+    with self.recognizer.frame(Frame(self.bordersImage, (0, 0, 39, 39))):
+      size = cast(Image.Image, self.recognizer.execute('selection2')).size
+      self.recognizer.setCaptureScale(0.5)
+      self.assertEqual(cast(Image.Image, self.recognizer.execute('selection2')).size, ((size[0] + 1) // 2, (size[1] + 1) // 2))
+      self.recognizer.setCaptureScale(1)
+      self.assertEqual(cast(Image.Image, self.recognizer.execute('selection2')).size, size)
+      point = self.recognizer.executePixelColor('pixelColor1')
+      self.recognizer.setBorders((1, 1, 39, 39))
+      movedPoint = self.recognizer.executePixelColor('pixelColor1')
+      self.assertNotEqual(movedPoint, point)
+    with self.recognizer.frame(Frame(self.bordersImage, (0, 0, 39, 39))):
+      self.assertEqual(self.recognizer.executePixelColor('pixelColor1'), movedPoint)
+
+  def test_frame_clickNotMemoized(self):
+    with patch('guirecognizer.recognizer.ImageGrab.grab', return_value=self.bordersImage), \
+        patch('pyautogui.click') as clickMock, patch('pyautogui.moveTo'):
+      with self.recognizer.frame() as frame:
+        self.recognizer.executeClick('click1')
+        self.recognizer.executeClick('click1')
+        self.assertEqual(clickMock.call_count, 2)
+        self.assertEqual(len(frame.results), 0)
+
+  def test_frame_givenFrame(self):
+    frame = Frame(self.bordersImage, (0, 0, 39, 39))
+    with patch('guirecognizer.recognizer.ImageGrab.grab') as mock:
+      with self.recognizer.frame(frame):
+        self.assertEqual(self.recognizer.executeSelection('selection1'), (178, 178, 178))
+      mock.assert_not_called()
+
+  def test_frame_outsideBorders(self):
+    frame = Frame(self.bordersImage, (0, 0, 39, 39))
+    self.assertTrue(frame.containsCoord((0, 0)))
+    self.assertFalse(frame.containsCoord((39, 0)))
+    self.assertTrue(frame.containsCoord((0, 0, 39, 39)))
+    self.assertFalse(frame.containsCoord((0, 0, 40, 39)))
+    with patch('guirecognizer.recognizer.ImageGrab.grab', return_value=Image.new('RGB', (1, 1), (1, 2, 3))) as mock:
+      with self.recognizer.frame(frame):
+        self.assertEqual(self.recognizer.executeSelection(ActionType.SELECTION, coord=(50, 50)), (1, 2, 3))
+      mock.assert_called_once()
+
+  def test_frame_areaView(self):
+    frame = Frame(self.bordersImage, (0, 0, 39, 39))
+    area = frame.getArea((7, 11, 12, 18))
+    self.assertTrue(np.shares_memory(area.array, frame.arrayImage.array))
+    with self.recognizer.frame(frame):
+      self.assertEqual(self.recognizer.executeSelection('selection2').tobytes(), # type: ignore
+          self.recognizer.executeSelection('selection2', bordersImage=self.bordersImage).tobytes()) # type: ignore
+
+class TestNumpyScreenshot(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    self.screenshot = Image.open('tests/data/img/img1.png')
+    self.array = np.asarray(self.screenshot)
+
+  def test_error_invalidArray(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.executePixelColor('pixelColor3', screenshot=np.zeros((40, 40, 2), dtype=np.uint8))
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.executePixelColor('pixelColor3', bordersImage=np.zeros((40, 40), dtype=np.float64))
+
+  def test_screenshot(self):
+    for actionId in ['selection1', 'pixelColor1', 'pixelColor3', 'imageHash1', 'isSameImageHash1', 'findImage1', 'findImage2']:
+      self.assertEqual(self.recognizer.execute(actionId, screenshot=self.array),
+          self.recognizer.execute(actionId, screenshot=self.screenshot))
+    area = self.recognizer.executeSelection('selection2', screenshot=self.array)
+    self.assertIsInstance(area, Image.Image)
+    self.assertEqual(area.tobytes(), self.recognizer.executeSelection('selection2', screenshot=self.screenshot).tobytes()) # type: ignore
+
+  def test_bordersImage(self):
+    for actionId in ['selection1', 'pixelColor3', 'imageHash1', 'findImage2']:
+      self.assertEqual(self.recognizer.execute(actionId, bordersImage=self.array),
+          self.recognizer.execute(actionId, bordersImage=self.screenshot))
+
+  def test_preprocessing(self):
+    recognizer = Recognizer('tests/data/json/config4.json')
+    for operationId in recognizer.preprocessing.operationById:
+      for actionId in ['pixelColor1', 'findImage1']:
+        self.assertEqual(recognizer.execute(actionId, screenshot=self.array, preprocessing=operationId),
+            recognizer.execute(actionId, screenshot=self.screenshot, preprocessing=operationId))
+      self.assertEqual(recognizer.execute('pixelColor1', screenshot=self.array, preprocessing=operationId,
+          reinterpret=ActionType.SELECTION).tobytes(), # type: ignore
+          recognizer.execute('pixelColor1', screenshot=self.screenshot, preprocessing=operationId,
+          reinterpret=ActionType.SELECTION).tobytes()) # type: ignore
+
+class TestCaptureScale(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    rng = np.random.default_rng(0)
+    self.screenshot = Image.fromarray(rng.integers(0, 256, (25, 25, 3), dtype=np.uint8)).resize((200, 200), Image.Resampling.NEAREST)
+    buffer = io.BytesIO()
+    self.screenshot.crop((64, 48, 112, 96)).save(buffer, 'PNG')
+    self.recognizer = Recognizer({'borders': (0, 0, 200, 200), 'actions': [
+      {'id': 'find', 'type': ActionType.FIND_IMAGE, 'ratios': (0, 0, 1, 1), 'imageToFind': base64.b64encode(buffer.getvalue()).decode(),
+          'threshold': 10, 'maxResults': 1},
+      {'id': 'findScaled', 'type': ActionType.FIND_IMAGE, 'ratios': (0, 0, 1, 1), 'imageToFind': base64.b64encode(buffer.getvalue()).decode(),
+          'threshold': 10, 'maxResults': 1, 'captureScale': 0.25},
+      {'id': 'area', 'type': ActionType.SELECTION, 'ratios': (0.1, 0.1, 0.5, 0.3)},
+      {'id': 'point', 'type': ActionType.SELECTION, 'ratios': (0.5, 0.5), 'captureScale': 0.5}
+    ]})
+
+  def test_error(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.setCaptureScale(0)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.setCaptureScale(1.5)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.executeSelection('area', screenshot=self.screenshot, captureScale=2)
+
+  def test_invalidActionData(self):
+    recognizer = Recognizer({'borders': (0, 0, 200, 200), 'actions': [
+      {'id': 'area', 'type': ActionType.SELECTION, 'ratios': (0.1, 0.1, 0.5, 0.3), 'captureScale': 0}]})
+    self.assertNotIn('area', recognizer.actionById)
+
+  def test_selection(self):
+    self.assertEqual(self.recognizer.executeSelection('area', screenshot=self.screenshot).size, (80, 40)) # type: ignore
+    self.assertEqual(self.recognizer.executeSelection('area', screenshot=self.screenshot, captureScale=0.5).size, (40, 20)) # type: ignore
+    self.recognizer.setCaptureScale(0.25)
+    self.assertEqual(self.recognizer.executeSelection('area', screenshot=self.screenshot).size, (20, 10)) # type: ignore
+    self.assertEqual(self.recognizer.executeSelection('area', bordersImage=self.screenshot).size, (20, 10)) # type: ignore
+    self.assertEqual(self.recognizer.executeSelection('area', screenshot=self.screenshot, captureScale=0.3).size, (24, 12)) # type: ignore
+    self.assertEqual(self.recognizer.executeSelection('point', screenshot=self.screenshot),
+        self.recognizer.executeSelection('point', screenshot=self.screenshot, captureScale=1))
+
+  def test_findImage(self):
+    self.assertEqual(self.recognizer.executeFindImage('find', screenshot=self.screenshot), [(64, 48, 112, 96)])
+    self.assertEqual(self.recognizer.executeFindImage('findScaled', screenshot=self.screenshot), [(64, 48, 112, 96)])
+    self.assertEqual(self.recognizer.executeFindImage('find', screenshot=self.screenshot, captureScale=0.5), [(64, 48, 112, 96)])
+    coord = self.recognizer.executeFindImage('find', screenshot=self.screenshot, captureScale=0.3)[0]
+    for value, expectedValue in zip(coord, (64, 48, 112, 96)):
+      self.assertAlmostEqual(value, expectedValue, delta=4)
+
+  def test_live(self):
+    with patch.object(self.recognizer.captureBackend, 'grabArea', side_effect=lambda coord, allScreens: self.screenshot.crop(coord)):
+      self.assertEqual(self.recognizer.executeFindImage('findScaled'), [(64, 48, 112, 96)])
+      with self.recognizer.frame():
+        self.assertEqual(self.recognizer.executeFindImage('findScaled'), [(64, 48, 112, 96)])
+
+  def test_preprocessing(self):
+    self.recognizer.preprocessing.loadData({'operations': [{'id': 'resize', 'suboperations': [
+        {'type': 'resize', 'resize': {'method': 'unfixedRatio', 'width': 10, 'height': 5}}]}]}) # type: ignore
+    pipeInfo = cast(ExecuteParams, {'screenshot': self.screenshot, 'captureScale': 0.5, 'preprocessing': 'resize'})
+    self.recognizer._executePipeSteps(self.recognizer._getPipeSteps(['area'], None), ['area'], pipeInfo, None)
+    self.assertEqual(pipeInfo['sizeRatio'], (8, 8))
+
+
+class TestExecuteMany(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    with Image.open('tests/data/img/img1.png') as image:
+      self.screenshot = image.convert('RGB')
+
+  def grab(self, bbox, all_screens=False):
+    return self.screenshot.crop(bbox)
+
+  def test_error(self):
+    with patch('guirecognizer.recognizer.ImageGrab.grab', side_effect=self.grab) as grabMock, \
+        patch.object(Recognizer, 'getAveragePixelColor') as pixelColorMock:
+      with self.assertRaises(RecognizerValueError):
+        self.recognizer.executeMany([5]) # type: ignore
+      with self.assertRaises(RecognizerValueError):
+        self.recognizer.executeMany([()])
+      with self.assertRaises(RecognizerValueError):
+        self.recognizer.executeMany(['pixelColor3', 'unknown'])
+      with self.assertRaises(RecognizerValueError):
+        self.recognizer.executeMany(['pixelColor3', ('pixelColor3', {'preprocessing': 'unknown'})])
+      with self.assertRaises(RecognizerValueError):
+        self.recognizer.executeMany(['pixelColor3'], frameNewerThan='now') # type: ignore
+      grabMock.assert_not_called()
+      pixelColorMock.assert_not_called()
+
+  def test_results(self):
+    requests = ['selection1', 'pixelColor1', 'findImage2', ('coordinates2', ActionType.IMAGE_HASH),
+        ('selection1', {'reinterpret': ActionType.PIXEL_COLOR}), ('compareImageHash1', {'imageHashReference': '8e1b79e1a1a5a783,07000000000'})]
+    expected = [(178, 178, 178), (114, 114, 114), [(7, 28, 13, 29), (6, 27, 15, 28)],
+        self.recognizer.executeImageHash('coordinates2', ActionType.IMAGE_HASH, screenshot=self.screenshot), (178, 178, 178), 0]
+    self.assertEqual(self.recognizer.executeMany(requests, screenshot=self.screenshot), expected)
+    self.assertEqual(self.recognizer.executeMany(dict(enumerate(requests)), screenshot=self.screenshot), dict(enumerate(expected)))
+    self.assertEqual(self.recognizer.executeMany([]), [])
+
+  def test_sharedPrefix(self):
+    coord = self.recognizer.execute('pixelColor3', reinterpret=ActionType.COORDINATES)
+    color = self.recognizer.executePixelColor('pixelColor3', screenshot=self.screenshot)
+    with patch.object(Recognizer, 'getAveragePixelColor', wraps=Recognizer.getAveragePixelColor) as mock:
+      results = self.recognizer.executeMany({
+        'color': 'pixelColor3',
+        'difference': ('comparePixelColor1', {'coord': coord}),
+        'isSame': ('isSamePixelColor1', {'coord': coord})}, screenshot=self.screenshot)
+      mock.assert_called_once()
+    self.assertEqual(results, {
+      'color': color,
+      'difference': self.recognizer.executeComparePixelColor('comparePixelColor1', pixelColor=color),
+      'isSame': self.recognizer.executeIsSamePixelColor('isSamePixelColor1', pixelColor=color)})
+
+  def test_sharedPrefix_preprocessing(self):
+    recognizer = Recognizer('tests/data/json/config4.json')
+    requests = [('pixelColor1', {'preprocessing': 'grayscale1'}),
+        ('pixelColor1', {'preprocessing': 'grayscale1', 'reinterpret': ActionType.IMAGE_HASH}), 'pixelColor1']
+    with patch.object(recognizer.preprocessing, 'processArray', wraps=recognizer.preprocessing.processArray) as mock:
+      results = recognizer.executeMany(requests, screenshot=self.screenshot)
+      mock.assert_called_once()
+    self.assertEqual(results, [(198, 198, 198),
+      recognizer.executeImageHash('pixelColor1', preprocessing='grayscale1', reinterpret=ActionType.IMAGE_HASH, screenshot=self.screenshot),
+      recognizer.executePixelColor('pixelColor1', screenshot=self.screenshot)])
+
+  def test_identicalRequests(self):
+    with patch.object(Recognizer, '_findImageCoordinates', wraps=Recognizer._findImageCoordinates) as mock:
+      results = self.recognizer.executeMany(['findImage2', 'findImage2'], screenshot=self.screenshot)
+      mock.assert_called_once()
+    self.assertEqual(results, [[(7, 28, 13, 29), (6, 27, 15, 28)]] * 2)
+
+  def test_oneCapture(self):
+    with patch('guirecognizer.recognizer.ImageGrab.grab', side_effect=self.grab) as mock:
+      results = self.recognizer.executeMany(['selection1', 'pixelColor1', 'findImage2', ('pixelColor3', {'coord': (50, 50)})])
+      mock.assert_called_once()
+    self.assertEqual(results[:3], [(178, 178, 178), (114, 114, 114), [(7, 28, 13, 29), (6, 27, 15, 28)]])
+
+  def test_frame(self):
+    frame = Frame(self.screenshot.crop((0, 0, 39, 39)), (0, 0, 39, 39))
+    with patch('guirecognizer.recognizer.ImageGrab.grab') as mock:
+      with self.recognizer.frame(frame):
+        self.assertEqual(self.recognizer.executeMany(['selection1', 'pixelColor1']), [(178, 178, 178), (114, 114, 114)])
+      mock.assert_not_called()
+    self.assertEqual(len(frame.results), 2)
+
+  def test_parallel(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.enableParallelExecution(0)
+    requests = ['findImage1', 'findImage2', 'selection1', 'pixelColor1', 'findImage2', ('pixelColor3', ActionType.IMAGE_HASH),
+        ('compareImageHash1', {'imageHashReference': '8e1b79e1a1a5a783,07000000000'})]
+    expected = self.recognizer.executeMany(requests, screenshot=self.screenshot)
+    executor = self.recognizer.enableParallelExecution(4)
+    self.addCleanup(self.recognizer.disableParallelExecution)
+    self.assertIs(self.recognizer.executor, executor)
+    threadNames = set()
+    _findImageCoordinates = Recognizer._findImageCoordinates
+    def findImageCoordinates(*args):
+      threadNames.add(threading.current_thread().name)
+      return _findImageCoordinates(*args)
+    with patch.object(Recognizer, '_findImageCoordinates', side_effect=findImageCoordinates) as mock:
+      self.assertEqual(self.recognizer.executeMany(requests, screenshot=self.screenshot), expected)
+      self.assertEqual(mock.call_count, 2)
+    self.assertTrue(all(name.startswith('guirecognizer') for name in threadNames))
+    self.recognizer.disableParallelExecution()
+    self.assertIsNone(self.recognizer.executor)
+
+  def test_parallelScales(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.enableParallelScales(0)
+    expected = [self.recognizer.executeFindImage(actionId, screenshot=self.screenshot) for actionId in ('findImage1', 'findImage3')]
+    executor = self.recognizer.enableParallelScales(4)
+    self.addCleanup(self.recognizer.disableParallelScales)
+    self.assertIs(self.recognizer.scaleExecutor, executor)
+    threadNames = set()
+    _computeFindImageMatchResults = Recognizer._computeFindImageMatchResults
+    def computeFindImageMatchResults(*args):
+      threadNames.add(threading.current_thread().name)
+      return _computeFindImageMatchResults(*args)
+    with patch.object(Recognizer, '_computeFindImageMatchResults', side_effect=computeFindImageMatchResults):
+      self.assertEqual(self.recognizer.executeFindImage('findImage1', screenshot=self.screenshot), expected[0])
+      # Without resize interval, the only size is matched by the calling thread.
+      self.assertEqual(threadNames, {threading.current_thread().name})
+      threadNames.clear()
+      self.assertEqual(self.recognizer.executeFindImage('findImage3', screenshot=self.screenshot), expected[1])
+    self.assertTrue(all(name.startswith('guirecognizer-scales') for name in threadNames))
+    self.recognizer.disableParallelScales()
+    self.assertIsNone(self.recognizer.scaleExecutor)
+
+  def test_parallel_clicks(self):
+    self.recognizer.enableParallelExecution(4)
+    self.addCleanup(self.recognizer.disableParallelExecution)
+    calls = []
+    getAveragePixelColor = Recognizer.getAveragePixelColor
+    def pixelColor(area):
+      calls.append('pixelColor')
+      return getAveragePixelColor(area)
+    with patch.object(Recognizer, 'getAveragePixelColor', side_effect=pixelColor), \
+        patch('pyautogui.click', side_effect=lambda *args, **kwargs: calls.append('click')), patch('pyautogui.moveTo'):
+      results = self.recognizer.executeMany(['pixelColor3', ('selection2', ActionType.PIXEL_COLOR), 'click1',
+          ('selection3', ActionType.PIXEL_COLOR), 'pixelColor3'], screenshot=self.screenshot)
+    # The identical request reads the same pixels and is not executed again.
+    self.assertEqual(calls, ['pixelColor', 'pixelColor', 'click', 'pixelColor'])
+    self.assertEqual(results[2], None)
+    self.assertEqual(results[0], results[4])
+
+  def test_parallel_error(self):
+    self.recognizer.enableParallelExecution(2)
+    self.addCleanup(self.recognizer.disableParallelExecution)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.executeMany(['pixelColor3', ('selection1', ActionType.IMAGE_HASH)], screenshot=self.screenshot)
+
+  def test_independentRequest(self):
+    screenshot = Image.new('RGB', self.screenshot.size, (1, 2, 3))
+    self.assertEqual(self.recognizer.executeMany(['selection1', ('selection1', {'screenshot': screenshot})], bordersImage=self.screenshot),
+        [(178, 178, 178), (1, 2, 3)])
+
+class TestBorders(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    with Image.open('tests/data/img/img1.png') as image:
+      self.screenshot = image.copy()
+
+  def test_error(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.setBorders((0, 0, 10)) # type: ignore
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.setBorders((10, 0, 0, 10))
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.moveBorders(1.5, 0) # type: ignore
+    with self.assertRaises(RecognizerValueError):
+      Recognizer().moveBorders(1, 1)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.executeCoordinates('coordinates2', borders=(0, 0, 10)) # type: ignore
+
+  def test_setBorders(self):
+    self.recognizer.setBorders((10, 10, 49, 49))
+    self.assertEqual(self.recognizer.borders, (10, 10, 49, 49))
+    with patch.object(Recognizer, 'getCoord') as getCoord:
+      self.assertEqual(self.recognizer.executeCoordinates('coordinates2'), (31, 18, 44, 32))
+      self.assertEqual(self.recognizer.executeCoordinates('coordinates1'), (30, 43))
+    getCoord.assert_not_called()
+    self.recognizer.moveBorders(-10, -5)
+    self.assertEqual(self.recognizer.borders, (0, 5, 39, 44))
+    self.assertEqual(self.recognizer.executeCoordinates('coordinates2'), (21, 13, 34, 27))
+    self.assertEqual(self.recognizer.executeCoordinates('coordinates2', borders=(0, 0, 39, 39)), (21, 8, 34, 22))
+
+  def test_noDecoding(self):
+    with patch.object(Recognizer, 'getImageToFindFromData') as getImageToFindFromData:
+      self.recognizer.moveBorders(5, 5)
+      self.recognizer.moveBorders(-5, -5)
+      self.assertEqual(self.recognizer.executeFindImage('findImage2', screenshot=self.screenshot), [(7, 28, 13, 29), (6, 27, 15, 28)])
+    getImageToFindFromData.assert_not_called()
+
+  def test_bordersImage(self):
+    bordersImage = self.screenshot.crop((0, 0, 39, 39))
+    expected = self.recognizer.executePixelColor('pixelColor3', bordersImage=bordersImage)
+    self.recognizer.moveBorders(100, 200)
+    self.assertEqual(self.recognizer.executePixelColor('pixelColor3', bordersImage=bordersImage), expected)
+
+  def test_plan(self):
+    plan = self.recognizer.compile('coordinates2')
+    self.assertEqual(plan(), (21, 8, 34, 22))
+    self.recognizer.moveBorders(3, 4)
+    self.assertEqual(plan(), (24, 12, 37, 26))
+
+  def test_backgroundCapture(self):
+    backgroundCapturer = BackgroundCapturer(self.recognizer.captureBackend, (0, 0, 39, 39))
+    self.recognizer.backgroundCapturer = backgroundCapturer
+    self.recognizer.moveBorders(1, 2)
+    self.assertEqual(backgroundCapturer.borders, (1, 2, 40, 41))
+    self.recognizer.backgroundCapturer = None
+
+  def test_threads(self):
+    nbThreads = 4
+    nbMoves = 200
+    results = []
+    errors = []
+    isMoving = threading.Event()
+    isMoving.set()
+
+    def move():
+      try:
+        for _ in range(nbMoves):
+          self.recognizer.moveBorders(1, 1)
+      except Exception as e:
+        errors.append(e)
+
+    def execute():
+      try:
+        while isMoving.is_set():
+          results.append(self.recognizer.executeCoordinates('coordinates2'))
+      except Exception as e:
+        errors.append(e)
+
+    executeThread = threading.Thread(target=execute)
+    executeThread.start()
+    moveThreads = [threading.Thread(target=move) for _ in range(nbThreads)]
+    for thread in moveThreads:
+      thread.start()
+    for thread in moveThreads:
+      thread.join()
+    isMoving.clear()
+    executeThread.join()
+    self.assertEqual(errors, [])
+    self.assertEqual(self.recognizer.borders, (nbThreads * nbMoves, nbThreads * nbMoves, 39 + nbThreads * nbMoves, 39 + nbThreads * nbMoves))
+    self.assertEqual(self.recognizer.executeCoordinates('coordinates2'),
+        (21 + nbThreads * nbMoves, 8 + nbThreads * nbMoves, 34 + nbThreads * nbMoves, 22 + nbThreads * nbMoves))
+    for coord in results:
+      # Coordinates never mix two borders.
+      self.assertEqual((coord[0] - 21, coord[1] - 8, coord[2] - 34, coord[3] - 22), (coord[0] - 21,) * 4)
+
+
+class TestThreadSafety(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    self.recognizer.preprocessing.loadData({'operations': [
+        {'id': 'resizeWidth', 'suboperations': [{'type': 'resize', 'resize': {'method': 'fixedRatioWidth', 'width': 20}}]},
+        {'id': 'grayscale', 'suboperations': [{'type': 'grayscale'}]}]}) # type: ignore
+    with Image.open('tests/data/img/img1.png') as image:
+      self.screenshots = [image.convert('RGB'), ImageOps.mirror(image.convert('RGB')), ImageOps.flip(image.convert('RGB'))]
+    previousSwitchInterval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    self.addCleanup(sys.setswitchinterval, previousSwitchInterval)
+
+  def getResults(self, screenshot: Image.Image) -> list:
+    recognizer = self.recognizer
+    return [
+      recognizer.executeFindImage('findImage2', screenshot=screenshot),
+      recognizer.executeFindImage('findImage1', screenshot=screenshot, captureScale=0.5),
+      recognizer.executeSelection('selection3', screenshot=screenshot, preprocessing='resizeWidth').size, # type: ignore
+      recognizer.executeSelection('selection2', screenshot=screenshot, preprocessing='resizeWidth').size, # type: ignore
+      recognizer.executePixelColor('pixelColor3', screenshot=screenshot, preprocessing='grayscale'),
+      recognizer.executeImageHash('imageHash1', screenshot=screenshot),
+      recognizer.executeMany(['pixelColor1', 'comparePixelColor1', ('selection1', ActionType.PIXEL_COLOR)], screenshot=screenshot)]
+
+  def getFrameResults(self, screenshot: Image.Image) -> list:
+    with self.recognizer.frame(Frame(screenshot.crop((0, 0, 39, 39)), (0, 0, 39, 39))):
+      return [self.recognizer.executePixelColor('pixelColor3'), self.recognizer.executeSelection('selection1'),
+          self.recognizer.executeFindImage('findImage2')]
+
+  def test_stress(self):
+    expected = [(self.getResults(screenshot), self.getFrameResults(screenshot)) for screenshot in self.screenshots]
+    nbThreads = 8
+    barrier = threading.Barrier(nbThreads)
+    errors = []
+    def run(index: int) -> None:
+      screenshot = self.screenshots[index % len(self.screenshots)]
+      barrier.wait()
+      try:
+        for _ in range(10):
+          results = (self.getResults(screenshot), self.getFrameResults(screenshot))
+          if results != expected[index % len(self.screenshots)]:
+            errors.append((index, results))
+      except Exception as e:
+        errors.append((index, e))
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(nbThreads)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertEqual(errors, [])
+
+  def test_frameSessionPerThread(self):
+    frame = Frame(self.screenshots[0].crop((0, 0, 39, 39)), (0, 0, 39, 39))
+    currentFrames = []
+    with self.recognizer.frame(frame):
+      thread = threading.Thread(target=lambda: currentFrames.append(self.recognizer.currentFrame))
+      thread.start()
+      thread.join()
+      self.assertIs(self.recognizer.currentFrame, frame)
+    self.assertEqual(currentFrames, [None])
+    self.assertIsNone(self.recognizer.currentFrame)
+
+
 if __name__ == '__main__':
   unittest.main()
+
+
+class TestWaitUntil(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    self.sleeps = []
+    patcher = patch('guirecognizer.recognizer.time.sleep', side_effect=self.sleeps.append)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_waitUntil(self):
+    colors = [(0, 0, 0), (0, 0, 0), (0, 0, 0), (224, 224, 224)]
+    with patch.object(self.recognizer.captureBackend, 'grabPoint', side_effect=colors) as grabPoint, \
+        patch.object(self.recognizer.captureBackend, 'grabArea') as grabArea:
+      self.assertTrue(self.recognizer.waitUntil('isSamePixelColor1', interval=0.01, backoff=2))
+    self.assertEqual(grabPoint.call_count, 4)
+    grabPoint.assert_called_with((19, 24), False)
+    grabArea.assert_not_called()
+    self.assertEqual(self.sleeps, [0.01, 0.02, 0.04])
+
+  def test_predicate(self):
+    colors = [(0, 0, 0), (10, 10, 10), (20, 20, 20)]
+    with patch.object(self.recognizer.captureBackend, 'grabPoint', side_effect=colors):
+      result = self.recognizer.waitUntil('pixelColor1', predicate=lambda color: color[0] >= 10)
+    self.assertEqual(result, (10, 10, 10))
+    self.assertEqual(len(self.sleeps), 1)
+
+  def test_maxInterval(self):
+    colors = [(0, 0, 0)] * 6 + [(224, 224, 224)]
+    with patch.object(self.recognizer.captureBackend, 'grabPoint', side_effect=colors):
+      self.recognizer.waitUntil('isSamePixelColor1', interval=0.1, maxInterval=0.3, backoff=2)
+    self.assertEqual(self.sleeps, [0.1, 0.2, 0.3, 0.3, 0.3, 0.3])
+
+  def test_timeout(self):
+    with patch.object(self.recognizer.captureBackend, 'grabPoint', return_value=(0, 0, 0)), \
+        patch('guirecognizer.recognizer.time.monotonic', side_effect=[0, 0.125, 0.375, 0.75]):
+      with self.assertRaises(TimeoutError):
+        self.recognizer.waitUntil('isSamePixelColor1', timeout=0.5, interval=0.25, backoff=2)
+    self.assertEqual(self.sleeps, [0.25, 0.125])
+
+  def test_frameSessionIgnored(self):
+    with Image.open('tests/data/img/img1.png') as image:
+      frame = Frame(image.convert('RGB').crop((0, 0, 39, 39)), (0, 0, 39, 39))
+    with patch.object(self.recognizer.captureBackend, 'grabPoint', side_effect=[(0, 0, 0), (1, 1, 1)]):
+      with self.recognizer.frame(frame):
+        self.assertEqual(self.recognizer.waitUntil('pixelColor1', predicate=lambda color: color == (1, 1, 1)), (1, 1, 1))
+        self.assertIs(self.recognizer.currentFrame, frame)
+
+  def test_error_invalidParams(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.waitUntil('isSamePixelColor1', timeout=-1)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.waitUntil('isSamePixelColor1', interval=0)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.waitUntil('isSamePixelColor1', interval=1, maxInterval=0.5)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.waitUntil('isSamePixelColor1', backoff=0.5)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.waitUntil('unknown')
@@ -0,0 +1,130 @@
+import base64
+import io
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from guirecognizer import (ActionType, Recognizer, RecognizerValueError,
+                           TemplatePyramid, TemplatePyramidCache)
+from tests.test_utility import LoggedTestCase
+
+
+class TestTemplatePyramid(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    rng = np.random.default_rng(0)
+    self.imageToFind = Image.fromarray(rng.integers(0, 256, (10, 20, 3), dtype=np.uint8))
+
+  def test_sizes(self):
+    pyramid = TemplatePyramid(self.imageToFind, (1, 2), 0.25)
+    self.assertEqual([grayscale.shape for grayscale in pyramid.grayscales], [(10, 20), (12, 25), (15, 30), (17, 35), (20, 40)])
+    self.assertTrue(all(grayscale.dtype == np.uint8 for grayscale in pyramid.grayscales))
+    self.assertEqual(pyramid.hash, Recognizer._getRawImageHash(self.imageToFind))
+
+    pyramid = TemplatePyramid(self.imageToFind, (0.9, 1.1))
+    self.assertEqual([grayscale.shape for grayscale in pyramid.grayscales], [(9, 18), (9, 19), (10, 20), (10, 21), (11, 22)])
+    pyramid = TemplatePyramid(self.imageToFind)
+    self.assertEqual([grayscale.shape for grayscale in pyramid.grayscales], [(10, 20)])
+    # Ratios giving the same size are matched once.
+    pyramid = TemplatePyramid(self.imageToFind.resize((2, 2)), (1, 1.2))
+    self.assertEqual(len(pyramid.grayscales), 1)
+
+  def test_noResizeAtExecution(self):
+    recognizer = Recognizer('tests/data/json/config1.json')
+    with Image.open('tests/data/img/img1.png') as image:
+      screenshot = image.convert('RGB')
+    with patch('guirecognizer.recognizer.TemplatePyramid') as templatePyramid:
+      self.assertEqual(recognizer.executeFindImage('findImage3', screenshot=screenshot), [(7, 28, 13, 29), (6, 27, 15, 28)])
+    templatePyramid.assert_not_called()
+
+  def test_resizeStep(self):
+    buffer = io.BytesIO()
+    self.imageToFind.save(buffer, 'PNG')
+    action = {'type': ActionType.FIND_IMAGE, 'ratios': (0, 0, 1, 1), 'imageToFind': base64.b64encode(buffer.getvalue()).decode(),
+        'threshold': 10, 'maxResults': 1, 'resizeInterval': (1, 2)}
+    recognizer = Recognizer({'borders': (0, 0, 100, 100), 'actions': [{**action, 'id': 'default'},
+        {**action, 'id': 'step', 'resizeStep': 0.5}, {**action, 'id': 'zero', 'resizeStep': 0},
+        {**action, 'id': 'bool', 'resizeStep': True}]}) # type: ignore
+    self.assertEqual(set(recognizer.actionById), {'default', 'step'})
+    self.assertEqual(recognizer.actionById['step'].resizeStep, 0.5)
+    self.assertEqual(len(recognizer.actionById['default'].templatePyramid.grayscales), 21) # type: ignore
+    self.assertEqual(len(recognizer.actionById['step'].templatePyramid.grayscales), 3) # type: ignore
+
+  def test_captureScale(self):
+    rng = np.random.default_rng(0)
+    screenshot = Image.fromarray(rng.integers(0, 256, (25, 25, 3), dtype=np.uint8)).resize((200, 200), Image.Resampling.NEAREST)
+    buffer = io.BytesIO()
+    screenshot.crop((64, 48, 112, 96)).save(buffer, 'PNG')
+    recognizer = Recognizer({'borders': (0, 0, 200, 200), 'actions': [{'id': 'find', 'type': ActionType.FIND_IMAGE,
+        'ratios': (0, 0, 1, 1), 'imageToFind': base64.b64encode(buffer.getvalue()).decode(), 'threshold': 10, 'maxResults': 1,
+        'resizeInterval': (0.9, 1.1), 'captureScale': 0.25}]})
+    cache = recognizer.templatePyramidCache
+    for _ in range(2):
+      self.assertEqual(recognizer.executeFindImage('find', screenshot=screenshot), [(64, 48, 112, 96)])
+    self.assertEqual((cache.nbMisses, cache.nbHits), (1, 1))
+    self.assertEqual(recognizer.executeFindImage('find', screenshot=screenshot, captureScale=0.5), [(64, 48, 112, 96)])
+    self.assertEqual(recognizer.executeFindImage('find', screenshot=screenshot, captureScale=1), [(64, 48, 112, 96)])
+    self.assertEqual((cache.nbMisses, cache.nbHits, len(cache)), (2, 1, 2))
+    recognizer.setTemplatePyramidCacheSize(1)
+    self.assertEqual(len(cache), 1)
+    with self.assertRaises(RecognizerValueError):
+      recognizer.setTemplatePyramidCacheSize(0)
+
+  def test_cache(self):
+    cache = TemplatePyramidCache(2)
+    pyramids = {key: TemplatePyramid(self.imageToFind) for key in 'abc'}
+    cache.get('a', lambda: pyramids['a'])
+    cache.get('b', lambda: pyramids['b'])
+    self.assertIs(cache.get('a', lambda: self.fail('cached')), pyramids['a'])
+    cache.get('c', lambda: pyramids['c'])
+    self.assertEqual(len(cache), 2)
+    self.assertIs(cache.get('b', lambda: pyramids['c']), pyramids['c'])
+    self.assertEqual((cache.nbHits, cache.nbMisses), (1, 4))
+    cache.clear()
+    self.assertEqual(len(cache), 0)
+    with self.assertRaises(RecognizerValueError):
+      TemplatePyramidCache(0)
+
+  def test_coarseToFineSearch(self):
+    rng = np.random.default_rng(1)
+    screenshot = Image.fromarray(rng.integers(0, 256, (30, 40, 3), dtype=np.uint8)).resize((320, 240), Image.Resampling.BILINEAR)
+    buffer = io.BytesIO()
+    screenshot.crop((100, 60, 148, 100)).save(buffer, 'PNG')
+    action = {'type': ActionType.FIND_IMAGE, 'ratios': (0, 0, 1, 1), 'imageToFind': base64.b64encode(buffer.getvalue()).decode(),
+        'threshold': 10, 'maxResults': 1}
+    recognizer = Recognizer({'borders': (0, 0, 320, 240), 'actions': [{**action, 'id': 'exhaustive'},
+        {**action, 'id': 'coarse', 'searchLevels': 2}, {**action, 'id': 'margin', 'searchLevels': 3, 'refineMargin': 0},
+        {**action, 'id': 'tooDeep', 'searchLevels': 10}, {**action, 'id': 'negative', 'searchLevels': -1},
+        {**action, 'id': 'bool', 'searchLevels': True}, {**action, 'id': 'float', 'refineMargin': 1.5}]}) # type: ignore
+    self.assertEqual(set(recognizer.actionById), {'exhaustive', 'coarse', 'margin', 'tooDeep'})
+    self.assertEqual(recognizer.actionById['exhaustive'].searchLevels, 0)
+    self.assertEqual(recognizer.actionById['margin'].refineMargin, 0)
+    for actionId in ('exhaustive', 'coarse', 'margin', 'tooDeep'):
+      self.assertEqual(recognizer.executeFindImage(actionId, screenshot=screenshot), [(100, 60, 148, 100)])
+
+  def test_coarseToFineSearch_smallImage(self):
+    areaCv = np.array(ImageOps.grayscale(self.imageToFind.resize((60, 40))))
+    imageToFindCv = areaCv[10:16, 20:28]
+    exhaustive = Recognizer._computeFindImageMatchResults(imageToFindCv, areaCv)
+    # The image to find is too small to be halved: the search is exhaustive.
+    for result, expected in zip(Recognizer._computeCoarseToFineMatchResults(imageToFindCv, areaCv, 2, 4, 10), exhaustive):
+      np.testing.assert_array_equal(result, expected)
+
+  def test_getBestIndices(self):
+    values = np.array([0.5, 0.9, 0.7, 0.9, 0.7, 0.2], dtype=np.float32)
+    self.assertEqual(Recognizer._getBestIndices(values, 2).tolist(), [1, 3])
+    # Every value equal to the smallest selected one is selected, by increasing index.
+    self.assertEqual(Recognizer._getBestIndices(values, 3).tolist(), [1, 3, 2, 4])
+    self.assertEqual(Recognizer._getBestIndices(values, 10).tolist(), [1, 3, 2, 4, 0, 5])
+    self.assertEqual(Recognizer._getBestIndices(values[:0], 3).tolist(), [])
+
+  def test_manyCopies(self):
+    rng = np.random.default_rng(2)
+    imageToFind = Image.fromarray(rng.integers(0, 256, (3, 3, 3), dtype=np.uint8)).resize((12, 12), Image.Resampling.BILINEAR)
+    screenshot = Image.new('RGB', (200, 200), (128, 128, 128))
+    positions = [(x, y) for x in range(0, 188, 20) for y in range(0, 188, 20)]
+    for position in positions:
+      screenshot.paste(imageToFind, position)
+    coords = Recognizer.findImageCoordinatesWithImageToFindAsImage((0, 0, 200, 200), screenshot, imageToFind, 5, 1000)
+    self.assertEqual(sorted(coords), sorted((x, y, x + 12, y + 12) for x, y in positions))
@@ -0,0 +1,105 @@
+import asyncio
+from unittest.mock import patch
+
+from PIL import Image
+
+from guirecognizer import (ActionType, DirtyRegionTracker, Recognizer,
+                           RecognizerValueError, Watcher)
+from tests.test_utility import LoggedTestCase
+
+
+class TestWatcher(LoggedTestCase):
+  def setUp(self):
+    super().setUp()
+    self.recognizer = Recognizer('tests/data/json/config1.json')
+    with Image.open('tests/data/img/img1.png') as image:
+      self.screen = image.convert('RGB')
+    patcher = patch.object(self.recognizer.captureBackend, 'grabArea', side_effect=lambda region, allScreens: self.screen.crop(region))
+    self.grabArea = patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def getWatcher(self, requests, **kwargs) -> Watcher:
+    watcher = self.recognizer.watch(requests, **kwargs)
+    watcher.dirtyRegionTracker = DirtyRegionTracker(4)
+    return watcher
+
+  def test_poll(self):
+    watcher = self.getWatcher({'pixel': 'pixelColor1', 'same': 'isSamePixelColor1'})
+    events = watcher.poll()
+    self.assertEqual([(event.key, event.result, event.previousResult) for event in events],
+        [('pixel', (114, 114, 114), None), ('same', True, None)])
+    self.assertEqual(self.grabArea.call_count, 1)
+    self.assertEqual(watcher.poll(), [])
+    self.assertEqual(self.grabArea.call_count, 2)
+    self.assertEqual(watcher.dirtyRegionTracker.nbHits, 2)
+
+    self.screen.putpixel((8, 18), (1, 2, 3))
+    events = watcher.poll()
+    self.assertEqual([(event.key, event.result, event.previousResult) for event in events], [('pixel', (1, 2, 3), (114, 114, 114))])
+    self.assertEqual(watcher.dirtyRegionTracker.nbHits, 3)
+
+  def test_poll_sameResult(self):
+    watcher = self.getWatcher(['isSamePixelColor1', ('selection1', ActionType.PIXEL_COLOR)])
+    self.assertEqual([event.key for event in watcher.poll()], ['isSamePixelColor1', ('selection1', ActionType.PIXEL_COLOR)])
+    self.screen.putpixel((17, 24), (1, 2, 3))
+    with patch.object(self.recognizer, 'executeMany', wraps=self.recognizer.executeMany) as executeMany:
+      self.assertEqual(watcher.poll(), [])
+    executeMany.assert_called_once()
+    self.assertEqual(executeMany.call_args.args[0], ['isSamePixelColor1'])
+
+  def test_timestamp(self):
+    watcher = self.getWatcher(['pixelColor1'])
+    with patch('guirecognizer.recognizer.time.time', return_value=123.5):
+      event, = watcher.poll()
+    self.assertEqual(event.timestamp, 123.5)
+
+  def test_iterate(self):
+    watcher = self.getWatcher(['pixelColor1', 'isSamePixelColor1'], rate=100)
+    clock = [100.0]
+    sleeps = []
+    def sleep(duration: float) -> None:
+      sleeps.append(duration)
+      clock[0] += duration + 0.002
+      if len(sleeps) == 3:
+        self.screen.putpixel((8, 18), (1, 2, 3))
+    with patch('guirecognizer.watcher.time.sleep', side_effect=sleep), \
+        patch('guirecognizer.watcher.time.monotonic', side_effect=lambda: clock[0]):
+      events = [next(watcher), next(watcher), next(watcher)]
+    self.assertEqual([(event.key, event.result) for event in events],
+        [('pixelColor1', (114, 114, 114)), ('isSamePixelColor1', True), ('pixelColor1', (1, 2, 3))])
+    self.assertEqual(len(sleeps), 3)
+    self.assertEqual(sleeps[0], 0)
+    self.assertAlmostEqual(sleeps[1], 0.008)
+    self.assertAlmostEqual(sleeps[2], 0.008)
+    watcher.close()
+    self.assertTrue(watcher.isClosed)
+    with self.assertRaises(StopIteration):
+      next(watcher)
+
+  def test_asyncIterate(self):
+    watcher = self.getWatcher({'pixel': 'pixelColor1'}, rate=1000)
+    async def run():
+      events = []
+      async for event in watcher:
+        events.append(event)
+        if len(events) == 1:
+          self.screen.putpixel((8, 18), (1, 2, 3))
+        else:
+          watcher.close()
+      return events
+    events = asyncio.run(run())
+    self.assertEqual([event.result for event in events], [(114, 114, 114), (1, 2, 3)])
+
+  def test_error(self):
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.watch(['pixelColor1'], rate=0)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.watch([])
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.watch(['unknown'])
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.watch(['click1'])
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.watch(['pixelColor1'], screenshot=self.screen)
+    with self.assertRaises(RecognizerValueError):
+      self.recognizer.watch([('pixelColor1', {'frame': None})])